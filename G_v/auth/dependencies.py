@@ -1,16 +1,22 @@
 """
 Authentication Dependencies for FastAPI
 """
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any
 
-from database import get_db
+from database import (
+    get_db, open_read_session, read_your_writes, READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_HEADER
+)
 from auth.jwt_handler import jwt_handler
+from auth.principal_cache import principal_cache
+from auth.revocation import token_revocation_store
 from models import User, UserRole
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 class TokenData:
@@ -23,11 +29,17 @@ class TokenData:
         self.branch_id = branch_id
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Validate JWT and return current user"""
+@dataclass(frozen=True)
+class Principal:
+    """Lightweight, immutable identity for role-gated routes (no ORM row)"""
+    id: int
+    role: UserRole
+    organization_id: Optional[int]
+    branch_id: Optional[int]
+    token_version: int = 0
+
+
+def _decode_credentials(credentials: HTTPAuthorizationCredentials, db: Session) -> Dict[str, Any]:
     token = credentials.credentials
     try:
         payload = jwt_handler.verify_token(token)
@@ -45,15 +57,56 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    user_id = payload.get("sub")
-    if not user_id:
+    if not payload.get("sub"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token payload"
         )
     
-    user = db.query(User).filter(User.id == int(user_id), User.is_active == True).first()
-    if not user:
+    if payload.get("jti") and token_revocation_store.is_revoked(db, payload["jti"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    
+    db.info["user_id"] = int(payload["sub"])
+    return payload
+
+
+def get_read_db(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """
+    Dependency for read-only routes (analytics, listings, history views).
+    Reads are served by the replica unless the caller wrote recently, on
+    this worker or (per the carried pin) on another one; authentication
+    itself is still enforced by the route's role dependency.
+    """
+    user_id = None
+    if credentials:
+        payload = jwt_handler.verify_token(credentials.credentials)
+        if payload and str(payload.get("sub", "")).isdigit():
+            user_id = int(payload["sub"])
+    
+    carried = request.cookies.get(READ_YOUR_WRITES_COOKIE) or request.headers.get(READ_YOUR_WRITES_HEADER)
+    db = open_read_session(user_id, pinned=read_your_writes.is_pinned_until(carried))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _resolve_user(db: Session, user_id: int) -> User:
+    user = principal_cache.get(db, user_id)
+    if user is None:
+        epoch = principal_cache.epoch(user_id)
+        user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+        if user:
+            principal_cache.put(user, epoch)
+    
+    if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive"
@@ -62,44 +115,118 @@ def get_current_user(
     return user
 
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """Validate JWT and return current user"""
+    payload = _decode_credentials(credentials, db)
+    return _resolve_user(db, int(payload["sub"]))
+
+
+def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Validate JWT and return a claims-based principal.
+    Only the revocation epoch is checked against the (cached) users row;
+    tokens issued without principal claims fall back to a full user lookup.
+    """
+    payload = _decode_credentials(credentials, db)
+    user_id = int(payload["sub"])
+    
+    if "ver" not in payload:
+        user = _resolve_user(db, user_id)
+        return Principal(
+            id=user.id,
+            role=user.role,
+            organization_id=user.organization_id,
+            branch_id=user.branch_id,
+            token_version=user.token_version or 0
+        )
+    
+    state = principal_cache.revocation_state(db, user_id)
+    if state is None or not state[1]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found or inactive"
+        )
+    
+    if payload["ver"] != state[0]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    
+    try:
+        role = UserRole(payload.get("role"))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token payload"
+        )
+    
+    return Principal(
+        id=user_id,
+        role=role,
+        organization_id=payload.get("org"),
+        branch_id=payload.get("branch"),
+        token_version=payload["ver"]
+    )
+
+
+def _check_role(role: UserRole, allowed_roles: List[UserRole]) -> None:
+    if role not in allowed_roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Access denied. Required roles: {[r.value for r in allowed_roles]}"
+        )
+
+
 def require_roles(allowed_roles: List[UserRole]):
     """Dependency factory for role-based access"""
     def role_checker(current_user: User = Depends(get_current_user)) -> User:
-        if current_user.role not in allowed_roles:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Access denied. Required roles: {[r.value for r in allowed_roles]}"
-            )
+        _check_role(current_user.role, allowed_roles)
         return current_user
     return role_checker
 
 
+def require_role_claims(allowed_roles: List[UserRole]):
+    """Dependency factory for role-based access that authorizes from token claims"""
+    def role_checker(principal: Principal = Depends(get_current_principal)) -> Principal:
+        _check_role(principal.role, allowed_roles)
+        return principal
+    return role_checker
+
+
 # Role-specific dependencies
-def get_super_admin(user: User = Depends(require_roles([UserRole.SUPER_ADMIN]))) -> User:
+def get_super_admin(user: Principal = Depends(require_role_claims([UserRole.SUPER_ADMIN]))) -> Principal:
     return user
 
 
-def get_org_admin(user: User = Depends(require_roles([UserRole.ORG_ADMIN]))) -> User:
+def get_org_admin(user: Principal = Depends(require_role_claims([UserRole.ORG_ADMIN]))) -> Principal:
     return user
 
 
-def get_branch_admin(user: User = Depends(require_roles([UserRole.BRANCH_ADMIN]))) -> User:
+def get_branch_admin(user: Principal = Depends(require_role_claims([UserRole.BRANCH_ADMIN]))) -> Principal:
     return user
 
 
-def get_doctor(user: User = Depends(require_roles([UserRole.DOCTOR]))) -> User:
+def get_doctor(user: Principal = Depends(require_role_claims([UserRole.DOCTOR]))) -> Principal:
     return user
 
 
-def get_nurse(user: User = Depends(require_roles([UserRole.NURSE]))) -> User:
+def get_nurse(user: Principal = Depends(require_role_claims([UserRole.NURSE]))) -> Principal:
     return user
 
 
-def get_receptionist(user: User = Depends(require_roles([UserRole.RECEPTIONIST]))) -> User:
+def get_receptionist(user: Principal = Depends(require_role_claims([UserRole.RECEPTIONIST]))) -> Principal:
     return user
 
 
-def get_pharmacy_staff(user: User = Depends(require_roles([UserRole.PHARMACY_STAFF]))) -> User:
+def get_pharmacy_staff(user: Principal = Depends(require_role_claims([UserRole.PHARMACY_STAFF]))) -> Principal:
     return user
 
 
@@ -108,15 +235,15 @@ def get_patient_user(user: User = Depends(require_roles([UserRole.PATIENT]))) ->
 
 
 def get_clinical_staff(
-    user: User = Depends(require_roles([UserRole.DOCTOR, UserRole.NURSE]))
-) -> User:
+    user: Principal = Depends(require_role_claims([UserRole.DOCTOR, UserRole.NURSE]))
+) -> Principal:
     return user
 
 
 def get_branch_staff(
-    user: User = Depends(require_roles([
+    user: Principal = Depends(require_role_claims([
         UserRole.DOCTOR, UserRole.NURSE, UserRole.RECEPTIONIST, 
         UserRole.PHARMACY_STAFF, UserRole.BRANCH_ADMIN
     ]))
-) -> User:
+) -> Principal:
     return user
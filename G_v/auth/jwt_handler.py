@@ -1,31 +1,127 @@
 """
 JWT Token Handler
 """
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+import hashlib
+import threading
+import time
+import uuid
 import jwt
 from config import settings
 
 
+class VerifiedTokenCache:
+    """
+    LRU cache of verified token payloads keyed by the token's SHA-256 digest.
+    Entries expire at the token's own ``exp`` so a cached payload is never
+    served past the point where ``jwt.decode`` would have rejected it.
+    Tracks the average cost of a real verification so the time saved by
+    hits can be reported.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.verify_count = 0
+        self.verify_seconds = 0.0
+
+    def get(self, digest: bytes) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= time.time():
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, digest: bytes, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[digest] = (payload, payload.get("exp", 0))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def record_verify(self, seconds: float) -> None:
+        with self._lock:
+            self.verify_count += 1
+            self.verify_seconds += seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            avg_verify = self.verify_seconds / self.verify_count if self.verify_count else 0.0
+            saved = self.hits * avg_verify
+            uptime = max(time.monotonic() - self._started, 1e-9)
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "avg_verify_us": round(avg_verify * 1e6, 2),
+                "saved_verify_ms": round(saved * 1e3, 3),
+                "saved_verify_ms_per_second": round(saved * 1e3 / uptime, 4)
+            }
+
+
+token_cache = VerifiedTokenCache(max_size=settings.JWT_CACHE_MAX_SIZE)
+
+
 class JWTHandler:
     @staticmethod
-    def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+    def principal_claims(user) -> Dict[str, Any]:
+        """Claims that let role-gated routes authorize without loading the user row"""
+        return {
+            "sub": str(user.id),
+            "role": user.role.value,
+            "org": user.organization_id,
+            "branch": user.branch_id,
+            "ver": user.token_version or 0
+        }
+    
+    @staticmethod
+    def create_access_token(
+        data: Dict[str, Any],
+        expires_delta: Optional[timedelta] = None,
+        user=None
+    ) -> str:
         to_encode = data.copy()
+        if user is not None:
+            to_encode.update(JWTHandler.principal_claims(user))
         expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
         to_encode.update({
             "exp": expire,
             "iat": datetime.utcnow(),
+            "jti": uuid.uuid4().hex,
             "type": "access"
         })
         return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     
     @staticmethod
-    def create_refresh_token(data: Dict[str, Any]) -> str:
+    def create_refresh_token(data: Dict[str, Any], user=None) -> str:
         to_encode = data.copy()
+        if user is not None:
+            to_encode.update(JWTHandler.principal_claims(user))
         expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
         to_encode.update({
             "exp": expire,
             "iat": datetime.utcnow(),
+            "jti": uuid.uuid4().hex,
             "type": "refresh"
         })
         return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
@@ -42,9 +138,16 @@ class JWTHandler:
     
     @staticmethod
     def verify_token(token: str, token_type: str = "access") -> Optional[Dict[str, Any]]:
-        payload = JWTHandler.decode_token(token)
+        digest = hashlib.sha256(token.encode()).digest()
+        payload = token_cache.get(digest)
+        if payload is None:
+            started = time.perf_counter()
+            payload = JWTHandler.decode_token(token)
+            token_cache.record_verify(time.perf_counter() - started)
+            if payload:
+                token_cache.put(digest, payload)
         if payload and payload.get("type") == token_type:
-            return payload
+            return dict(payload)
         return None
 
 
@@ -0,0 +1,156 @@
+"""
+Principal Cache - avoids a users table round trip on every authenticated request
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from config import settings
+from models import User
+
+
+class PrincipalCache:
+    """
+    Bounded, TTL-based cache of authenticated users keyed by user id.
+
+    Entries are detached snapshots of the ``users`` row. On a hit the snapshot
+    is merged into the request session with ``load=False`` so routes still get
+    a session-bound ``User`` (relationships lazy-load as usual) without a
+    SELECT being issued.
+
+    Alongside full snapshots the cache keeps narrow revocation states
+    (``token_version``, ``is_active``) for the claims-only authorization
+    path, which never needs the full row.
+
+    Every user id carries an epoch that ``invalidate`` bumps. A fill only
+    lands if the epoch it observed before querying is still current, so a
+    request racing with ``disable_user`` cannot re-insert a stale principal.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._states: "OrderedDict[int, tuple]" = OrderedDict()
+        self._epochs: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def epoch(self, user_id: int) -> int:
+        with self._lock:
+            return self._epochs.get(user_id, 0)
+
+    def _lookup(self, table: "OrderedDict[int, tuple]", user_id: int):
+        # Caller holds the lock. Entries are (value, expires_at, epoch).
+        entry = table.get(user_id)
+        if entry is None:
+            return None
+        if entry[2] != self._epochs.get(user_id, 0) or entry[1] <= time.monotonic():
+            del table[user_id]
+            return None
+        table.move_to_end(user_id)
+        return entry[0]
+
+    def _store(self, table: "OrderedDict[int, tuple]", user_id: int, value, epoch: int) -> None:
+        # Caller holds the lock
+        if self._epochs.get(user_id, 0) != epoch:
+            return
+        table[user_id] = (value, time.monotonic() + self.ttl_seconds, epoch)
+        table.move_to_end(user_id)
+        while len(table) > self.max_size:
+            table.popitem(last=False)
+
+    def peek(self, user_id: int) -> Optional[User]:
+        """Return the detached snapshot (read-only) or None on miss/expiry"""
+        with self._lock:
+            snapshot = self._lookup(self._entries, user_id)
+            if snapshot is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return snapshot
+
+    def get(self, db: Session, user_id: int) -> Optional[User]:
+        """Return a session-bound user from cache, or None on miss/expiry"""
+        snapshot = self.peek(user_id)
+        if snapshot is None:
+            return None
+        return db.merge(snapshot, load=False)
+
+    def put(self, user: User, epoch: int) -> None:
+        """Store a detached snapshot of ``user`` if ``epoch`` is still current"""
+        snapshot = User(**{
+            column.key: getattr(user, column.key) for column in User.__table__.columns
+        })
+        make_transient_to_detached(snapshot)
+
+        with self._lock:
+            self._store(self._entries, user.id, snapshot, epoch)
+
+    def revocation_state(self, db: Session, user_id: int) -> Optional[Tuple[int, bool]]:
+        """
+        Return (token_version, is_active) for a user, or None if the user
+        does not exist. Served from a cached snapshot or narrow state when
+        possible, otherwise a two-column query fills the state cache.
+        """
+        with self._lock:
+            snapshot = self._lookup(self._entries, user_id)
+            state = self._lookup(self._states, user_id) if snapshot is None else None
+            if snapshot is not None:
+                self.hits += 1
+                return snapshot.token_version or 0, bool(snapshot.is_active)
+            if state is not None:
+                self.hits += 1
+                return state
+            self.misses += 1
+            epoch = self._epochs.get(user_id, 0)
+
+        row = db.query(User.token_version, User.is_active).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        state = (row.token_version or 0, bool(row.is_active))
+        with self._lock:
+            self._store(self._states, user_id, state, epoch)
+        return state
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop the cached principal and bump its epoch"""
+        with self._lock:
+            self._epochs[user_id] = self._epochs.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+            self._states.pop(user_id, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._states.clear()
+            self._epochs.clear()
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "state_size": len(self._states),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
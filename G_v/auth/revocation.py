@@ -0,0 +1,188 @@
+"""
+Token Revocation Store - logout and refresh-token rotation keyed by JWT ``jti``
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import RevokedToken
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over a single blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class TokenRevocationStore:
+    """
+    Revoked token ids are persisted in ``revoked_tokens`` so every worker
+    shares them, and mirrored in memory for O(1) checks: a Bloom filter
+    answers the common "not revoked" case without touching the dict, and the
+    dict confirms positives. Each worker pulls rows revoked by other workers
+    at most every ``sync_seconds``; entries are dropped once the token's own
+    ``exp`` has passed since the JWT is rejected anyway.
+    """
+
+    def __init__(self, bloom_capacity: int, bloom_error_rate: float,
+                 sync_seconds: float, purge_seconds: float):
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.sync_seconds = sync_seconds
+        self.purge_seconds = purge_seconds
+        self._revoked: Dict[str, datetime] = {}
+        self._bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._watermark: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._next_purge = time.monotonic() + purge_seconds
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.bloom_negatives = 0
+        self.revoked_hits = 0
+
+    def _remember(self, jti: str, expires_at: datetime) -> None:
+        # Caller holds the lock
+        self._revoked[jti] = expires_at
+        self._bloom.add(jti)
+
+    def _expire_local(self, now: datetime) -> None:
+        # Caller holds the lock. A Bloom filter cannot delete, so rebuild it.
+        live = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        if len(live) == len(self._revoked):
+            return
+        self._revoked = live
+        self._bloom = BloomFilter(max(self.bloom_capacity, len(live) * 2), self.bloom_error_rate)
+        for jti in live:
+            self._bloom.add(jti)
+
+    def sync(self, db: Session, force: bool = False) -> None:
+        """Pull revocations recorded by other workers and purge expired rows"""
+        monotonic_now = time.monotonic()
+        with self._lock:
+            if not force and monotonic_now < self._next_sync:
+                return
+            self._next_sync = monotonic_now + self.sync_seconds
+            watermark = self._watermark
+            purge = monotonic_now >= self._next_purge
+            if purge:
+                self._next_purge = monotonic_now + self.purge_seconds
+
+        now = datetime.utcnow()
+        query = db.query(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).filter(
+            RevokedToken.expires_at > now
+        )
+        if watermark is not None:
+            # Overlap one sync window to tolerate late commits from other workers
+            query = query.filter(RevokedToken.revoked_at > watermark - timedelta(seconds=self.sync_seconds))
+        rows = query.all()
+
+        if purge:
+            db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+            db.commit()
+
+        with self._lock:
+            for row in rows:
+                self._remember(row.jti, row.expires_at)
+                if self._watermark is None or row.revoked_at > self._watermark:
+                    self._watermark = row.revoked_at
+            if self._watermark is None:
+                self._watermark = now
+            if purge:
+                self._expire_local(now)
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        self.sync(db)
+        with self._lock:
+            self.checks += 1
+            if jti not in self._bloom:
+                self.bloom_negatives += 1
+                return False
+            expires_at = self._revoked.get(jti)
+            revoked = expires_at is not None and expires_at > datetime.utcnow()
+            if revoked:
+                self.revoked_hits += 1
+            return revoked
+
+    def revoke(self, db: Session, jti: str, expires_at: datetime,
+               user_id: Optional[int] = None, token_type: Optional[str] = None) -> bool:
+        """
+        Revoke a token id until ``expires_at``. Returns False if it was already
+        revoked (the unique constraint makes refresh rotation single-use).
+        """
+        if expires_at <= datetime.utcnow():
+            return False
+
+        db.add(RevokedToken(
+            jti=jti,
+            user_id=user_id,
+            token_type=token_type,
+            expires_at=expires_at,
+            revoked_at=datetime.utcnow()
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            with self._lock:
+                self._remember(jti, expires_at)
+            return False
+
+        with self._lock:
+            self._remember(jti, expires_at)
+        return True
+
+    def revoke_payload(self, db: Session, payload: Dict[str, Any]) -> bool:
+        """Revoke a decoded JWT payload (no-op for tokens issued without a jti)"""
+        if not payload.get("jti"):
+            return False
+        return self.revoke(
+            db,
+            payload["jti"],
+            datetime.utcfromtimestamp(payload["exp"]),
+            user_id=int(payload["sub"]) if payload.get("sub") else None,
+            token_type=payload.get("type")
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "revoked": len(self._revoked),
+                "bloom_bits": self._bloom.size,
+                "bloom_hashes": self._bloom.hash_count,
+                "checks": self.checks,
+                "bloom_negatives": self.bloom_negatives,
+                "revoked_hits": self.revoked_hits
+            }
+
+
+token_revocation_store = TokenRevocationStore(
+    bloom_capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    bloom_error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+    sync_seconds=settings.REVOCATION_SYNC_SECONDS,
+    purge_seconds=settings.REVOCATION_PURGE_SECONDS
+)
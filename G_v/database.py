@@ -1,20 +1,171 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 from contextlib import contextmanager
+from functools import lru_cache
 from config import settings
+from utils.pool_telemetry import InstrumentedQueuePool, instrument_engine
 
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_logging_name="primary",
     pool_size=20,
     max_overflow=30,
     pool_pre_ping=True
 )
+instrument_engine(engine, "primary")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+replica_engine = engine
+if settings.READ_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.READ_REPLICA_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="replica",
+        pool_size=20,
+        max_overflow=30,
+        pool_pre_ping=True
+    )
+    instrument_engine(replica_engine, "replica")
+
+
+# ==================== READ REPLICA ROUTING ====================
+# Carries the pin to whichever worker serves the client's next request
+READ_YOUR_WRITES_COOKIE = "ihorms_primary_until"
+READ_YOUR_WRITES_HEADER = "X-Primary-Until"
+
+# Per-request holder the commit hook fills with the pin expiry (wall clock)
+_request_pin: ContextVar[Optional[dict]] = ContextVar("request_pin", default=None)
+
+
+class ReadYourWrites:
+    """
+    Users who committed a write in the last ``seconds`` are pinned to the
+    primary so their next reads cannot observe replica lag; the window only
+    needs to outlast replication delay.
+
+    The in-process pin covers later requests on the same worker. For the
+    others, the response to a writing request carries the expiry back to the
+    client (``READ_YOUR_WRITES_COOKIE``, echoed in ``READ_YOUR_WRITES_HEADER``
+    for non-browser clients) and read sessions honour it on any worker. A
+    forged value can only send a client's reads to the primary.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._pins: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def pin(self, user_id: Optional[int]) -> None:
+        request_pin = _request_pin.get()
+        if request_pin is not None:
+            request_pin["until"] = time.time() + self.seconds
+        if user_id is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._pins[user_id] = now + self.seconds
+            if len(self._pins) > 10000:
+                self._pins = {uid: until for uid, until in self._pins.items() if until > now}
+
+    def is_pinned(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        with self._lock:
+            until = self._pins.get(user_id)
+            return until is not None and until > time.monotonic()
+
+    @staticmethod
+    def is_pinned_until(value: Optional[str]) -> bool:
+        """Whether a client-carried expiry (unix seconds) is still in the future"""
+        try:
+            return value is not None and float(value) > time.time()
+        except ValueError:
+            return False
+
+    @contextmanager
+    def track_request(self):
+        """Collect the pin set by writes committed while handling one request"""
+        holder: dict = {}
+        token = _request_pin.set(holder)
+        try:
+            yield holder
+        finally:
+            _request_pin.reset(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pins.clear()
+
+
+read_your_writes = ReadYourWrites(settings.READ_YOUR_WRITES_SECONDS)
+
+
+class RoutingSession(Session):
+    """
+    Session for read-mostly routes: SELECTs go to the replica, while flushes
+    and explicit DML go to the primary. Once the session has written (or was
+    opened pinned) every later read also uses the primary, so a request
+    always sees its own changes.
+    """
+
+    def __init__(self, primary=None, replica=None, **kwargs):
+        super().__init__(**kwargs)
+        self.primary = primary
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or self.info.get("use_primary") or is_write(clause):
+            return self.primary
+        return self.replica
+
+
+def is_write(clause) -> bool:
+    """DML constructs, and any textual statement that is not a plain SELECT"""
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        words = clause.text.split(None, 1)
+        return not words or words[0].upper() != "SELECT"
+    return False
+
+
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    primary=engine,
+    replica=replica_engine,
+    autocommit=False,
+    autoflush=False
+)
+
+
+def _track_writes(session, flush_context):
+    session.info["use_primary"] = True
+    session.info["wrote"] = True
+
+
+def _pin_writer(session):
+    if session.info.pop("wrote", False):
+        read_your_writes.pin(session.info.get("user_id"))
+
+
+for _factory in (SessionLocal, ReadSessionLocal):
+    event.listen(_factory, "after_flush", _track_writes)
+    event.listen(_factory, "after_commit", _pin_writer)
+
 
 def get_db():
     """Dependency for FastAPI routes"""
@@ -25,6 +176,15 @@ def get_db():
         db.close()
 
 
+def open_read_session(user_id: Optional[int] = None, pinned: bool = False) -> RoutingSession:
+    """Open a replica-routed session, pinned to the primary for recent writers"""
+    db = ReadSessionLocal()
+    db.info["user_id"] = user_id
+    if pinned or read_your_writes.is_pinned(user_id):
+        db.info["use_primary"] = True
+    return db
+
+
 @contextmanager
 def get_db_context():
     """Context manager for services"""
@@ -37,3 +197,45 @@ def get_db_context():
         raise
     finally:
         db.close()
+
+
+# ==================== ASYNC ENGINE ====================
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver (asyncpg / aiosqlite)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+@lru_cache()
+def get_async_engine() -> AsyncEngine:
+    """Created lazily so the async driver is only required when async routes are used"""
+    url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+    pool_args = {}
+    if make_url(url).get_backend_name() != "sqlite":
+        pool_args = {"pool_size": 20, "max_overflow": 30}
+    return create_async_engine(url, pool_pre_ping=True, **pool_args)
+
+
+@lru_cache()
+def get_async_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=get_async_engine(),
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
+async def get_async_db():
+    """Async dependency for FastAPI routes"""
+    async with get_async_sessionmaker()() as db:
+        yield db
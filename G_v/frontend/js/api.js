@@ -104,6 +104,9 @@ class ApiClient {
             if (response.ok) {
                 const data = await response.json();
                 this.setToken(data.access_token);
+                if (data.refresh_token) {
+                    this.setRefreshToken(data.refresh_token);
+                }
                 return true;
             }
             return false;
@@ -129,7 +132,15 @@ class ApiClient {
     }
 
     async logout() {
-        // await this.request('/auth/logout', { method: 'POST' }).catch(() => {}); // Optional
+        const refreshToken = localStorage.getItem('refresh_token');
+        await fetch(`${this.baseUrl}/auth/logout`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${this.getToken()}`
+            },
+            body: JSON.stringify({ refresh_token: refreshToken })
+        }).catch(() => {});
         this.clearAuth();
     }
 
@@ -53,8 +53,8 @@ class AuthManager {
         }
     }
 
-    logout() {
-        api.logout();
+    async logout() {
+        await api.logout();
         window.location.href = '/index.html';
     }
 }
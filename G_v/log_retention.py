@@ -0,0 +1,22 @@
+"""
+Log retention job: create upcoming partitions, roll finished months out of
+emulated hot tables and archive months past LOG_RETENTION_MONTHS.
+Run daily (e.g. from cron): python log_retention.py
+"""
+from database import get_db_context
+from services.log_partition_service import LogPartitionService
+
+
+def run_log_retention():
+    with get_db_context() as db:
+        service = LogPartitionService(db)
+        for name in service.ensure_partitions():
+            print(f"Created partition {name}")
+        for name, count in service.rollover().items():
+            print(f"Rolled {count} rows into {name}")
+        for path in service.archive_cold():
+            print(f"Archived {path}")
+
+
+if __name__ == "__main__":
+    run_log_retention()
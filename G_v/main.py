@@ -1,12 +1,22 @@
 """
 IHORMS Main Application
 """
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+import math
 import time
 
 from config import settings
-from database import engine
+from database import engine, read_your_writes, READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_HEADER
+from auth.dependencies import get_super_admin, Principal
+from auth.jwt_handler import token_cache
+from auth.principal_cache import principal_cache
+from auth.revocation import token_revocation_store
+from services.schedule_cache import schedule_cache
+from utils.password_hasher import password_hasher
+from utils.audit import audit_logger
+from utils.pool_telemetry import pool_telemetry, current_request_scope, current_route
+from utils.query_budget import track_queries, check_budget
 from models import Base
 from routers import (
     auth, super_admin, org_admin, branch_admin, 
@@ -32,6 +42,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("shutdown")
+def flush_audit_log():
+    # Write out any audit rows still queued by the write-behind pipeline
+    audit_logger.shutdown()
+
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    # Lets pool telemetry attribute connection hold time to the matched route
+    token = current_request_scope.set(request.scope)
+    try:
+        if not settings.QUERY_BUDGET_ENABLED:
+            return await call_next(request)
+        with track_queries() as stats:
+            response = await call_next(request)
+        response.headers["X-DB-Queries"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.db_time_ms:.1f}"
+        problems = check_budget(current_route(), stats)
+        if problems:
+            response.headers["X-Query-Budget-Warning"] = problems[0][:200]
+        return response
+    finally:
+        current_request_scope.reset(token)
+
+@app.middleware("http")
+async def carry_read_your_writes(request: Request, call_next):
+    # Hand the primary pin of a writing request back to the client so its next
+    # reads stay on the primary whichever worker serves them
+    with read_your_writes.track_request() as pin:
+        response = await call_next(request)
+    if "until" in pin:
+        until = f"{pin['until']:.3f}"
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE, until, max_age=math.ceil(read_your_writes.seconds),
+            httponly=True, samesite="lax"
+        )
+        response.headers[READ_YOUR_WRITES_HEADER] = until
+    return response
+
 # Include Routers
 app.include_router(auth.router)
 app.include_router(super_admin.router)
@@ -53,6 +101,23 @@ def root():
         "timestamp": time.time()
     }
 
+@app.get("/metrics/auth")
+def auth_metrics(admin: Principal = Depends(get_super_admin)):
+    return {
+        "jwt_verify_cache": token_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "token_revocation": token_revocation_store.stats(),
+        "password_hashing": password_hasher.stats()
+    }
+
+@app.get("/metrics/db")
+def db_metrics(admin: Principal = Depends(get_super_admin)):
+    return {name: telemetry.stats() for name, telemetry in pool_telemetry.items()}
+
+@app.get("/metrics/cache")
+def cache_metrics(admin: Principal = Depends(get_super_admin)):
+    return {"doctor_schedule": schedule_cache.stats()}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
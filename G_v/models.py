@@ -2,9 +2,10 @@
 IHORMS Database Models
 Multi-tenant Hospital Management System
 """
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from sqlalchemy import (
-    Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, Text, Date, Time, JSON, Enum as SQLEnum, Index
+    Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, Text, Date, Time, JSON, Enum as SQLEnum, Index,
+    text
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -31,6 +32,30 @@ class AppointmentStatus(enum.Enum):
     CANCELLED = "cancelled"
     ADMITTED = "admitted"
 
+# Statuses that hold a doctor's time slot; the literal predicate matches the
+# partial unique index so ON CONFLICT can infer it
+ACTIVE_APPOINTMENT_STATUSES = (AppointmentStatus.SCHEDULED, AppointmentStatus.ACCEPTED)
+ACTIVE_SLOT_PREDICATE = text(
+    "status IN (%s)" % ", ".join(f"'{status.name}'" for status in ACTIVE_APPOINTMENT_STATUSES)
+)
+
+# Consultation length of rows inserted without one (services always pass it)
+DEFAULT_APPOINTMENT_MINUTES = 15
+
+
+def appointment_end(start: time, minutes: int) -> time:
+    """End of a booking; one running past midnight is capped at the end of the day"""
+    end = datetime.combine(datetime.min, start) + timedelta(minutes=minutes)
+    return end.time() if end.date() == datetime.min.date() else time.max
+
+
+def _default_end_time(context):
+    params = context.get_current_parameters()
+    start = params.get("appointment_time")
+    if start is None:
+        return None
+    return appointment_end(start, params.get("duration_minutes") or DEFAULT_APPOINTMENT_MINUTES)
+
 class AdmissionStatus(enum.Enum):
     ADMITTED = "admitted"
     DISCHARGED = "discharged"
@@ -107,6 +132,7 @@ class User(Base):
     gender = Column(String(10))
     is_active = Column(Boolean, default=True)
     is_deleted = Column(Boolean, default=False)
+    token_version = Column(Integer, default=0, nullable=False)
     last_login = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -186,6 +212,8 @@ class Doctor(Base):
     experience_years = Column(Integer)
     license_number = Column(String(50), unique=True)
     consultation_fee = Column(Numeric(10, 2))
+    # Default consultation length; the specialty default applies when unset
+    appointment_minutes = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User", foreign_keys=[user_id])
@@ -220,12 +248,19 @@ class Room(Base):
     room_type = Column(SQLEnum(RoomType), nullable=False)
     floor = Column(Integer)
     capacity = Column(Integer, default=1)
+    occupied_beds = Column(Integer, default=0, server_default='0', nullable=False)
     is_available = Column(Boolean, default=True)
+    # Manual closure; kept apart from is_available so a discharge never reopens it
+    closed_by_staff = Column(Boolean, default=False, server_default='0', nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     branch = relationship("Branch", back_populates="rooms")
     appointments = relationship("Appointment", back_populates="room")
 
+    __table_args__ = (
+        Index('idx_room_branch_type_available', 'branch_id', 'room_type', 'is_available'),
+    )
+
 class Equipment(Base):
     __tablename__ = 'equipment'
     id = Column(Integer, primary_key=True)
@@ -244,9 +279,16 @@ class Appointment(Base):
     id = Column(Integer, primary_key=True)
     patient_id = Column(Integer, ForeignKey('patients.id'), nullable=False)
     doctor_id = Column(Integer, ForeignKey('doctors.id'), nullable=False)
+    # Copy of the patient's branch so branch listings need no join through patients
+    branch_id = Column(Integer, ForeignKey('branches.id'))
     room_id = Column(Integer, ForeignKey('rooms.id'))
     appointment_date = Column(Date, nullable=False)
     appointment_time = Column(Time, nullable=False)
+    duration_minutes = Column(
+        Integer, nullable=False, default=DEFAULT_APPOINTMENT_MINUTES, server_default=str(DEFAULT_APPOINTMENT_MINUTES)
+    )
+    # appointment_time + duration, stored so overlap checks are a plain range predicate
+    end_time = Column(Time, default=_default_end_time)
     status = Column(SQLEnum(AppointmentStatus), default=AppointmentStatus.SCHEDULED)
     chief_complaint = Column(Text)
     notes = Column(Text)
@@ -288,6 +330,17 @@ class Appointment(Base):
     __table_args__ = (
         Index('idx_appointment_date_doctor', 'appointment_date', 'doctor_id'),
         Index('idx_appointment_patient', 'patient_id'),
+        # Keyset listings order by (appointment_date, appointment_time, id)
+        Index('idx_appointment_branch_date', 'branch_id', 'appointment_date', 'appointment_time', 'id'),
+        Index('idx_appointment_doctor_date', 'doctor_id', 'appointment_date', 'appointment_time', 'id'),
+        Index('idx_appointment_patient_date', 'patient_id', 'appointment_date', 'appointment_time', 'id'),
+        # One active booking per doctor and slot, enforced by the database
+        Index(
+            'uq_appointment_doctor_slot', 'doctor_id', 'appointment_date', 'appointment_time',
+            unique=True,
+            postgresql_where=ACTIVE_SLOT_PREDICATE,
+            sqlite_where=ACTIVE_SLOT_PREDICATE
+        ),
     )
 
 class Admission(Base):
@@ -512,10 +565,17 @@ class PatientAccessLog(Base):
     access_type = Column(String(50))
     access_reason = Column(Text)
     ip_address = Column(String(50))
-    accessed_at = Column(DateTime, default=datetime.utcnow)
+    accessed_at = Column(DateTime, default=datetime.utcnow)  # First access in the window
+    last_accessed_at = Column(DateTime)
+    access_count = Column(Integer, default=1, server_default='1', nullable=False)
     
     patient = relationship("Patient", back_populates="access_logs")
 
+    __table_args__ = (
+        Index('idx_access_log_accessed_at', 'accessed_at'),
+        Index('idx_access_patient_accessed', 'patient_id', 'accessed_at', 'id'),
+    )
+
 class AuditLog(Base):
     __tablename__ = 'audit_logs'
     id = Column(Integer, primary_key=True)
@@ -531,6 +591,23 @@ class AuditLog(Base):
 
     __table_args__ = (
         Index('idx_audit_user_created', 'user_id', 'created_at'),
+        Index('idx_audit_created_id', 'created_at', 'id'),
+        Index('idx_audit_entity_created', 'entity_type', 'entity_id', 'created_at', 'id'),
+        Index('idx_audit_action_created', 'action', 'created_at', 'id'),
+    )
+
+class RevokedToken(Base):
+    __tablename__ = 'revoked_tokens'
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(64), unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'))
+    token_type = Column(String(20))
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('idx_revoked_token_revoked_at', 'revoked_at'),
+        Index('idx_revoked_token_expires_at', 'expires_at'),
     )
 
 class SystemEvent(Base):
@@ -544,4 +621,5 @@ class SystemEvent(Base):
 
     __table_args__ = (
         Index('idx_event_type_created', 'event_type', 'created_at'),
+        Index('idx_event_created_id', 'created_at', 'id'),
     )
@@ -467,6 +467,7 @@ class DataPopulator:
                 appointment = Appointment(
                     patient_id=patient.id,
                     doctor_id=doctor.id,
+                    branch_id=patient.branch_id,
                     room_id=room.id,
                     appointment_date=visit_date.date(),
                     appointment_time=time(hour=random.randint(9, 17), minute=random.choice([0, 15, 30, 45])),
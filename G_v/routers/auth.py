@@ -2,21 +2,28 @@
 Authentication Router
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from datetime import timedelta
+from typing import Optional
 
 from database import get_db
-from schemas.auth import LoginRequest, LoginResponse, UserBasicInfo
+from schemas.auth import (
+    LoginRequest, LoginResponse, UserBasicInfo,
+    RefreshTokenRequest, TokenResponse, LogoutRequest
+)
 from services.user_service import UserService
 from auth.jwt_handler import jwt_handler
+from auth.dependencies import security, get_current_principal, Principal
+from auth.revocation import token_revocation_store
 from config import settings
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/login", response_model=LoginResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
+async def login(data: LoginRequest, db: Session = Depends(get_db)):
     user_service = UserService(db)
-    user = user_service.authenticate_user(data.email, data.password)
+    user = await user_service.authenticate_user_async(data.email, data.password)
     
     if not user:
         raise HTTPException(
@@ -26,8 +33,8 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
     
     # Create tokens
     token_data = {"sub": str(user.id), "role": user.role.value}
-    access_token = jwt_handler.create_access_token(data=token_data)
-    refresh_token = jwt_handler.create_refresh_token(data=token_data)
+    access_token = jwt_handler.create_access_token(data=token_data, user=user)
+    refresh_token = jwt_handler.create_refresh_token(data=token_data, user=user)
     
     return {
         "access_token": access_token,
@@ -35,3 +42,54 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
         "token_type": "bearer",
         "user": UserBasicInfo.from_orm(user)
     }
+
+
+@router.post("/refresh", response_model=TokenResponse)
+def refresh(data: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access/refresh pair (rotation, no password check)"""
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token"
+    )
+    payload = jwt_handler.verify_token(data.refresh_token, token_type="refresh")
+    if not payload or not payload.get("jti") or not payload.get("sub"):
+        raise invalid
+    
+    if token_revocation_store.is_revoked(db, payload["jti"]):
+        raise invalid
+    
+    user = UserService(db).get_user_by_id(int(payload["sub"]))
+    if not user or not user.is_active:
+        raise invalid
+    if payload.get("ver", user.token_version or 0) != (user.token_version or 0):
+        raise invalid
+    
+    # Single use: a concurrent refresh with the same token loses the insert race
+    if not token_revocation_store.revoke_payload(db, payload):
+        raise invalid
+    
+    token_data = {"sub": str(user.id), "role": user.role.value}
+    return {
+        "access_token": jwt_handler.create_access_token(data=token_data, user=user),
+        "refresh_token": jwt_handler.create_refresh_token(data=token_data, user=user),
+        "token_type": "bearer"
+    }
+
+
+@router.post("/logout")
+def logout(
+    data: Optional[LogoutRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Revoke the presented access token and, optionally, its refresh token"""
+    payload = jwt_handler.verify_token(credentials.credentials)
+    token_revocation_store.revoke_payload(db, payload)
+    
+    if data and data.refresh_token:
+        refresh_payload = jwt_handler.verify_token(data.refresh_token, token_type="refresh")
+        if refresh_payload and refresh_payload.get("sub") == str(principal.id):
+            token_revocation_store.revoke_payload(db, refresh_payload)
+    
+    return {"message": "Logged out successfully"}
@@ -155,7 +155,7 @@ def approve_discharge(
     if user.role != UserRole.DOCTOR:
         raise HTTPException(status_code=403, detail="Only doctors can approve discharge")
     
-    from models import Admission, AdmissionStatus, Room
+    from models import Admission, AdmissionStatus
     admission = db.query(Admission).filter(Admission.id == admission_id).first()
     if not admission:
         raise HTTPException(status_code=404, detail="Admission not found")
@@ -169,12 +169,10 @@ def approve_discharge(
         admission.discharge_summary = discharge_summary
         admission.discharge_approved_by = user.id
         
-        # Free up the room
+        # Free up the bed
         if admission.room_id:
-            room = db.query(Room).filter(Room.id == admission.room_id).first()
-            if room:
-                room.is_available = True
-                room.current_patient_id = None
+            from services.room_allocator import RoomAllocator
+            RoomAllocator(db).release(admission.room_id)
         
         db.commit()
         return {"status": "success", "message": "Patient discharged successfully"}
@@ -1,9 +1,11 @@
 """
 Branch Admin Router
 """
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date, datetime, time, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database import get_db
 from models import User, UserRole
@@ -11,7 +13,7 @@ from schemas.user import UserCreate, UserResponse, DoctorCreate, NurseCreate
 from schemas.analytics import BranchAnalytics
 from services.user_service import UserService
 from services.analytics_service import AnalyticsService
-from auth.dependencies import get_branch_admin
+from auth.dependencies import get_branch_admin, Principal, get_read_db
 
 router = APIRouter(prefix="/branch-admin", tags=["Branch Admin"])
 
@@ -19,7 +21,7 @@ router = APIRouter(prefix="/branch-admin", tags=["Branch Admin"])
 def add_doctor(
     data: DoctorCreate, 
     db: Session = Depends(get_db),
-    admin: User = Depends(get_branch_admin)
+    admin: Principal = Depends(get_branch_admin)
 ):
     service = UserService(db)
     user, doctor = service.create_doctor(data, admin.organization_id, admin.branch_id, admin.id)
@@ -29,7 +31,7 @@ def add_doctor(
 def add_nurse(
     data: NurseCreate, 
     db: Session = Depends(get_db),
-    admin: User = Depends(get_branch_admin)
+    admin: Principal = Depends(get_branch_admin)
 ):
     service = UserService(db)
     user, nurse = service.create_nurse(data, admin.organization_id, admin.branch_id, admin.id)
@@ -39,7 +41,7 @@ def add_nurse(
 def add_receptionist(
     data: UserCreate, 
     db: Session = Depends(get_db),
-    admin: User = Depends(get_branch_admin)
+    admin: Principal = Depends(get_branch_admin)
 ):
     service = UserService(db)
     return service.create_receptionist(data, admin.organization_id, admin.branch_id, admin.id)
@@ -48,7 +50,7 @@ def add_receptionist(
 def add_pharmacy_staff(
     data: UserCreate, 
     db: Session = Depends(get_db),
-    admin: User = Depends(get_branch_admin)
+    admin: Principal = Depends(get_branch_admin)
 ):
     service = UserService(db)
     return service.create_pharmacy_staff(data, admin.organization_id, admin.branch_id, admin.id)
@@ -57,8 +59,8 @@ def add_pharmacy_staff(
 def list_branch_staff(
     page: int = 1,
     page_size: int = 20,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_branch_admin)
+    db: Session = Depends(get_read_db),
+    admin: Principal = Depends(get_branch_admin)
 ):
     service = UserService(db)
     users, total = service.get_staff_by_branch(admin.branch_id, page=page, page_size=page_size)
@@ -66,8 +68,8 @@ def list_branch_staff(
 
 @router.get("/analytics", response_model=BranchAnalytics)
 def get_branch_stats(
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_branch_admin)
+    db: Session = Depends(get_read_db),
+    admin: Principal = Depends(get_branch_admin)
 ):
     service = AnalyticsService(db)
     return service.get_branch_analytics(admin.branch_id)
@@ -76,7 +78,7 @@ def get_branch_stats(
 def disable_staff(
     user_id: int, 
     db: Session = Depends(get_db),
-    admin: User = Depends(get_branch_admin)
+    admin: Principal = Depends(get_branch_admin)
 ):
     service = UserService(db)
     user = service.get_user_by_id(user_id)
@@ -88,26 +90,69 @@ def disable_staff(
 
 @router.get("/access-logs")
 def get_doctor_access_logs(
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_branch_admin)
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    months: int = Query(3, ge=1),
+    db: Session = Depends(get_read_db),
+    admin: Principal = Depends(get_branch_admin)
 ):
+    """Doctor access to this branch's patients, newest first; the last ``months`` months unless dates are given"""
     from models import PatientAccessLog, Patient, User
-    
-    # query logs where patient belongs to this branch and accessed by a doctor
-    results = db.query(PatientAccessLog, User.first_name, User.last_name, Patient.patient_uid)\
-        .join(User, PatientAccessLog.accessed_by == User.id)\
-        .join(Patient, PatientAccessLog.patient_id == Patient.id)\
-        .filter(
+    from services.log_partition_service import LogPartitionService, add_months, month_start
+
+    last_day = end_date or datetime.utcnow().date()
+    end = datetime.combine(last_day + timedelta(days=1), time.min)
+    start = (
+        datetime.combine(start_date, time.min) if start_date
+        else add_months(month_start(datetime.combine(last_day, time.min)), -(months - 1))
+    )
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    def in_branch(archived):
+        # same scoping as ``where`` for archived rows, resolved for just their ids
+        branch_patients = set(db.scalars(select(Patient.id).where(
             Patient.branch_id == admin.branch_id,
-            User.role == UserRole.DOCTOR
-        ).order_by(PatientAccessLog.accessed_at.desc()).limit(100).all()
-        
+            Patient.id.in_({row["patient_id"] for row in archived})
+        )))
+        branch_doctors = set(db.scalars(select(User.id).where(
+            User.role == UserRole.DOCTOR,
+            User.id.in_({row["accessed_by"] for row in archived})
+        )))
+        return [
+            row for row in archived
+            if row["patient_id"] in branch_patients and row["accessed_by"] in branch_doctors
+        ]
+
+    # query logs where patient belongs to this branch and accessed by a doctor,
+    # across the hot table, the month tables rollover moved older rows to and
+    # the archive files of months past retention (only reached when the
+    # window extends that far back)
+    rows = LogPartitionService(db).read(
+        PatientAccessLog.__tablename__, start, end, limit=100,
+        where=lambda source: [
+            source.c.patient_id.in_(select(Patient.id).where(Patient.branch_id == admin.branch_id)),
+            source.c.accessed_by.in_(select(User.id).where(User.role == UserRole.DOCTOR))
+        ],
+        match=in_branch
+    )
+    doctors = {
+        user_id: (first, last) for user_id, first, last in db.query(User.id, User.first_name, User.last_name)
+        .filter(User.id.in_({row["accessed_by"] for row in rows}))
+    }
+    patient_uids = dict(
+        db.query(Patient.id, Patient.patient_uid).filter(Patient.id.in_({row["patient_id"] for row in rows}))
+    )
+
     logs = []
-    for log, dr_first, dr_last, p_uid in results:
+    for row in rows:
+        dr_first, dr_last = doctors[row["accessed_by"]]
         logs.append({
             "doctor_name": f"Dr. {dr_first} {dr_last}",
-            "patient_uid": p_uid, # User requested "patient number", UID is appropriate
-            "accessed_at": log.accessed_at,
-            "access_type": log.access_type
+            "patient_uid": patient_uids[row["patient_id"]], # User requested "patient number", UID is appropriate
+            "accessed_at": row["accessed_at"],
+            "last_accessed_at": row["last_accessed_at"] or row["accessed_at"],
+            "access_count": row["access_count"],
+            "access_type": row["access_type"]
         })
     return logs
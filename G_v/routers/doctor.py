@@ -1,51 +1,66 @@
 """
 Doctor Router
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import date
 
 from database import get_db
 from models import User, Appointment
 from schemas.appointment import (
     AppointmentResponse, AppointmentDetailResponse, 
-    DoctorNotesUpdate, DoctorScheduleResponse
+    DoctorNotesUpdate, DoctorScheduleResponse, AppointmentListParams
 )
 from schemas.clinical import MedicalHistoryResponse, AdmissionResponse
 from schemas.patient import PatientResponse
 from services.appointment_service import AppointmentService
 from services.patient_service import PatientService
-from auth.dependencies import get_doctor
+from services.schedule_cache import CachedPage
+from auth.dependencies import get_doctor, Principal
 
 router = APIRouter(prefix="/doctor", tags=["Doctor"])
 
+
+def cached_response(request: Request, page: CachedPage) -> Response:
+    """Send a cached page, or 304 when the client's ETag is still current"""
+    headers = {"ETag": page.etag, "Cache-Control": "private, no-cache"}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if page.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
+
 @router.get("/appointments", response_model=List[AppointmentResponse])
 def list_assigned_appointments(
-    db: Session = Depends(get_db),
-    doctor: User = Depends(get_doctor)
+    request: Request,
+    params: AppointmentListParams = Depends(AppointmentListParams.from_query),
+    db: Session = Depends(get_db),  # Cache fills must not store a lagging replica's view
+    doctor: Principal = Depends(get_doctor)
 ):
     service = AppointmentService(db)
-    apps, _ = service.get_doctor_appointments(doctor.id)
-    return apps
+    return cached_response(request, service.get_cached_doctor_appointments(doctor.id, **params.filters()))
 
 @router.get("/schedule", response_model=List[AppointmentResponse])
 def get_schedule(
-    schedule_date: date = date.today(),
-    db: Session = Depends(get_db),
-    doctor: User = Depends(get_doctor)
+    request: Request,
+    schedule_date: Optional[date] = None,
+    db: Session = Depends(get_db),  # Cache fills must not store a lagging replica's view
+    doctor: Principal = Depends(get_doctor)
 ):
     service = AppointmentService(db)
-    return service.get_doctor_schedule(doctor.id, schedule_date)
+    page = service.get_cached_doctor_schedule(doctor.id, schedule_date or date.today())
+    return cached_response(request, page)
 
 @router.get("/appointments/{app_id}", response_model=AppointmentDetailResponse)
 def get_appointment_detail(
     app_id: int,
     db: Session = Depends(get_db),
-    doctor: User = Depends(get_doctor)
+    doctor: Principal = Depends(get_doctor)
 ):
     service = AppointmentService(db)
-    app = service.get_appointment_by_id(app_id)
+    app = service.get_appointment_by_id(app_id, profile=AppointmentDetailResponse)
     if not app:
         raise HTTPException(status_code=404, detail="Appointment not found")
     
@@ -58,7 +73,7 @@ def get_appointment_detail(
 def accept_appointment(
     app_id: int, 
     db: Session = Depends(get_db),
-    doctor: User = Depends(get_doctor)
+    doctor: Principal = Depends(get_doctor)
 ):
     service = AppointmentService(db)
     return service.accept_appointment(app_id, doctor.id)
@@ -68,7 +83,7 @@ def add_clinical_notes(
     app_id: int, 
     data: DoctorNotesUpdate,
     db: Session = Depends(get_db),
-    doctor: User = Depends(get_doctor)
+    doctor: Principal = Depends(get_doctor)
 ):
     service = AppointmentService(db)
     return service.add_doctor_notes(app_id, doctor.id, data)
@@ -78,7 +93,7 @@ def admit_patient(
     app_id: int,
     room_type: str = "general_ward",
     db: Session = Depends(get_db),
-    doctor: User = Depends(get_doctor)
+    doctor: Principal = Depends(get_doctor)
 ):
     service = AppointmentService(db)
     return service.admit_patient(app_id, room_type, doctor.id)
@@ -87,8 +102,8 @@ def admit_patient(
 def view_patient_history(
     patient_id: int, 
     reason: str = "Clinical review",
-    db: Session = Depends(get_db),
-    doctor: User = Depends(get_doctor)
+    db: Session = Depends(get_db),  # Writes an access-log row
+    doctor: Principal = Depends(get_doctor)
 ):
     service = PatientService(db)
     return service.get_patient_medical_history(patient_id, doctor.id, reason)
@@ -97,7 +112,7 @@ def view_patient_history(
 def find_patient_by_uid(
     uid: str, 
     db: Session = Depends(get_db),
-    doctor: User = Depends(get_doctor)
+    doctor: Principal = Depends(get_doctor)
 ):
     service = PatientService(db)
     patient = service.get_patient_by_uid(uid)
@@ -108,7 +123,7 @@ def find_patient_by_uid(
 @router.get("/discharge-requests", response_model=List[AdmissionResponse])
 def get_discharge_requests(
     db: Session = Depends(get_db),
-    doctor: User = Depends(get_doctor)
+    doctor: Principal = Depends(get_doctor)
 ):
     from models import Admission, AdmissionStatus, Doctor as DoctorModel
     
@@ -1,34 +1,38 @@
 """
 Nurse Router
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from typing import List
 
 from database import get_db
 from models import User
 from schemas.clinical import TelemetryCreate, TelemetryResponse, RoomResponse, AdmissionResponse
-from schemas.appointment import AppointmentResponse
+from schemas.appointment import AppointmentResponse, AppointmentListParams
 from services.clinical_service import ClinicalService
 from services.appointment_service import AppointmentService
-from auth.dependencies import get_nurse
+from auth.dependencies import get_nurse, Principal, get_read_db
 
 router = APIRouter(prefix="/nurse", tags=["Nurse"])
 
 @router.get("/appointments", response_model=List[AppointmentResponse])
 def view_branch_appointments(
-    db: Session = Depends(get_db),
-    nurse: User = Depends(get_nurse)
+    response: Response,
+    params: AppointmentListParams = Depends(AppointmentListParams.from_query),
+    db: Session = Depends(get_read_db),
+    nurse: Principal = Depends(get_nurse)
 ):
     service = AppointmentService(db)
-    apps, _ = service.get_branch_appointments(nurse.branch_id)
+    apps, next_cursor = service.get_branch_appointments(nurse.branch_id, **params.filters())
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return apps
 
 @router.post("/telemetry", response_model=TelemetryResponse)
 def record_vitals(
     data: TelemetryCreate, 
     db: Session = Depends(get_db),
-    nurse: User = Depends(get_nurse)
+    nurse: Principal = Depends(get_nurse)
 ):
     service = ClinicalService(db)
     return service.add_telemetry(data, nurse.id)
@@ -36,7 +40,7 @@ def record_vitals(
 @router.get("/telemetry/active-alerts")
 def get_alerts(
     db: Session = Depends(get_db),
-    nurse: User = Depends(get_nurse)
+    nurse: Principal = Depends(get_nurse)
 ):
     # This would involve a websocket or polling in a real app
     # For now, just a basic filter
@@ -45,8 +49,8 @@ def get_alerts(
 
 @router.get("/rooms", response_model=List[RoomResponse])
 def list_ward_rooms(
-    db: Session = Depends(get_db),
-    nurse: User = Depends(get_nurse)
+    db: Session = Depends(get_read_db),
+    nurse: Principal = Depends(get_nurse)
 ):
     from models import Room, Appointment, AppointmentStatus
     rooms = db.query(Room).filter(Room.branch_id == nurse.branch_id).all()
@@ -69,8 +73,8 @@ def list_ward_rooms(
 
 @router.get("/admissions", response_model=List[AdmissionResponse])
 def get_admitted_patients(
-    db: Session = Depends(get_db),
-    nurse: User = Depends(get_nurse)
+    db: Session = Depends(get_read_db),
+    nurse: Principal = Depends(get_nurse)
 ):
     from models import Admission, AdmissionStatus, Patient
     # Get admissions for patients in the nurse's branch
@@ -12,7 +12,7 @@ from schemas.organization import BranchCreate, BranchResponse
 from schemas.analytics import OrganizationAnalytics
 from services.user_service import UserService
 from services.analytics_service import AnalyticsService
-from auth.dependencies import get_org_admin
+from auth.dependencies import get_org_admin, Principal, get_read_db
 
 router = APIRouter(prefix="/org-admin", tags=["Organization Admin"])
 
@@ -20,7 +20,7 @@ router = APIRouter(prefix="/org-admin", tags=["Organization Admin"])
 def create_branch(
     data: BranchCreate, 
     db: Session = Depends(get_db),
-    admin: User = Depends(get_org_admin)
+    admin: Principal = Depends(get_org_admin)
 ):
     branch = Branch(
         organization_id=admin.organization_id,
@@ -38,8 +38,8 @@ def create_branch(
 
 @router.get("/branches", response_model=List[BranchResponse])
 def list_branches(
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_org_admin)
+    db: Session = Depends(get_read_db),
+    admin: Principal = Depends(get_org_admin)
 ):
     return db.query(Branch).filter(Branch.organization_id == admin.organization_id).all()
 
@@ -47,8 +47,8 @@ def list_branches(
 def list_staff(
     page: int = 1,
     page_size: int = 20,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_org_admin)
+    db: Session = Depends(get_read_db),
+    admin: Principal = Depends(get_org_admin)
 ):
     query = db.query(User).filter(
         User.organization_id == admin.organization_id,
@@ -63,15 +63,15 @@ def add_dean(
     data: UserCreate, 
     branch_id: int,
     db: Session = Depends(get_db),
-    admin: User = Depends(get_org_admin)
+    admin: Principal = Depends(get_org_admin)
 ):
     service = UserService(db)
     return service.create_branch_admin(data, admin.organization_id, branch_id, admin.id)
 
 @router.get("/analytics", response_model=OrganizationAnalytics)
 def get_org_stats(
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_org_admin)
+    db: Session = Depends(get_read_db),
+    admin: Principal = Depends(get_org_admin)
 ):
     service = AnalyticsService(db)
     return service.get_organization_analytics(admin.organization_id)
@@ -80,7 +80,7 @@ def get_org_stats(
 def reset_staff_password(
     user_id: int, 
     db: Session = Depends(get_db),
-    admin: User = Depends(get_org_admin)
+    admin: Principal = Depends(get_org_admin)
 ):
     service = UserService(db)
     user = service.get_user_by_id(user_id)
@@ -94,7 +94,7 @@ def reset_staff_password(
 def toggle_staff_access(
     user_id: int, 
     db: Session = Depends(get_db),
-    admin: User = Depends(get_org_admin)
+    admin: Principal = Depends(get_org_admin)
 ):
     service = UserService(db)
     user = service.get_user_by_id(user_id)
@@ -110,8 +110,8 @@ def toggle_staff_access(
 @router.get("/billing-analytics")
 def get_billing_analytics(
     months: int = 6,
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_org_admin)
+    db: Session = Depends(get_read_db),
+    admin: Principal = Depends(get_org_admin)
 ):
     """Get monthly billing aggregation for org admin dashboard"""
     from models import Billing, Patient
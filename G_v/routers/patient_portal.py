@@ -1,18 +1,18 @@
 """
 Patient Portal Router
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import date, time
 
 from database import get_db
 from models import User, Patient
-from schemas.appointment import AppointmentResponse
+from schemas.appointment import AppointmentResponse, AppointmentListParams
 from schemas.clinical import MedicalHistoryResponse
 from services.appointment_service import AppointmentService
 from services.patient_service import PatientService
-from auth.dependencies import get_patient_user
+from auth.dependencies import get_patient_user, get_read_db
 
 router = APIRouter(prefix="/patient-portal", tags=["Patient Portal"])
 
@@ -38,7 +38,7 @@ def get_my_profile(
 
 @router.get("/history")
 def get_my_medical_history(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db),  # Writes an access-log row
     user: User = Depends(get_patient_user)
 ):
     service = PatientService(db)
@@ -51,7 +51,7 @@ def get_my_medical_history(
 
 @router.get("/doctors")
 def list_available_doctors(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: User = Depends(get_patient_user)
 ):
     from models import UserRole, Doctor
@@ -93,7 +93,9 @@ def recommend_doctors_by_symptoms(
 
 @router.get("/appointments", response_model=List[AppointmentResponse])
 def list_my_appointments(
-    db: Session = Depends(get_db),
+    response: Response,
+    params: AppointmentListParams = Depends(AppointmentListParams.from_query),
+    db: Session = Depends(get_read_db),
     user: User = Depends(get_patient_user)
 ):
     ps = PatientService(db)
@@ -102,7 +104,9 @@ def list_my_appointments(
         raise HTTPException(status_code=404, detail="Patient profile not found")
         
     service = AppointmentService(db)
-    apps, _ = service.get_patient_appointments(patient.id)
+    apps, next_cursor = service.get_patient_appointments(patient.id, **params.filters())
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return apps
 
 @router.post("/appointments/book")
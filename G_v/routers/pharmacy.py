@@ -13,15 +13,15 @@ from schemas.inventory import (
     PharmacyOrderCreate, PharmacyOrderResponse
 )
 from services.inventory_service import InventoryService
-from auth.dependencies import get_pharmacy_staff
+from auth.dependencies import get_pharmacy_staff, Principal, get_read_db
 
 router = APIRouter(prefix="/pharmacy", tags=["Pharmacy"])
 
 @router.get("/inventory", response_model=List[InventoryResponse])
 def list_stock(
     low_stock: bool = False,
-    db: Session = Depends(get_db),
-    staff: User = Depends(get_pharmacy_staff)
+    db: Session = Depends(get_read_db),
+    staff: Principal = Depends(get_pharmacy_staff)
 ):
     service = InventoryService(db)
     items, _ = service.get_inventory_by_branch(staff.branch_id, low_stock_only=low_stock)
@@ -31,7 +31,7 @@ def list_stock(
 def add_stock(
     data: InventoryCreate, 
     db: Session = Depends(get_db),
-    staff: User = Depends(get_pharmacy_staff)
+    staff: Principal = Depends(get_pharmacy_staff)
 ):
     service = InventoryService(db)
     return service.add_inventory_item(staff.branch_id, data, staff.id)
@@ -41,7 +41,7 @@ def restock_item(
     item_id: int,
     quantity: int,
     db: Session = Depends(get_db),
-    staff: User = Depends(get_pharmacy_staff)
+    staff: Principal = Depends(get_pharmacy_staff)
 ):
     service = InventoryService(db)
     return service.restock_item(item_id, quantity, staff.id)
@@ -50,15 +50,15 @@ def restock_item(
 def fulfill_prescription(
     data: PharmacyOrderCreate, 
     db: Session = Depends(get_db),
-    staff: User = Depends(get_pharmacy_staff)
+    staff: Principal = Depends(get_pharmacy_staff)
 ):
     service = InventoryService(db)
     return service.create_order(staff.branch_id, data, staff.id)
 
 @router.get("/orders/pending", response_model=List[PharmacyOrderResponse])
 def list_pending_orders(
-    db: Session = Depends(get_db),
-    staff: User = Depends(get_pharmacy_staff)
+    db: Session = Depends(get_read_db),
+    staff: Principal = Depends(get_pharmacy_staff)
 ):
     return db.query(PharmacyOrder).filter(
         PharmacyOrder.status == OrderStatus.PENDING
@@ -68,7 +68,7 @@ def list_pending_orders(
 def fulfill_order(
     order_id: int,
     db: Session = Depends(get_db),
-    staff: User = Depends(get_pharmacy_staff)
+    staff: Principal = Depends(get_pharmacy_staff)
 ):
     order = db.query(PharmacyOrder).filter(PharmacyOrder.id == order_id).first()
     if not order:
@@ -83,7 +83,7 @@ def fulfill_order(
 @router.get("/insights")
 def get_ai_insights(
     db: Session = Depends(get_db),
-    staff: User = Depends(get_pharmacy_staff)
+    staff: Principal = Depends(get_pharmacy_staff)
 ):
     import random
     from datetime import timedelta
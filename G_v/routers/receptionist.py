@@ -1,35 +1,46 @@
 """
 Receptionist Router
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database import get_db
 from models import User
 from schemas.patient import PatientCreate, PatientResponse, PatientSearchResult
-from schemas.appointment import AppointmentCreate, AppointmentResponse, AppointmentReschedule
+from schemas.appointment import (
+    AppointmentCreate, AppointmentResponse, AppointmentReschedule, AppointmentListParams,
+    BulkAppointmentCreate, BulkBookingResponse
+)
 from services.patient_service import PatientService
 from services.appointment_service import AppointmentService
 from datetime import date
-from auth.dependencies import get_receptionist
+from auth.dependencies import get_receptionist, Principal, get_read_db
 
 router = APIRouter(prefix="/receptionist", tags=["Receptionist"])
 
 @router.get("/appointments", response_model=List[AppointmentResponse])
 def list_appointments(
-    date: str = date.today().isoformat(),
-    db: Session = Depends(get_db),
-    staff: User = Depends(get_receptionist)
+    response: Response,
+    day: Optional[date] = Query(None, alias="date"),
+    params: AppointmentListParams = Depends(AppointmentListParams.from_query),
+    db: Session = Depends(get_read_db),
+    staff: Principal = Depends(get_receptionist)
 ):
+    """Day view (today by default); start_date/end_date select a range instead"""
+    filters = params.filters()
+    if not (params.start_date or params.end_date):
+        filters["start_date"] = filters["end_date"] = day or date.today()
     service = AppointmentService(db)
-    apps, _ = service.get_branch_appointments(staff.branch_id)
-    return [a for a in apps if str(a.appointment_date) == date]
+    apps, next_cursor = service.get_branch_appointments(staff.branch_id, **filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return apps
 
 @router.get("/doctors")
 def list_branch_doctors(
-    db: Session = Depends(get_db),
-    staff: User = Depends(get_receptionist)
+    db: Session = Depends(get_read_db),
+    staff: Principal = Depends(get_receptionist)
 ):
     from models import UserRole, Doctor
     doctors = db.query(User, Doctor).join(Doctor, User.id == Doctor.user_id).filter(
@@ -48,11 +59,38 @@ def list_branch_doctors(
         } for u, d in doctors
     ]
 
+@router.get("/doctors/availability")
+def doctor_availability(
+    date: date,
+    doctor_id: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    staff: Principal = Depends(get_receptionist)
+):
+    """Open slots for the branch's doctors (or one doctor) on a date"""
+    service = AppointmentService(db)
+    return service.get_free_slots(staff.branch_id, date, doctor_id)
+
+@router.get("/slots/search")
+def search_open_slots(
+    start_date: Optional[date] = None,
+    days: int = 7,
+    limit: int = 10,
+    symptoms: Optional[str] = None,
+    specialization: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    staff: Principal = Depends(get_receptionist)
+):
+    """Next free (doctor, date, time) slots in the branch, optionally for symptoms or a specialty"""
+    from services.slot_search_service import SlotSearchService
+
+    service = SlotSearchService(db)
+    return service.search(staff.branch_id, start_date, days, limit, symptoms, specialization)
+
 @router.get("/doctors/recommend")
 def recommend_doctors_for_symptoms(
     symptoms: str,
     db: Session = Depends(get_db),
-    staff: User = Depends(get_receptionist)
+    staff: Principal = Depends(get_receptionist)
 ):
     """Get AI-recommended doctors based on patient symptoms"""
     from services.doctor_recommendation_service import DoctorRecommendationService
@@ -73,7 +111,7 @@ def recommend_doctors_for_symptoms(
 def register_patient(
     data: PatientCreate, 
     db: Session = Depends(get_db),
-    staff: User = Depends(get_receptionist)
+    staff: Principal = Depends(get_receptionist)
 ):
     service = PatientService(db)
     return service.create_patient(data, staff.organization_id, staff.branch_id, staff.id)
@@ -83,7 +121,7 @@ def search_patients(
     query: str = None, 
     page: int = 1,
     db: Session = Depends(get_db),
-    staff: User = Depends(get_receptionist)
+    staff: Principal = Depends(get_receptionist)
 ):
     service = PatientService(db)
     items, total = service.search_patients(staff.branch_id, query, page)
@@ -93,17 +131,27 @@ def search_patients(
 def schedule_appointment(
     data: AppointmentCreate, 
     db: Session = Depends(get_db),
-    staff: User = Depends(get_receptionist)
+    staff: Principal = Depends(get_receptionist)
 ):
     service = AppointmentService(db)
     return service.create_appointment(data, staff.branch_id, staff.id)
 
+@router.post("/appointments/bulk", response_model=BulkBookingResponse)
+def bulk_schedule_appointments(
+    data: BulkAppointmentCreate,
+    db: Session = Depends(get_db),
+    staff: Principal = Depends(get_receptionist)
+):
+    """Book a batch or weekly series in one transaction; unbookable items come back as conflicts"""
+    service = AppointmentService(db)
+    return service.bulk_create_appointments(data.items, staff.branch_id, staff.id)
+
 @router.post("/appointments/{app_id}/reschedule")
 def reschedule(
     app_id: int, 
     data: AppointmentReschedule,
     db: Session = Depends(get_db),
-    staff: User = Depends(get_receptionist)
+    staff: Principal = Depends(get_receptionist)
 ):
     service = AppointmentService(db)
     return service.reschedule_appointment(app_id, data, staff.id)
@@ -112,7 +160,7 @@ def reschedule(
 def confirm_appointment(
     app_id: int,
     db: Session = Depends(get_db),
-    staff: User = Depends(get_receptionist)
+    staff: Principal = Depends(get_receptionist)
 ):
     service = AppointmentService(db)
     return service.confirm_appointment(app_id, staff.id)
@@ -10,7 +10,7 @@ from models import Organization, User, UserRole
 from schemas.organization import OrganizationCreate, OrganizationResponse
 from schemas.analytics import PlatformAnalytics
 from services.analytics_service import AnalyticsService
-from auth.dependencies import get_super_admin
+from auth.dependencies import get_super_admin, Principal, get_read_db
 from utils.helpers import hash_password
 
 router = APIRouter(prefix="/super-admin", tags=["Super Admin"])
@@ -19,7 +19,7 @@ router = APIRouter(prefix="/super-admin", tags=["Super Admin"])
 def create_organization(
     data: OrganizationCreate, 
     db: Session = Depends(get_db),
-    admin: User = Depends(get_super_admin)
+    admin: Principal = Depends(get_super_admin)
 ):
     # Check if exists
     if db.query(Organization).filter(Organization.name == data.name).first():
@@ -51,15 +51,15 @@ def create_organization(
 
 @router.get("/organizations", response_model=List[OrganizationResponse])
 def list_organizations(
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_super_admin)
+    db: Session = Depends(get_read_db),
+    admin: Principal = Depends(get_super_admin)
 ):
     return db.query(Organization).all()
 
 @router.get("/analytics", response_model=PlatformAnalytics)
 def get_platform_stats(
-    db: Session = Depends(get_db),
-    admin: User = Depends(get_super_admin)
+    db: Session = Depends(get_read_db),
+    admin: Principal = Depends(get_super_admin)
 ):
     service = AnalyticsService(db)
     return service.get_platform_analytics()
@@ -68,7 +68,7 @@ def get_platform_stats(
 def toggle_organization(
     org_id: int, 
     db: Session = Depends(get_db),
-    admin: User = Depends(get_super_admin)
+    admin: Principal = Depends(get_super_admin)
 ):
     org = db.query(Organization).filter(Organization.id == org_id).first()
     if not org:
@@ -55,6 +55,8 @@ class PatientAccessLogResponse(BaseModel):
     access_reason: Optional[str]
     ip_address: Optional[str]
     accessed_at: datetime
+    last_accessed_at: Optional[datetime] = None
+    access_count: int = 1
     
     class Config:
         from_attributes = True
@@ -1,9 +1,10 @@
 """
 Appointment Schemas
 """
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import ClassVar, Optional, List, Tuple
 from datetime import date, time, datetime
+from fastapi import Query
 from schemas.clinical import TelemetryResponse
 
 
@@ -16,6 +17,30 @@ class AppointmentBase(BaseModel):
 class AppointmentCreate(AppointmentBase):
     patient_id: int
     doctor_id: Optional[int] = None  # Optional - receptionist can assign
+    specialization: Optional[str] = None  # Preferred specialty when auto-assigning
+    duration_minutes: Optional[int] = Field(None, ge=5, le=480)  # Doctor or specialty default when omitted
+
+
+class BulkAppointmentItem(AppointmentCreate):
+    repeat_weeks: int = Field(1, ge=1, le=52)  # Weekly occurrences, starting on appointment_date
+
+
+class BulkAppointmentCreate(BaseModel):
+    items: List[BulkAppointmentItem] = Field(..., min_length=1)
+
+
+class BulkBookingConflict(BaseModel):
+    index: int  # Position of the item in the request
+    appointment_date: date
+    appointment_time: time
+    doctor_id: Optional[int]
+    reason: str
+
+
+class BulkBookingResponse(BaseModel):
+    created: int
+    appointment_ids: List[int]
+    conflicts: List[BulkBookingConflict]
 
 
 class AppointmentUpdate(BaseModel):
@@ -30,6 +55,7 @@ class AppointmentReschedule(BaseModel):
     new_date: date
     new_time: time
     new_doctor_id: Optional[int] = None
+    new_duration_minutes: Optional[int] = Field(None, ge=5, le=480)  # Keeps the current length when omitted
 
 
 class AppointmentResponse(BaseModel):
@@ -44,9 +70,13 @@ class AppointmentResponse(BaseModel):
     room_number: Optional[str]
     appointment_date: date
     appointment_time: time
+    duration_minutes: Optional[int] = None
     status: str
     chief_complaint: Optional[str]
     created_at: datetime
+
+    # Relationships the name/room properties read; services eager-load these
+    load_paths: ClassVar[Tuple[str, ...]] = ("patient.user", "doctor.user", "room")
     
     class Config:
         from_attributes = True
@@ -59,6 +89,33 @@ class AppointmentDetailResponse(AppointmentResponse):
     verdict: Optional[str]
     telemetry: List[TelemetryResponse] = []
 
+    load_paths: ClassVar[Tuple[str, ...]] = AppointmentResponse.load_paths + (
+        "telemetry.nurse.user", "telemetry.equipment"
+    )
+
+
+class AppointmentListParams(BaseModel):
+    """Filters and keyset page for appointment listings (query string)"""
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    statuses: Optional[List[str]] = None
+    cursor: Optional[str] = None
+    limit: Optional[int] = None
+
+    @classmethod
+    def from_query(
+        cls,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[List[str]] = Query(None),
+        cursor: Optional[str] = None,
+        limit: Optional[int] = Query(None, ge=1)
+    ) -> "AppointmentListParams":
+        return cls(start_date=start_date, end_date=end_date, statuses=status, cursor=cursor, limit=limit)
+
+    def filters(self) -> dict:
+        return self.model_dump()
+
 
 class DoctorNotesUpdate(BaseModel):
     notes: str
@@ -36,9 +36,14 @@ class RefreshTokenRequest(BaseModel):
 
 class TokenResponse(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
 
 
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+
 class PasswordResetRequest(BaseModel):
     user_id: int
 
@@ -1,7 +1,7 @@
 """
 Analytics Service - Handles reporting and dashboards
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import datetime, timedelta
@@ -17,38 +17,46 @@ class AnalyticsService:
     def __init__(self, db: Session):
         self.db = db
     
+    def _grouped(self, key, aggregate, source, *joins) -> Dict[Optional[int], Any]:
+        """One GROUP BY query over ``source``: {key: aggregate}"""
+        query = self.db.query(key, aggregate).select_from(source)
+        for target in joins:
+            query = query.join(target)
+        return dict(query.group_by(key).all())
+    
     def get_platform_analytics(self) -> Dict[str, Any]:
-        """Aggregate data for Super Admin"""
-        orgs = self.db.query(Organization).all()
+        """
+        Aggregate data for Super Admin. Each figure is one GROUP BY over its
+        table keyed by organization (appointments and billing through the
+        patient's organization), and the platform totals are sums of those
+        groups, so the query count does not grow with the number of orgs.
+        """
+        orgs = self.db.query(Organization.id, Organization.name, Organization.is_active).order_by(Organization.id).all()
+        users = self._grouped(User.organization_id, func.count(User.id), User)
+        branches = self._grouped(Branch.organization_id, func.count(Branch.id), Branch)
+        patients = self._grouped(Patient.organization_id, func.count(Patient.id), Patient)
+        appointments = self._grouped(Patient.organization_id, func.count(Appointment.id), Appointment, Patient)
+        billing = self._grouped(Patient.organization_id, func.sum(Billing.total_amount), Billing, Patient)
         
-        org_data = []
-        for org in orgs:
-            user_count = self.db.query(User).filter(User.organization_id == org.id).count()
-            branch_count = self.db.query(Branch).filter(Branch.organization_id == org.id).count()
-            appointment_count = self.db.query(Appointment).join(Patient).filter(
-                Patient.organization_id == org.id
-            ).count()
-            
-            billing_total = self.db.query(func.sum(Billing.total_amount)).join(Patient).filter(
-                Patient.organization_id == org.id
-            ).scalar() or 0
-            
-            org_data.append({
+        org_data = [
+            {
                 "id": org.id,
                 "name": org.name,
-                "users": user_count,
-                "branches": branch_count,
-                "appointments": appointment_count,
-                "billing_total": float(billing_total)
-            })
+                "users": users.get(org.id, 0),
+                "branches": branches.get(org.id, 0),
+                "appointments": appointments.get(org.id, 0),
+                "billing_total": float(billing.get(org.id) or 0)
+            }
+            for org in orgs
+        ]
             
         return {
             "total_organizations": len(orgs),
-            "active_organizations": self.db.query(Organization).filter(Organization.is_active == True).count(),
-            "total_branches": self.db.query(Branch).count(),
-            "total_users": self.db.query(User).count(),
-            "total_patients": self.db.query(Patient).count(),
-            "total_appointments": self.db.query(Appointment).count(),
+            "active_organizations": sum(1 for org in orgs if org.is_active),
+            "total_branches": sum(branches.values()),
+            "total_users": sum(users.values()),
+            "total_patients": sum(patients.values()),
+            "total_appointments": sum(appointments.values()),
             "organizations": org_data
         }
     
@@ -1,64 +1,179 @@
 """
 Appointment Service - Handles appointment scheduling and management
 """
+import base64
 from typing import Optional, List, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, literal, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, date, time, timedelta
 
 from models import (
     Appointment, AppointmentStatus, Patient, Doctor, User, Room, 
-    RoomType, MedicalHistory, Severity
+    RoomType, MedicalHistory, Severity, ACTIVE_SLOT_PREDICATE, appointment_end
 )
 from schemas.appointment import (
-    AppointmentCreate, AppointmentUpdate, AppointmentReschedule, DoctorNotesUpdate
+    AppointmentCreate, AppointmentUpdate, AppointmentReschedule, DoctorNotesUpdate,
+    BulkAppointmentItem, AppointmentResponse
 )
+from config import settings
 from utils.exceptions import NotFoundError, ConflictError, ValidationError, ForbiddenError
 from utils.audit import audit_logger
+from utils.eager_loading import loader_options
+from services.async_service import AsyncService
+from services.availability_service import (
+    AvailabilityService, DayAvailability, consultation_minutes, overlapping_bookings
+)
+from services.assignment_strategy import get_assignment_strategy
+from services.room_allocator import RoomAllocator
+from services.schedule_cache import CachedPage, schedule_cache
+
+def encode_appointment_cursor(appointment: Appointment) -> str:
+    key = f"{appointment.appointment_date.isoformat()}|{appointment.appointment_time.isoformat()}|{appointment.id}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_appointment_cursor(cursor: str) -> Tuple[date, time, int]:
+    try:
+        day, at, appointment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return date.fromisoformat(day), time.fromisoformat(at), int(appointment_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError("Invalid cursor")
+
+
+# Dialects whose INSERT ... ON CONFLICT can target the partial slot index
+CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+SLOT_COLUMNS = ["doctor_id", "appointment_date", "appointment_time"]
+# Auto-assignment retries when a concurrent booking wins the chosen doctor's slot
+BOOKING_ATTEMPTS = 3
 
 
 class AppointmentService:
     def __init__(self, db: Session):
         self.db = db
+        self.availability = AvailabilityService(db)
+        self.rooms = RoomAllocator(db)
+    
+    def _profiled(self, query, profile):
+        """Eager-load what ``profile`` (a response schema) will read"""
+        return query.options(*loader_options(Appointment, profile.load_paths)) if profile else query
     
-    def get_appointment_by_id(self, appointment_id: int) -> Optional[Appointment]:
-        return self.db.query(Appointment).filter(Appointment.id == appointment_id).first()
+    def _commit_schedule_change(self, *slots: Tuple[int, date]) -> None:
+        """Commit, then drop the cached schedules of the (doctor_id, date) pairs touched"""
+        self.db.commit()
+        for doctor_id, day in set(slots):
+            schedule_cache.invalidate(doctor_id, day)
+    
+    def get_appointment_by_id(self, appointment_id: int, profile=None) -> Optional[Appointment]:
+        query = self.db.query(Appointment).filter(Appointment.id == appointment_id)
+        return self._profiled(query, profile).first()
+    
+    def lock_doctors(self, *conditions) -> None:
+        """
+        On PostgreSQL, serialize bookings for the matching doctors until
+        commit (FOR NO KEY UPDATE on their rows), so an overlap check and the
+        write that follows it cannot interleave with another transaction's.
+        Other databases here serialize writers themselves.
+        """
+        if self.db.get_bind().dialect.name != "postgresql":
+            return
+        self.db.execute(
+            select(Doctor.id).join(User, User.id == Doctor.user_id).where(*conditions)
+            .with_for_update(of=Doctor, key_share=True)
+        ).all()
+    
+    def insert_booking(self, **values) -> Optional[Appointment]:
+        """
+        Insert an appointment in one statement. Returns ``None`` when the
+        doctor already has an active booking overlapping
+        ``[appointment_time, end_time)``: the row is selected only if no such
+        booking exists, and uq_appointment_doctor_slot still rejects an exact
+        slot taken concurrently, so callers need no availability check.
+        """
+        values.setdefault("duration_minutes", settings.APPOINTMENT_DEFAULT_MINUTES)
+        values.setdefault("end_time", appointment_end(values["appointment_time"], values["duration_minutes"]))
+        overlap = overlapping_bookings(
+            values["doctor_id"], values["appointment_date"], values["appointment_time"], values["end_time"]
+        )
+        dialect_insert = CONFLICT_INSERTS.get(self.db.get_bind().dialect.name)
+        if dialect_insert is None:
+            if self.db.scalar(select(overlap.exists())):
+                return None
+            appointment = Appointment(**values)
+            try:
+                with self.db.begin_nested():
+                    self.db.add(appointment)
+            except IntegrityError:
+                return None
+            return appointment
+        
+        self.lock_doctors(Doctor.id == values["doctor_id"])
+        # INSERT ... SELECT skips column defaults, so fill the ones the row needs
+        now = datetime.utcnow()
+        values = {"status": AppointmentStatus.SCHEDULED, "created_at": now, "updated_at": now, **values}
+        columns = Appointment.__table__.c
+        row = select(*[literal(value, columns[key].type).label(key) for key, value in values.items()])
+        statement = dialect_insert(Appointment).from_select(
+            list(values), row.where(~overlap.exists())
+        ).on_conflict_do_nothing(
+            index_elements=SLOT_COLUMNS, index_where=ACTIVE_SLOT_PREDICATE
+        ).returning(Appointment)
+        return self.db.scalars(statement).first()
     
     def check_doctor_availability(
         self, 
         doctor_id: int, 
         appointment_date: date, 
-        appointment_time: time
+        appointment_time: time,
+        exclude_appointment_id: Optional[int] = None,
+        duration_minutes: Optional[int] = None
     ) -> bool:
-        """Check if doctor is available at the given time"""
-        existing = self.db.query(Appointment).filter(
-            Appointment.doctor_id == doctor_id,
-            Appointment.appointment_date == appointment_date,
-            Appointment.appointment_time == appointment_time,
-            Appointment.status.in_([AppointmentStatus.SCHEDULED, AppointmentStatus.ACCEPTED])
-        ).first()
-        return existing is None
+        """Check if doctor is free for a consultation starting at the given time"""
+        minutes = duration_minutes or consultation_minutes(self.db.get(Doctor, doctor_id))
+        return self.availability.is_free(
+            doctor_id, appointment_date, appointment_time, minutes, exclude_appointment_id
+        )
     
     def find_available_room(self, branch_id: int, room_type: RoomType = RoomType.CONSULTATION) -> Optional[Room]:
-        """Find an available room"""
-        return self.db.query(Room).filter(
-            Room.branch_id == branch_id,
-            Room.room_type == room_type,
-            Room.is_available == True
-        ).first()
+        """Find a room with a free bed (not claimed)"""
+        return self.rooms.find(branch_id, room_type)
     
-    def auto_assign_doctor(self, branch_id: int, appointment_date: date, appointment_time: time) -> Optional[Doctor]:
-        """Auto-assign a doctor based on availability"""
-        doctors = self.db.query(Doctor).join(User).filter(
-            User.branch_id == branch_id,
-            User.is_active == True
-        ).all()
-        
-        for doctor in doctors:
-            if self.check_doctor_availability(doctor.id, appointment_date, appointment_time):
-                return doctor
-        
-        return None
+    def auto_assign_doctor(
+        self,
+        branch_id: int,
+        appointment_date: date,
+        appointment_time: time,
+        snapshot: Optional[DayAvailability] = None,
+        specialization: Optional[str] = None,
+        strategy: Optional[str] = None,
+        duration_minutes: Optional[int] = None
+    ) -> Optional[Doctor]:
+        """Auto-assign a free doctor using the configured assignment strategy"""
+        snapshot = snapshot or self.availability.snapshot(appointment_date, branch_id=branch_id)
+        return get_assignment_strategy(strategy).assign(
+            snapshot, appointment_time, branch_id, specialization, duration_minutes
+        )
+    
+    def get_free_slots(
+        self,
+        branch_id: int,
+        slot_date: date,
+        doctor_id: Optional[int] = None
+    ) -> List[dict]:
+        """Open slots per doctor of a branch on a date"""
+        snapshot = self.availability.snapshot(
+            slot_date, branch_id=branch_id, doctor_ids=[doctor_id] if doctor_id else None
+        )
+        return [
+            {
+                "doctor_id": doctor.id,
+                "doctor_name": doctor.full_name,
+                "specialization": doctor.specialization,
+                "available_slots": [slot.strftime("%H:%M") for slot in snapshot.free_slots(doctor.id)]
+            }
+            for doctor in snapshot.doctors.values()
+        ]
     
     def create_appointment(
         self, 
@@ -72,47 +187,192 @@ class AppointmentService:
         if not patient:
             raise NotFoundError("Patient", str(data.patient_id))
         
-        # Handle doctor assignment
+        # Find available room
+        room = self.find_available_room(branch_id)
+        booking = {
+            "patient_id": data.patient_id,
+            "branch_id": patient.branch_id,
+            "room_id": room.id if room else None,
+            "appointment_date": data.appointment_date,
+            "appointment_time": data.appointment_time,
+            "status": AppointmentStatus.SCHEDULED,
+            "chief_complaint": data.chief_complaint,
+            "created_by": created_by
+        }
+        
+        # Handle doctor assignment; the booking insert rejects overlaps
         if data.doctor_id:
-            doctor = self.db.query(Doctor).filter(Doctor.id == data.doctor_id).first()
+            doctor = self.db.get(Doctor, data.doctor_id)
             if not doctor:
                 raise NotFoundError("Doctor", str(data.doctor_id))
             
-            if not self.check_doctor_availability(data.doctor_id, data.appointment_date, data.appointment_time):
+            appointment = self.insert_booking(
+                doctor_id=doctor.id, duration_minutes=consultation_minutes(doctor, data.duration_minutes), **booking
+            )
+            if appointment is None:
                 raise ConflictError("Doctor is not available at this time")
         else:
-            # Auto-assign doctor
-            doctor = self.auto_assign_doctor(branch_id, data.appointment_date, data.appointment_time)
-            if not doctor:
+            # Auto-assign doctor, moving on if another booking takes the slot first
+            snapshot = self.availability.snapshot(data.appointment_date, branch_id=branch_id)
+            appointment = None
+            for _ in range(BOOKING_ATTEMPTS):
+                doctor = self.auto_assign_doctor(
+                    branch_id, data.appointment_date, data.appointment_time, snapshot=snapshot,
+                    specialization=data.specialization, duration_minutes=data.duration_minutes
+                )
+                if not doctor:
+                    break
+                minutes = consultation_minutes(doctor, data.duration_minutes)
+                appointment = self.insert_booking(doctor_id=doctor.id, duration_minutes=minutes, **booking)
+                if appointment is not None:
+                    break
+                snapshot.book(doctor.id, data.appointment_time, minutes)
+            if appointment is None:
                 raise ConflictError("No doctors available at this time")
         
-        # Find available room
-        room = self.find_available_room(branch_id)
-        
-        appointment = Appointment(
-            patient_id=data.patient_id,
-            doctor_id=doctor.id,
-            room_id=room.id if room else None,
-            appointment_date=data.appointment_date,
-            appointment_time=data.appointment_time,
-            status=AppointmentStatus.SCHEDULED,
-            chief_complaint=data.chief_complaint,
-            created_by=created_by
-        )
-        self.db.add(appointment)
-        
         audit_logger.log_action(
             self.db, created_by, "APPOINTMENT_CREATED", "Appointment", appointment.id,
             after_state={
                 "patient_id": data.patient_id,
-                "doctor_id": doctor.id,
+                "doctor_id": appointment.doctor_id,
                 "date": str(data.appointment_date)
             }
         )
         
-        self.db.commit()
+        self._commit_schedule_change((appointment.doctor_id, appointment.appointment_date))
         return appointment
     
+    def bulk_create_appointments(
+        self,
+        items: List[BulkAppointmentItem],
+        branch_id: int,
+        created_by: int
+    ) -> dict:
+        """
+        Book a batch (weekly series expanded) in one transaction. Every
+        occurrence is checked against a single availability snapshot of the
+        dates involved, rows go in with one executemany INSERT and the batch
+        gets one audit entry. Occurrences that cannot be booked are reported
+        per item instead of failing the whole batch. On PostgreSQL the
+        branch's doctors are locked first, so the snapshot's overlap checks
+        hold until commit.
+        """
+        occurrences = [
+            (index, item, item.appointment_date + timedelta(weeks=week))
+            for index, item in enumerate(items)
+            for week in range(item.repeat_weeks)
+        ]
+        if len(occurrences) > settings.BULK_BOOKING_MAX_APPOINTMENTS:
+            raise ValidationError(
+                f"A batch may contain at most {settings.BULK_BOOKING_MAX_APPOINTMENTS} appointments"
+            )
+        
+        patient_branches = dict(self.db.execute(
+            select(Patient.id, Patient.branch_id).where(Patient.id.in_({item.patient_id for item in items}))
+        ).all())
+        self.lock_doctors(User.branch_id == branch_id)
+        snapshots = self.availability.snapshot_days(
+            {day for _, _, day in occurrences}, branch_id=branch_id
+        )
+        room = self.find_available_room(branch_id)
+        strategy = get_assignment_strategy()
+        
+        rows, conflicts = [], []
+        for index, item, day in occurrences:
+            snapshot = snapshots[day]
+            conflict = None
+            if item.patient_id not in patient_branches:
+                conflict = "Patient not found"
+            elif item.doctor_id:
+                if not snapshot.has_doctor(item.doctor_id):
+                    conflict = "Doctor not found in this branch"
+                elif not snapshot.is_free(item.doctor_id, item.appointment_time, item.duration_minutes):
+                    conflict = "Doctor is not available at this time"
+                doctor_id = item.doctor_id
+            else:
+                doctor = strategy.assign(
+                    snapshot, item.appointment_time, branch_id, item.specialization, item.duration_minutes
+                )
+                doctor_id = doctor.id if doctor else None
+                if doctor is None:
+                    conflict = "No doctors available at this time"
+            
+            if conflict:
+                conflicts.append({
+                    "index": index, "appointment_date": day, "appointment_time": item.appointment_time,
+                    "doctor_id": item.doctor_id, "reason": conflict
+                })
+                continue
+            minutes = snapshot.minutes(doctor_id, item.duration_minutes)
+            snapshot.book(doctor_id, item.appointment_time, minutes)
+            rows.append({
+                "index": index,
+                "patient_id": item.patient_id,
+                "branch_id": patient_branches[item.patient_id],
+                "doctor_id": doctor_id,
+                "room_id": room.id if room else None,
+                "appointment_date": day,
+                "appointment_time": item.appointment_time,
+                "duration_minutes": minutes,
+                "end_time": appointment_end(item.appointment_time, minutes),
+                "status": AppointmentStatus.SCHEDULED,
+                "chief_complaint": item.chief_complaint,
+                "created_by": created_by
+            })
+        
+        inserted = self._insert_bookings(rows)
+        appointment_ids = []
+        for row in rows:
+            appointment_id = inserted.get((row["doctor_id"], row["appointment_date"], row["appointment_time"]))
+            if appointment_id is None:
+                # Taken by a concurrent booking after the snapshot was read
+                conflicts.append({
+                    "index": row["index"], "appointment_date": row["appointment_date"],
+                    "appointment_time": row["appointment_time"], "doctor_id": row["doctor_id"],
+                    "reason": "Doctor is not available at this time"
+                })
+            else:
+                appointment_ids.append(appointment_id)
+        
+        if appointment_ids:
+            audit_logger.log_action(
+                self.db, created_by, "APPOINTMENTS_BULK_CREATED", "Appointment", None,
+                after_state={
+                    "count": len(appointment_ids),
+                    "appointment_ids": appointment_ids,
+                    "conflicts": len(conflicts)
+                }
+            )
+        self._commit_schedule_change(*{
+            (row["doctor_id"], row["appointment_date"]) for row in rows
+            if (row["doctor_id"], row["appointment_date"], row["appointment_time"]) in inserted
+        })
+        
+        conflicts.sort(key=lambda conflict: (conflict["index"], conflict["appointment_date"]))
+        return {"created": len(appointment_ids), "appointment_ids": appointment_ids, "conflicts": conflicts}
+    
+    def _insert_bookings(self, rows: List[dict]) -> dict:
+        """executemany INSERT skipping taken slots; maps (doctor, date, time) to new ids"""
+        if not rows:
+            return {}
+        values = [{key: value for key, value in row.items() if key != "index"} for row in rows]
+        dialect_insert = CONFLICT_INSERTS.get(self.db.get_bind().dialect.name)
+        if dialect_insert is None:
+            appointments = [self.insert_booking(**row) for row in values]
+            return {
+                (a.doctor_id, a.appointment_date, a.appointment_time): a.id
+                for a in appointments if a is not None
+            }
+        
+        statement = dialect_insert(Appointment).on_conflict_do_nothing(
+            index_elements=SLOT_COLUMNS, index_where=ACTIVE_SLOT_PREDICATE
+        ).returning(Appointment.id, Appointment.doctor_id, Appointment.appointment_date, Appointment.appointment_time)
+        return {
+            (doctor_id, appointment_date, appointment_time): appointment_id
+            for appointment_id, doctor_id, appointment_date, appointment_time
+            in self.db.execute(statement, values)
+        }
+    
     def book_appointment_by_patient(
         self, 
         patient_user_id: int,
@@ -155,7 +415,7 @@ class AppointmentService:
             self.db, doctor_user_id, "APPOINTMENT_ACCEPTED", "Appointment", appointment_id
         )
         
-        self.db.commit()
+        self._commit_schedule_change((appointment.doctor_id, appointment.appointment_date))
         return appointment
     
     def add_doctor_notes(
@@ -198,7 +458,7 @@ class AppointmentService:
             after_state={"diagnosis": data.diagnosis}
         )
         
-        self.db.commit()
+        self._commit_schedule_change((appointment.doctor_id, appointment.appointment_date))
         return appointment
     
     def reschedule_appointment(
@@ -217,21 +477,42 @@ class AppointmentService:
         
         new_doctor_id = data.new_doctor_id or appointment.doctor_id
         
-        # Check availability
-        if not self.check_doctor_availability(new_doctor_id, data.new_date, data.new_time):
-            raise ConflictError("Doctor is not available at the new time")
+        if data.new_doctor_id and not self.db.get(Doctor, data.new_doctor_id):
+            raise NotFoundError("Doctor", str(data.new_doctor_id))
         
         before_state = {
             "date": str(appointment.appointment_date),
             "time": str(appointment.appointment_time),
             "doctor_id": appointment.doctor_id
         }
-        
-        appointment.appointment_date = data.new_date
-        appointment.appointment_time = data.new_time
-        if data.new_doctor_id:
-            appointment.doctor_id = data.new_doctor_id
-        appointment.status = AppointmentStatus.SCHEDULED
+        previous_slot = (appointment.doctor_id, appointment.appointment_date)
+        
+        # Move only if nothing else overlaps the new interval; the slot index
+        # still catches an exact slot taken concurrently
+        minutes = data.new_duration_minutes or appointment.duration_minutes
+        end_time = appointment_end(data.new_time, minutes)
+        overlap = overlapping_bookings(
+            new_doctor_id, data.new_date, data.new_time, end_time, exclude_appointment_id=appointment_id
+        )
+        self.lock_doctors(Doctor.id == new_doctor_id)
+        try:
+            with self.db.begin_nested():
+                moved = self.db.execute(
+                    update(Appointment).where(Appointment.id == appointment_id, ~overlap.exists()).values(
+                        appointment_date=data.new_date,
+                        appointment_time=data.new_time,
+                        duration_minutes=minutes,
+                        end_time=end_time,
+                        doctor_id=new_doctor_id,
+                        status=AppointmentStatus.SCHEDULED,
+                        updated_at=datetime.utcnow()
+                    ).execution_options(synchronize_session=False)
+                ).rowcount
+        except IntegrityError:
+            moved = 0
+        if not moved:
+            raise ConflictError("Doctor is not available at the new time")
+        self.db.refresh(appointment)
         
         audit_logger.log_action(
             self.db, rescheduled_by, "APPOINTMENT_RESCHEDULED", "Appointment", appointment_id,
@@ -243,8 +524,9 @@ class AppointmentService:
             }
         )
         
-        self.db.commit()
+        self._commit_schedule_change(previous_slot, (new_doctor_id, data.new_date))
         return appointment
+
     def confirm_appointment(self, appointment_id: int, staff_user_id: int) -> Appointment:
         """Receptionist confirms an appointment (accepts it)"""
         appointment = self.get_appointment_by_id(appointment_id)
@@ -260,7 +542,7 @@ class AppointmentService:
             self.db, staff_user_id, "APPOINTMENT_CONFIRMED", "Appointment", appointment_id
         )
         
-        self.db.commit()
+        self._commit_schedule_change((appointment.doctor_id, appointment.appointment_date))
         return appointment
 
     def admit_patient(self, appointment_id: int, room_type: str, doctor_user_id: int) -> Appointment:
@@ -269,26 +551,19 @@ class AppointmentService:
         if not appointment:
             raise NotFoundError("Appointment", str(appointment_id))
         
-        doctor = self.db.query(Doctor).filter(Doctor.user_id == doctor_user_id).first()
+        doctor, branch_id = self.db.query(Doctor, User.branch_id).join(
+            User, User.id == Doctor.user_id
+        ).filter(Doctor.user_id == doctor_user_id).first()
         if appointment.doctor_id != doctor.id:
             raise ForbiddenError("This appointment is not assigned to you")
             
-        # Find available room
-        from models import Branch  # Local import to avoid circular dependency if any
-        room = self.db.query(Room).join(Branch).join(User).filter(
-            User.id == doctor_user_id,
-            Room.branch_id == User.branch_id,
-            Room.room_type == getattr(RoomType, room_type.upper(), RoomType.GENERAL_WARD),
-            Room.is_available == True
-        ).first()
-        
-        
+        # Claim a bed in the doctor's branch
+        room = self.rooms.claim(branch_id, getattr(RoomType, room_type.upper(), RoomType.GENERAL_WARD))
         if not room:
             raise ConflictError(f"No available {room_type} rooms found in this branch")
             
         appointment.status = AppointmentStatus.ADMITTED
         appointment.room_id = room.id
-        room.is_available = False
 
         # Create Admission record
         from models import Admission, AdmissionStatus # Local import
@@ -308,35 +583,105 @@ class AppointmentService:
             after_state={"room_id": room.id, "room_type": room_type, "admission_id": admission.id}
         )
         
-        self.db.commit()
+        self._commit_schedule_change((appointment.doctor_id, appointment.appointment_date))
         return appointment
 
-    def get_doctor_appointments(self, doctor_user_id: int) -> Tuple[List[Appointment], int]:
-        """Get all appointments for a doctor"""
+    def _list_appointments(
+        self,
+        query,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        statuses: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        profile=AppointmentResponse
+    ) -> Tuple[List[Appointment], Optional[str]]:
+        """
+        Newest first, one page at a time. Pages continue from the cursor's
+        (date, time, id) rather than an OFFSET, and there is no separate
+        COUNT, so any page of any date range costs one index range scan.
+        """
+        if start_date:
+            query = query.filter(Appointment.appointment_date >= start_date)
+        if end_date:
+            query = query.filter(Appointment.appointment_date <= end_date)
+        if statuses:
+            try:
+                query = query.filter(Appointment.status.in_([AppointmentStatus(value) for value in statuses]))
+            except ValueError:
+                raise ValidationError(f"Unknown appointment status in: {', '.join(statuses)}")
+        
+        sort_key = (Appointment.appointment_date, Appointment.appointment_time, Appointment.id)
+        if cursor:
+            query = query.filter(tuple_(*sort_key) < tuple_(*decode_appointment_cursor(cursor)))
+        limit = max(1, min(limit or settings.APPOINTMENT_PAGE_SIZE, settings.APPOINTMENT_MAX_PAGE_SIZE))
+        query = self._profiled(query, profile)
+        rows = query.order_by(*(column.desc() for column in sort_key)).limit(limit + 1).all()
+        
+        next_cursor = encode_appointment_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    def get_doctor_appointments(self, doctor_user_id: int, **filters) -> Tuple[List[Appointment], Optional[str]]:
+        """A page of a doctor's appointments and the cursor for the next one"""
         doctor = self.db.query(Doctor).filter(Doctor.user_id == doctor_user_id).first()
         if not doctor:
             raise NotFoundError("Doctor profile not found")
             
         query = self.db.query(Appointment).filter(Appointment.doctor_id == doctor.id)
-        return query.order_by(Appointment.appointment_date.desc(), Appointment.appointment_time.desc()).all(), query.count()
+        return self._list_appointments(query, **filters)
 
     def get_doctor_schedule(self, doctor_user_id: int, schedule_date: date) -> List[Appointment]:
         """Get doctor's schedule for a specific date"""
         doctor = self.db.query(Doctor).filter(Doctor.user_id == doctor_user_id).first()
         if not doctor:
             raise NotFoundError("Doctor profile not found")
-            
-        return self.db.query(Appointment).filter(
-            Appointment.doctor_id == doctor.id,
+        return self._doctor_schedule(doctor.id, schedule_date)
+
+    def _doctor_schedule(self, doctor_id: int, schedule_date: date) -> List[Appointment]:
+        query = self.db.query(Appointment).filter(
+            Appointment.doctor_id == doctor_id,
             Appointment.appointment_date == schedule_date
-        ).order_by(Appointment.appointment_time).all()
+        )
+        return self._profiled(query, AppointmentResponse).order_by(Appointment.appointment_time).all()
 
-    def get_branch_appointments(self, branch_id: int) -> Tuple[List[Appointment], int]:
-        """Get all appointments for a branch"""
-        query = self.db.query(Appointment).join(Patient).filter(Patient.branch_id == branch_id)
-        return query.order_by(Appointment.appointment_date.desc(), Appointment.appointment_time.desc()).all(), query.count()
+    def _doctor_profile_id(self, doctor_user_id: int) -> int:
+        doctor_id = schedule_cache.doctor_id(doctor_user_id)
+        if doctor_id is None:
+            doctor_id = self.db.scalar(select(Doctor.id).where(Doctor.user_id == doctor_user_id))
+            if doctor_id is None:
+                raise NotFoundError("Doctor profile not found")
+            schedule_cache.remember_doctor(doctor_user_id, doctor_id)
+        return doctor_id
 
-    def get_patient_appointments(self, patient_id: int) -> Tuple[List[Appointment], int]:
-        """Get all appointments for a patient"""
+    def get_cached_doctor_schedule(self, doctor_user_id: int, schedule_date: date) -> CachedPage:
+        """The doctor's day schedule serialized; repeated polls are served from the schedule cache"""
+        doctor_id = self._doctor_profile_id(doctor_user_id)
+        return schedule_cache.get_or_load(
+            schedule_cache.day_key(doctor_id, schedule_date),
+            lambda: (self._doctor_schedule(doctor_id, schedule_date), None)
+        )
+
+    def get_cached_doctor_appointments(self, doctor_user_id: int, **filters) -> CachedPage:
+        """Like ``get_doctor_appointments``, serialized and served from the schedule cache"""
+        doctor_id = self._doctor_profile_id(doctor_user_id)
+        return schedule_cache.get_or_load(
+            schedule_cache.listing_key(doctor_id, filters),
+            lambda: self._list_appointments(
+                self.db.query(Appointment).filter(Appointment.doctor_id == doctor_id), **filters
+            )
+        )
+
+    def get_branch_appointments(self, branch_id: int, **filters) -> Tuple[List[Appointment], Optional[str]]:
+        """A page of a branch's appointments and the cursor for the next one"""
+        query = self.db.query(Appointment).filter(Appointment.branch_id == branch_id)
+        return self._list_appointments(query, **filters)
+
+    def get_patient_appointments(self, patient_id: int, **filters) -> Tuple[List[Appointment], Optional[str]]:
+        """A page of a patient's appointments and the cursor for the next one"""
         query = self.db.query(Appointment).filter(Appointment.patient_id == patient_id)
-        return query.order_by(Appointment.appointment_date.desc(), Appointment.appointment_time.desc()).all(), query.count()
+        return self._list_appointments(query, **filters)
+
+
+class AsyncAppointmentService(AsyncService):
+    """Async variant of AppointmentService for routes using get_async_db"""
+    sync_service = AppointmentService
@@ -0,0 +1,93 @@
+"""
+Assignment Strategies - how auto-booking picks among free doctors
+"""
+import threading
+from abc import ABC, abstractmethod
+from datetime import time
+from typing import Dict, List, Optional
+
+from config import settings
+from models import Doctor
+from services.availability_service import DayAvailability
+
+
+class AssignmentStrategy(ABC):
+    """Picks one doctor from the free candidates of a day snapshot"""
+    name = "base"
+
+    @abstractmethod
+    def choose(self, snapshot: DayAvailability, candidates: List[Doctor],
+               branch_id: Optional[int] = None) -> Optional[Doctor]:
+        """One of ``candidates`` (never empty) for the booking"""
+
+    def assign(self, snapshot: DayAvailability, at: time, branch_id: Optional[int] = None,
+               specialization: Optional[str] = None, minutes: Optional[int] = None) -> Optional[Doctor]:
+        candidates = snapshot.free_doctors(at, minutes)
+        if specialization:
+            wanted = specialization.strip().lower()
+            specialists = [
+                doctor for doctor in candidates
+                if doctor.specialization and wanted in doctor.specialization.lower()
+            ]
+            # Without a free specialist the booking still goes to a free doctor
+            if specialists or not settings.ASSIGNMENT_SPECIALTY_FALLBACK:
+                candidates = specialists
+        if not candidates:
+            return None
+        return self.choose(snapshot, candidates, branch_id)
+
+
+class FirstAvailableStrategy(AssignmentStrategy):
+    """Roster order (the original behaviour)"""
+    name = "first_available"
+
+    def choose(self, snapshot, candidates, branch_id=None):
+        return candidates[0]
+
+
+class LeastBookedStrategy(AssignmentStrategy):
+    """
+    Fewest active bookings on the appointment's day. Counts come from the
+    snapshot bitmaps, so no query is made per doctor; ties keep roster order.
+    """
+    name = "least_booked"
+
+    def choose(self, snapshot, candidates, branch_id=None):
+        return min(candidates, key=lambda doctor: snapshot.load(doctor.id))
+
+
+class RoundRobinStrategy(AssignmentStrategy):
+    """
+    Rotates through the branch roster, continuing after the doctor picked
+    last time. The cursor lives in process memory, so each worker rotates
+    independently.
+    """
+    name = "round_robin"
+
+    def __init__(self):
+        self._last: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def choose(self, snapshot, candidates, branch_id=None):
+        with self._lock:
+            last = self._last.get(branch_id, 0)
+            doctor = next((d for d in candidates if d.id > last), candidates[0])
+            self._last[branch_id] = doctor.id
+            return doctor
+
+    def reset(self) -> None:
+        with self._lock:
+            self._last.clear()
+
+
+ASSIGNMENT_STRATEGIES: Dict[str, AssignmentStrategy] = {
+    strategy.name: strategy
+    for strategy in (FirstAvailableStrategy(), LeastBookedStrategy(), RoundRobinStrategy())
+}
+
+
+def get_assignment_strategy(name: Optional[str] = None) -> AssignmentStrategy:
+    name = name or settings.ASSIGNMENT_STRATEGY
+    if name not in ASSIGNMENT_STRATEGIES:
+        raise ValueError(f"Unknown assignment strategy: {name}")
+    return ASSIGNMENT_STRATEGIES[name]
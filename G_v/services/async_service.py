@@ -0,0 +1,55 @@
+"""
+Async Service Base - exposes a sync service over an AsyncSession
+"""
+from typing import Any, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Base
+
+
+def _to_model(result: Any, response_model: Type[BaseModel]) -> Any:
+    if isinstance(result, Base):
+        return response_model.model_validate(result)
+    if isinstance(result, list):
+        return [_to_model(item, response_model) for item in result]
+    if isinstance(result, tuple):
+        return tuple(_to_model(item, response_model) for item in result)
+    return result
+
+
+class AsyncService:
+    """
+    Async variant of a sync service. Each call runs the sync service method
+    through ``AsyncSession.run_sync``: the service logic (and its lazy loads)
+    executes in SQLAlchemy's greenlet bridge while the actual driver I/O is
+    awaited on the event loop, so one worker can multiplex many in-flight
+    queries without holding a threadpool thread per request.
+
+    ORM objects returned to async code must not lazy-load afterwards, so
+    pass ``response_model`` to serialize results inside the bridge.
+    """
+
+    sync_service: Type = None
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def call(self, method: str, *args, response_model: Optional[Type[BaseModel]] = None, **kwargs) -> Any:
+        def run(session):
+            result = getattr(self.sync_service(session), method)(*args, **kwargs)
+            return _to_model(result, response_model) if response_model else result
+        return await self.db.run_sync(run)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.sync_service, name, None)
+        if name.startswith("_") or not callable(attr):
+            raise AttributeError(name)
+
+        async def proxy(*args, response_model: Optional[Type[BaseModel]] = None, **kwargs):
+            return await self.call(name, *args, response_model=response_model, **kwargs)
+
+        proxy.__name__ = name
+        proxy.__doc__ = attr.__doc__
+        return proxy
@@ -0,0 +1,270 @@
+"""
+Availability Service - per-doctor booked-slot bitmaps and interval indexes for one day
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session, aliased, contains_eager
+
+from config import settings
+from models import ACTIVE_APPOINTMENT_STATUSES, Appointment, Doctor, User, appointment_end
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def minute_of_day(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def time_of_minute(minute: int) -> time:
+    return time(minute // 60, minute % 60)
+
+
+def ceil_to_grid(minute: int, origin: int, step: int) -> int:
+    """First slot start at or after ``minute`` on the grid ``origin + k * step``"""
+    return origin + -(-(minute - origin) // step) * step
+
+
+def consultation_minutes(doctor: Optional[Doctor], requested: Optional[int] = None) -> int:
+    """
+    Length of a booking: what was asked for, else the doctor's own default,
+    else the first configured specialty default matching the doctor's
+    specialization, else the clinic-wide default.
+    """
+    if requested:
+        return requested
+    if doctor is not None:
+        if doctor.appointment_minutes:
+            return doctor.appointment_minutes
+        specialization = (doctor.specialization or "").lower()
+        for specialty, minutes in settings.APPOINTMENT_SPECIALTY_MINUTES.items():
+            if specialty.lower() in specialization:
+                return minutes
+    return settings.APPOINTMENT_DEFAULT_MINUTES
+
+
+def overlapping_bookings(doctor_id: int, day: date, start: time, end: time,
+                         exclude_appointment_id: Optional[int] = None):
+    """
+    Active bookings of the doctor intersecting ``[start, end)`` as a SELECT,
+    the SQL counterpart of ``IntervalIndex.blocked_until``. The table is
+    aliased so the predicate can sit inside an INSERT or UPDATE of
+    appointments without being correlated to the outer statement.
+    """
+    booked = aliased(Appointment)
+    query = select(booked.id).where(
+        booked.doctor_id == doctor_id,
+        booked.appointment_date == day,
+        booked.status.in_(ACTIVE_APPOINTMENT_STATUSES),
+        booked.appointment_time < end,
+        booked.end_time > start
+    )
+    if exclude_appointment_id is not None:
+        query = query.where(booked.id != exclude_appointment_id)
+    return query
+
+
+class IntervalIndex:
+    """
+    Booked ``[start, end)`` minute intervals of one doctor-day, sorted by
+    start. ``reach[i]`` is the latest end among the first ``i + 1``
+    intervals, so finding what blocks a slot, and how far to jump past it,
+    is one bisect instead of a scan.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[int, int]] = ()):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.reach: List[int] = []
+        for start, end in sorted(intervals):
+            self.starts.append(start)
+            self.ends.append(end)
+            self.reach.append(max(end, self.reach[-1]) if self.reach else end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, start: int, end: int) -> None:
+        index = bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.reach.insert(index, end)
+        for i in range(index, len(self.reach)):
+            self.reach[i] = max(self.ends[i], self.reach[i - 1]) if i else self.ends[i]
+
+    def blocked_until(self, start: int, end: int) -> Optional[int]:
+        """Latest end of the bookings overlapping ``[start, end)``; None when free"""
+        index = bisect_left(self.starts, end)
+        if index and self.reach[index - 1] > start:
+            return self.reach[index - 1]
+        return None
+
+    def next_free(self, start: int, length: int, close: int, step: int, origin: int) -> Optional[int]:
+        """Earliest grid slot at or after ``start`` that fits ``length`` minutes before ``close``"""
+        candidate = ceil_to_grid(start, origin, step)
+        while candidate + length <= close:
+            blocked = self.blocked_until(candidate, candidate + length)
+            if blocked is None:
+                return candidate
+            candidate = ceil_to_grid(blocked, origin, step)
+        return None
+
+
+class DayAvailability:
+    """
+    Booked minutes of one day for a set of doctors. Each doctor's bitmap is
+    an int with bit ``m`` set when minute ``m`` after midnight is taken, so
+    testing whether a consultation fits is a single mask over its minutes
+    and picking a free doctor is one pass over the roster. The same
+    bookings are kept in an ``IntervalIndex`` per doctor for searches that
+    skip ahead to the next gap. Doctors keep the order they were loaded in;
+    a length of ``None`` means each doctor's own consultation length.
+    """
+
+    def __init__(self, day: date, doctors: Dict[int, Doctor], booked: Dict[int, int],
+                 intervals: Optional[Dict[int, IntervalIndex]] = None):
+        self.day = day
+        self.doctors = doctors
+        self.booked = booked
+        self.intervals = intervals if intervals is not None else {}
+
+    def _mask(self, at: time, minutes: int) -> int:
+        start = minute_of_day(at)
+        end = min(start + minutes, MINUTES_PER_DAY)
+        return (1 << end) - (1 << start)
+
+    def minutes(self, doctor_id: int, requested: Optional[int] = None) -> int:
+        return consultation_minutes(self.doctors.get(doctor_id), requested)
+
+    def has_doctor(self, doctor_id: int) -> bool:
+        return doctor_id in self.doctors
+
+    def is_free(self, doctor_id: int, at: time, minutes: Optional[int] = None) -> bool:
+        return not self.booked.get(doctor_id, 0) & self._mask(at, self.minutes(doctor_id, minutes))
+
+    def load(self, doctor_id: int) -> int:
+        """Active bookings the doctor has on this day"""
+        return len(self.intervals.get(doctor_id, ()))
+
+    def book(self, doctor_id: int, at: time, minutes: Optional[int] = None) -> None:
+        """Mark a consultation taken so later picks from the same snapshot see it"""
+        minutes = self.minutes(doctor_id, minutes)
+        self.booked[doctor_id] = self.booked.get(doctor_id, 0) | self._mask(at, minutes)
+        start = minute_of_day(at)
+        self.intervals.setdefault(doctor_id, IntervalIndex()).add(start, start + minutes)
+
+    def next_free(self, doctor_id: int, start: int, close: int, step: int, origin: int,
+                  minutes: Optional[int] = None) -> Optional[int]:
+        """Minute of the doctor's next grid slot, from ``start``, with room for a consultation"""
+        length = self.minutes(doctor_id, minutes)
+        index = self.intervals.get(doctor_id)
+        if index is None:
+            candidate = ceil_to_grid(start, origin, step)
+            return candidate if candidate + length <= close else None
+        return index.next_free(start, length, close, step, origin)
+
+    def free_doctors(self, at: time, minutes: Optional[int] = None) -> List[Doctor]:
+        return [
+            doctor for doctor_id, doctor in self.doctors.items()
+            if not self.booked.get(doctor_id, 0) & self._mask(at, consultation_minutes(doctor, minutes))
+        ]
+
+    def first_free_doctor(self, at: time, minutes: Optional[int] = None) -> Optional[Doctor]:
+        for doctor_id, doctor in self.doctors.items():
+            if not self.booked.get(doctor_id, 0) & self._mask(at, consultation_minutes(doctor, minutes)):
+                return doctor
+        return None
+
+    def free_slots(self, doctor_id: int, open_time: Optional[time] = None,
+                   close_time: Optional[time] = None, step_minutes: Optional[int] = None,
+                   minutes: Optional[int] = None) -> List[time]:
+        """Slot starts between opening and closing time with room for a consultation"""
+        start = minute_of_day(open_time or time(settings.CLINIC_OPEN_HOUR))
+        end = minute_of_day(close_time or time(settings.CLINIC_CLOSE_HOUR))
+        step = step_minutes or settings.APPOINTMENT_SLOT_MINUTES
+        length = self.minutes(doctor_id, minutes)
+        span = (1 << length) - 1
+        booked = self.booked.get(doctor_id, 0)
+        return [
+            time_of_minute(minute) for minute in range(start, end - length + 1, step)
+            if not booked >> minute & span
+        ]
+
+
+class AvailabilityService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def is_free(self, doctor_id: int, day: date, at: time, minutes: int,
+                exclude_appointment_id: Optional[int] = None) -> bool:
+        """One EXISTS probe against the doctor's bookings, no day schedule loaded"""
+        overlap = overlapping_bookings(doctor_id, day, at, appointment_end(at, minutes), exclude_appointment_id)
+        return not self.db.scalar(select(overlap.exists()))
+
+    def snapshot(
+        self,
+        day: date,
+        branch_id: Optional[int] = None,
+        doctor_ids: Optional[Iterable[int]] = None,
+        exclude_appointment_id: Optional[int] = None
+    ) -> DayAvailability:
+        """
+        Load the roster (active doctors of ``branch_id`` and/or the given
+        ``doctor_ids``) together with their active bookings on ``day`` in a
+        single query. ``exclude_appointment_id`` leaves one booking out, so
+        an appointment being rescheduled does not conflict with itself.
+        """
+        return self.snapshot_days([day], branch_id, doctor_ids, exclude_appointment_id)[day]
+
+    def snapshot_days(
+        self,
+        days: Iterable[date],
+        branch_id: Optional[int] = None,
+        doctor_ids: Optional[Iterable[int]] = None,
+        exclude_appointment_id: Optional[int] = None
+    ) -> Dict[date, DayAvailability]:
+        """Like ``snapshot`` for several days at once, still one query"""
+        days = sorted(set(days))
+        booking = and_(
+            Appointment.doctor_id == Doctor.id,
+            Appointment.appointment_date.in_(days),
+            Appointment.status.in_(ACTIVE_APPOINTMENT_STATUSES)
+        )
+        if exclude_appointment_id is not None:
+            booking = and_(booking, Appointment.id != exclude_appointment_id)
+
+        # The doctor's user row rides along for names and branch checks
+        query = self.db.query(
+            Doctor, Appointment.appointment_date, Appointment.appointment_time, Appointment.duration_minutes
+        ).join(
+            User, User.id == Doctor.user_id
+        ).options(contains_eager(Doctor.user))
+        if branch_id is not None:
+            query = query.filter(
+                User.branch_id == branch_id,
+                User.is_active == True
+            )
+        if doctor_ids is not None:
+            query = query.filter(Doctor.id.in_(list(doctor_ids)))
+        rows = query.outerjoin(Appointment, booking).order_by(Doctor.id).all()
+
+        # Days share one roster; each keeps its own bitmaps and intervals
+        doctors: Dict[int, Doctor] = {}
+        booked: Dict[date, Dict[int, int]] = {day: {} for day in days}
+        spans: Dict[date, Dict[int, List[Tuple[int, int]]]] = {day: {} for day in days}
+        for doctor, booked_date, booked_time, duration in rows:
+            doctors[doctor.id] = doctor
+            if booked_time is not None:
+                start = minute_of_day(booked_time)
+                end = min(start + (duration or settings.APPOINTMENT_DEFAULT_MINUTES), MINUTES_PER_DAY)
+                day_booked = booked[booked_date]
+                day_booked[doctor.id] = day_booked.get(doctor.id, 0) | (1 << end) - (1 << start)
+                spans[booked_date].setdefault(doctor.id, []).append((start, end))
+        return {
+            day: DayAvailability(day, doctors, booked[day], {
+                doctor_id: IntervalIndex(intervals) for doctor_id, intervals in spans[day].items()
+            })
+            for day in days
+        }
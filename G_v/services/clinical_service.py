@@ -14,6 +14,7 @@ from models import (
 from schemas.clinical import TelemetryCreate
 from utils.exceptions import NotFoundError, ValidationError, ForbiddenError
 from utils.audit import audit_logger
+from services.async_service import AsyncService
 
 
 class ClinicalService:
@@ -128,7 +129,9 @@ class ClinicalService:
         if not room:
             raise NotFoundError("Room", str(room_id))
         
-        room.is_available = is_available
+        # Closing is remembered apart from fullness; reopening only frees it if a bed is free
+        room.closed_by_staff = not is_available
+        room.is_available = Room.occupied_beds < func.coalesce(Room.capacity, 1) if is_available else False
         
         audit_logger.log_action(
             self.db, updated_by, "ROOM_AVAILABILITY_UPDATED", "Room", room_id,
@@ -137,3 +140,8 @@ class ClinicalService:
         
         self.db.commit()
         return room
+
+
+class AsyncClinicalService(AsyncService):
+    """Async variant of ClinicalService for routes using get_async_db"""
+    sync_service = ClinicalService
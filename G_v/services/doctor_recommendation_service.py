@@ -151,6 +151,12 @@ class DoctorRecommendationService:
         
         return [(doc, score) for doc, score in recommendations[:limit]]
     
+    def matches_specialty(self, doctor_specialty: str, target_specialties: List[str]) -> bool:
+        """Whether a doctor's specialization is a full match for any target specialty"""
+        return bool(doctor_specialty) and self._calculate_match_score(
+            doctor_specialty.lower(), target_specialties
+        ) >= 1.0
+    
     def _calculate_match_score(self, doctor_specialty: str, target_specialties: List[str]) -> float:
         """Calculate how well a doctor matches the required specialties"""
         if not doctor_specialty:
@@ -0,0 +1,295 @@
+"""
+Log Partition Service - monthly partitions, retention and archive reads for
+audit_logs / patient_access_logs
+"""
+import gzip
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Column, Index, MetaData, Table, delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import AuditLog, PatientAccessLog
+
+# table -> (model, partition key column)
+LOG_TABLES = {
+    AuditLog.__tablename__: (AuditLog, "created_at"),
+    PatientAccessLog.__tablename__: (PatientAccessLog, "accessed_at"),
+}
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    years, index = divmod(month.month - 1 + count, 12)
+    return month.replace(year=month.year + years, month=index + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_y{month:%Y}m{month:%m}"
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class LogPartitionService:
+    """
+    On PostgreSQL (after ``upgrade_schema.py`` converts the tables) each log
+    table is RANGE-partitioned by month and this service only has to create
+    upcoming partitions. Elsewhere (SQLite, or PostgreSQL before conversion)
+    partitioning is emulated: ``rollover`` moves rows from finished months out
+    of the hot table into per-month tables with the same naming scheme, so the
+    hot table only ever holds the current month. Month tables get copies of
+    the hot table's indexes, and readers of older rows go through ``read``.
+
+    Either way, months older than the retention window are exported to
+    gzip-compressed JSON lines under ``archive_dir`` and dropped, and ``read``
+    merges live rows with archived ones.
+    """
+
+    def __init__(self, db: Session, archive_dir: Optional[str] = None,
+                 retention_months: Optional[int] = None):
+        self.db = db
+        self.archive_dir = archive_dir or settings.LOG_ARCHIVE_DIR
+        self.retention_months = retention_months or settings.LOG_RETENTION_MONTHS
+        self.dialect = db.get_bind().dialect.name
+
+    # ---------- introspection ----------
+    def is_partitioned(self, table: str) -> bool:
+        if self.dialect != "postgresql":
+            return False
+        return self.db.execute(text(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :table"
+        ), {"table": table}).first() is not None
+
+    def list_partitions(self, table: str) -> List[Tuple[datetime, str]]:
+        """(month, table name) of every monthly partition, oldest first"""
+        if self.dialect == "postgresql":
+            names = self.db.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table "
+                "UNION SELECT tablename FROM pg_tables WHERE tablename LIKE :prefix"
+            ), {"table": table, "prefix": f"{table}_y%"}).scalars().all()
+        else:
+            names = self.db.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :prefix"
+            ), {"prefix": f"{table}_y%"}).scalars().all()
+
+        pattern = re.compile(rf"^{re.escape(table)}_y(\d{{4}})m(\d{{2}})$")
+        partitions = []
+        for name in names:
+            match = pattern.match(name)
+            if match:
+                partitions.append((datetime(int(match.group(1)), int(match.group(2)), 1), name))
+        return sorted(set(partitions))
+
+    def _month_table(self, table: str, name: str) -> Table:
+        model, _ = LOG_TABLES[table]
+        return Table(name, MetaData(), *[Column(c.name, c.type) for c in model.__table__.columns])
+
+    def _index_month_table(self, table: str, name: str) -> None:
+        """Give an emulated month table the hot table's indexes (CREATE TABLE AS copies none)"""
+        model, _ = LOG_TABLES[table]
+        month_table = self._month_table(table, name)
+        suffix = name[len(table):]
+        for index in model.__table__.indexes:
+            Index(f"{index.name}{suffix}", *[month_table.c[column.name] for column in index.columns]).create(
+                self.db.connection(), checkfirst=True
+            )
+
+    # ---------- maintenance ----------
+    def ensure_partitions(self, months_ahead: int = 2, now: Optional[datetime] = None) -> List[str]:
+        """Create upcoming monthly partitions on natively partitioned tables"""
+        current = month_start(now or datetime.utcnow())
+        created = []
+        for table in LOG_TABLES:
+            if not self.is_partitioned(table):
+                continue
+            existing = {name for _, name in self.list_partitions(table)}
+            for offset in range(months_ahead + 1):
+                month = add_months(current, offset)
+                name = partition_name(table, month)
+                if name in existing:
+                    continue
+                self.db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+                ))
+                created.append(name)
+        self.db.commit()
+        return created
+
+    def rollover(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Move rows from finished months out of emulated hot tables"""
+        current = month_start(now or datetime.utcnow())
+        moved: Dict[str, int] = {}
+        for table, (_, key) in LOG_TABLES.items():
+            if self.is_partitioned(table):
+                continue
+            hot = self._month_table(table, table)
+            for _, name in self.list_partitions(table):
+                self._index_month_table(table, name)
+            while True:
+                oldest = self.db.execute(
+                    select(func.min(hot.c[key])).where(hot.c[key] < current)
+                ).scalar()
+                if oldest is None:
+                    break
+                month = month_start(oldest)
+                name = partition_name(table, month)
+                in_month = (hot.c[key] >= month) & (hot.c[key] < add_months(month, 1))
+                self.db.execute(text(f"CREATE TABLE IF NOT EXISTS {name} AS SELECT * FROM {table} WHERE 1 = 0"))
+                self._index_month_table(table, name)
+                month_table = self._month_table(table, name)
+                self.db.execute(insert(month_table).from_select(
+                    [column.name for column in hot.columns], select(hot).where(in_month)
+                ))
+                moved[name] = self.db.execute(delete(hot).where(in_month)).rowcount
+                self.db.commit()
+        return moved
+
+    def archive_cold(self, now: Optional[datetime] = None) -> List[str]:
+        """Export partitions older than the retention window and drop them"""
+        cutoff = add_months(month_start(now or datetime.utcnow()), -self.retention_months)
+        archived = []
+        for table in LOG_TABLES:
+            native = self.is_partitioned(table)
+            for month, name in self.list_partitions(table):
+                if month >= cutoff:
+                    continue
+                path = self._write_archive(table, name, month)
+                if native:
+                    self.db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                self.db.execute(text(f"DROP TABLE {name}"))
+                self.db.commit()
+                archived.append(path)
+        return archived
+
+    def _archive_path(self, table: str, month: datetime) -> str:
+        return os.path.join(self.archive_dir, table, f"{month:%Y-%m}.jsonl.gz")
+
+    def _write_archive(self, table: str, name: str, month: datetime) -> str:
+        path = self._archive_path(table, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = f"{path}.partial"
+        month_table = self._month_table(table, name)
+        result = self.db.execute(select(month_table).execution_options(yield_per=1000))
+        with gzip.open(partial, "wt", encoding="utf-8") as archive:
+            # Appending keeps an earlier export of the same month intact
+            if os.path.exists(path):
+                with gzip.open(path, "rt", encoding="utf-8") as previous:
+                    for line in previous:
+                        archive.write(line)
+            for row in result.mappings():
+                archive.write(json.dumps(dict(row), default=_json_default) + "\n")
+        os.replace(partial, path)
+        return path
+
+    # ---------- fallback reader ----------
+    # Archived rows are matched in chunks so one month file is never held whole
+    ARCHIVE_CHUNK = 1000
+
+    def _archive_months(self, table: str, start: datetime, end: datetime) -> List[Tuple[datetime, str]]:
+        """(month, path) of archive files overlapping the range, newest first"""
+        directory = os.path.join(self.archive_dir, table)
+        if not os.path.isdir(directory):
+            return []
+        months = []
+        for filename in os.listdir(directory):
+            if not filename.endswith(".jsonl.gz"):
+                continue
+            month = datetime.strptime(filename[:7], "%Y-%m")
+            if add_months(month, 1) > start and month < end:
+                months.append((month, os.path.join(directory, filename)))
+        return sorted(months, reverse=True)
+
+    @staticmethod
+    def _archive_chunks(path: str, size: int) -> Iterator[List[Dict[str, Any]]]:
+        chunk = []
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            for line in archive:
+                chunk.append(json.loads(line))
+                if len(chunk) >= size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def read(self, table: str, start: datetime, end: datetime, limit: int = 100,
+             where: Optional[Callable[[Table], List[Any]]] = None,
+             match: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None,
+             **filters) -> List[Dict[str, Any]]:
+        """
+        Rows with ``start <= key < end`` from the hot table, emulated month
+        tables and archive files, newest first. ``filters`` are equality
+        matches on column names; ``where(source)`` returns extra SQL
+        conditions for each live table. Archive files cannot be matched
+        against SQL, so ``match(rows)`` applies the same conditions to the
+        archived candidates and returns the ones to keep; archives are
+        skipped when ``where`` is given without ``match``.
+
+        Month tables and archive files are visited newest first and reading
+        stops once ``limit`` rows newer than the next month are in hand, so a
+        recent page never touches older months.
+        """
+        _, key = LOG_TABLES[table]
+        rows: List[Dict[str, Any]] = []
+
+        def merge(more: List[Dict[str, Any]]) -> None:
+            rows.extend(more)
+            rows.sort(key=lambda row: row[key], reverse=True)
+            del rows[limit:]
+
+        def filled(month: datetime) -> bool:
+            # Nothing in ``month`` or earlier can displace the rows already held
+            return len(rows) >= limit and rows[-1][key] >= add_months(month, 1)
+
+        def query(name: str) -> List[Dict[str, Any]]:
+            source = self._month_table(table, name)
+            stmt = select(source).where(source.c[key] >= start, source.c[key] < end)
+            for column, value in filters.items():
+                stmt = stmt.where(source.c[column] == value)
+            if where is not None:
+                stmt = stmt.where(*where(source))
+            stmt = stmt.order_by(source.c[key].desc()).limit(limit)
+            return [dict(row) for row in self.db.execute(stmt).mappings()]
+
+        # The hot table may still hold rows of any age until rollover runs
+        merge(query(table))
+        if not self.is_partitioned(table):
+            for month, name in reversed(self.list_partitions(table)):
+                if add_months(month, 1) <= start or month >= end:
+                    continue
+                if filled(month):
+                    return rows
+                merge(query(name))
+
+        if where is not None and match is None:
+            return rows
+        for month, path in self._archive_months(table, start, end):
+            if filled(month):
+                break
+            for chunk in self._archive_chunks(path, self.ARCHIVE_CHUNK):
+                candidates = []
+                for row in chunk:
+                    stamp = datetime.fromisoformat(row[key]) if row.get(key) else None
+                    if stamp is None or not (start <= stamp < end):
+                        continue
+                    if all(row.get(column) == value for column, value in filters.items()):
+                        row[key] = stamp
+                        candidates.append(row)
+                if candidates and match is not None:
+                    candidates = match(candidates)
+                merge(candidates)
+        return rows
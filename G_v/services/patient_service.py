@@ -11,6 +11,7 @@ from schemas.patient import PatientCreate, PatientUpdate
 from utils.helpers import hash_password, generate_user_id
 from utils.exceptions import NotFoundError, ConflictError
 from utils.audit import audit_logger
+from services.async_service import AsyncService
 
 
 class PatientService:
@@ -167,12 +168,18 @@ class PatientService:
         if not patient:
             raise NotFoundError("Patient", str(patient_id))
         
-        # Log access
-        audit_logger.log_patient_access(
+        # Log access (repeat views only bump counters when coalescing is enabled)
+        if audit_logger.log_patient_access(
             self.db, patient_id, accessed_by, 
             "Medical History View", access_reason
-        )
+        ):
+            self.db.commit()
         
         return self.db.query(MedicalHistory).filter(
             MedicalHistory.patient_id == patient_id
         ).order_by(MedicalHistory.visit_date.desc()).all()
+
+
+class AsyncPatientService(AsyncService):
+    """Async variant of PatientService for routes using get_async_db"""
+    sync_service = PatientService
@@ -0,0 +1,85 @@
+"""
+Room Allocator - atomic bed claims for consultations and admissions
+"""
+from typing import Optional
+
+from sqlalchemy import and_, case, func, select, update
+from sqlalchemy.orm import Session
+
+from models import Room, RoomType
+
+
+class RoomAllocator:
+    """
+    A room holds ``capacity`` patients (1 unless it is a multi-bed ward);
+    ``occupied_beds`` counts the claimed beds and ``is_available`` is true
+    while a bed is free and staff have not closed the room
+    (``closed_by_staff``).
+
+    Claims are a single conditional UPDATE rather than read-then-write. On
+    PostgreSQL the target row is picked with ``FOR UPDATE SKIP LOCKED``, so
+    concurrent admissions each take a different free room instead of queueing
+    on the first one. Other databases use compare-and-set on
+    ``occupied_beds`` and move on to the next candidate when another
+    transaction got there first.
+    """
+
+    def __init__(self, db: Session, max_attempts: int = 5):
+        self.db = db
+        self.max_attempts = max_attempts
+        self.skip_locked = db.get_bind().dialect.name == "postgresql"
+
+    def _free_rooms(self, branch_id: int, room_type: RoomType):
+        return select(Room.id).where(
+            Room.branch_id == branch_id,
+            Room.room_type == room_type,
+            Room.is_available == True,
+            Room.occupied_beds < func.coalesce(Room.capacity, 1)
+        ).order_by(Room.id)
+
+    def _claim(self, *conditions) -> Optional[int]:
+        return self.db.execute(
+            update(Room).where(*conditions).values(
+                occupied_beds=Room.occupied_beds + 1,
+                is_available=Room.occupied_beds + 1 < func.coalesce(Room.capacity, 1)
+            ).returning(Room.id).execution_options(synchronize_session=False)
+        ).scalar()
+
+    def _load(self, room_id: int) -> Room:
+        return self.db.execute(
+            select(Room).where(Room.id == room_id).execution_options(populate_existing=True)
+        ).scalar_one()
+
+    def find(self, branch_id: int, room_type: RoomType = RoomType.CONSULTATION) -> Optional[Room]:
+        """A room with a free bed, without claiming it"""
+        target = self._free_rooms(branch_id, room_type).limit(1).scalar_subquery()
+        return self.db.query(Room).filter(Room.id == target).first()
+
+    def claim(self, branch_id: int, room_type: RoomType) -> Optional[Room]:
+        """Take one bed in a free room; ``None`` when the branch has none left"""
+        if self.skip_locked:
+            target = self._free_rooms(branch_id, room_type).limit(1).with_for_update(skip_locked=True)
+            room_id = self._claim(Room.id == target.scalar_subquery())
+            return self._load(room_id) if room_id is not None else None
+
+        for _ in range(self.max_attempts):
+            candidates = self.db.execute(
+                self._free_rooms(branch_id, room_type).add_columns(Room.occupied_beds).limit(self.max_attempts)
+            ).all()
+            if not candidates:
+                return None
+            for room_id, seen in candidates:
+                if self._claim(Room.id == room_id, Room.occupied_beds == seen, Room.is_available == True):
+                    return self._load(room_id)
+        return None
+
+    def release(self, room_id: int) -> Optional[Room]:
+        """Free one bed (discharge); the room reopens if it was full, not if staff closed it"""
+        occupied = case((Room.occupied_beds > 0, Room.occupied_beds - 1), else_=0)
+        room_id = self.db.execute(
+            update(Room).where(Room.id == room_id).values(
+                occupied_beds=occupied,
+                is_available=and_(Room.closed_by_staff == False, occupied < func.coalesce(Room.capacity, 1))
+            ).returning(Room.id).execution_options(synchronize_session=False)
+        ).scalar()
+        return self._load(room_id) if room_id is not None else None
@@ -0,0 +1,157 @@
+"""
+Schedule Cache - serialized doctor day schedules and appointment listings
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from config import settings
+from schemas.appointment import AppointmentResponse
+
+_APPOINTMENT_LIST = TypeAdapter(List[AppointmentResponse])
+
+
+class CachedPage(NamedTuple):
+    """A response body ready to send, with its ETag and listing cursor"""
+    body: bytes
+    etag: str
+    next_cursor: Optional[str] = None
+
+    @classmethod
+    def build(cls, appointments: Iterable[Any], next_cursor: Optional[str] = None) -> "CachedPage":
+        payload = _APPOINTMENT_LIST.validate_python(list(appointments), from_attributes=True)
+        body = _APPOINTMENT_LIST.dump_json(payload)
+        return cls(body, f'"{hashlib.sha1(body).hexdigest()}"', next_cursor)
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an ``If-None-Match`` header already names this body"""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags
+
+
+class ScheduleCache:
+    """
+    Bounded, TTL-based cache of what the doctor portal polls: one entry per
+    doctor and day for ``/doctor/schedule`` and one per doctor and filter
+    set for ``/doctor/appointments``, keyed by ``Doctor.id``.
+
+    Appointment writes call ``invalidate(doctor_id, day)`` after they
+    commit. That bumps the epoch of the doctor-day (schedule entries) and of
+    the doctor (listings, which span days). A fill only lands if the epoch
+    it observed before querying is still current, so a poll racing with a
+    booking cannot re-insert the schedule as it was before the write. Fills
+    read from the primary: a replica still behind the write would otherwise
+    be cached, with a strong ETag, for the whole TTL.
+
+    Entries live in process memory, so other workers only see a write once
+    their copy expires; the TTL bounds that staleness.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._doctors: "OrderedDict[int, int]" = OrderedDict()
+        self._day_epochs: Dict[Tuple[int, date], int] = {}
+        self._doctor_epochs: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def day_key(doctor_id: int, day: date) -> tuple:
+        return ("day", doctor_id, day)
+
+    @staticmethod
+    def listing_key(doctor_id: int, filters: Dict[str, Any]) -> tuple:
+        return ("list", doctor_id, tuple(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in sorted(filters.items())
+        ))
+
+    def _epoch(self, key: tuple) -> int:
+        # Caller holds the lock
+        if key[0] == "day":
+            return self._day_epochs.get((key[1], key[2]), 0)
+        return self._doctor_epochs.get(key[1], 0)
+
+    def doctor_id(self, user_id: int) -> Optional[int]:
+        """Doctor profile id of a doctor user, if seen before"""
+        with self._lock:
+            return self._doctors.get(user_id)
+
+    def remember_doctor(self, user_id: int, doctor_id: int) -> None:
+        with self._lock:
+            self._doctors[user_id] = doctor_id
+            self._doctors.move_to_end(user_id)
+            while len(self._doctors) > self.max_size:
+                self._doctors.popitem(last=False)
+
+    def get_or_load(
+        self,
+        key: tuple,
+        load: Callable[[], Tuple[Iterable[Any], Optional[str]]]
+    ) -> CachedPage:
+        """The cached page for ``key``, or ``load()`` (appointments, cursor) serialized and stored"""
+        with self._lock:
+            epoch = self._epoch(key)
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] == epoch and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self._entries.pop(key, None)
+            self.misses += 1
+
+        page = CachedPage.build(*load())
+        with self._lock:
+            if self._epoch(key) == epoch:
+                self._entries[key] = (page, time.monotonic() + self.ttl_seconds, epoch)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return page
+
+    def invalidate(self, doctor_id: int, day: date) -> None:
+        """Drop the doctor's schedule for ``day`` and all of the doctor's listings"""
+        with self._lock:
+            self._day_epochs[(doctor_id, day)] = self._day_epochs.get((doctor_id, day), 0) + 1
+            self._doctor_epochs[doctor_id] = self._doctor_epochs.get(doctor_id, 0) + 1
+            self._entries.pop(self.day_key(doctor_id, day), None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._doctors.clear()
+            self._day_epochs.clear()
+            self._doctor_epochs.clear()
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+schedule_cache = ScheduleCache(
+    max_size=settings.SCHEDULE_CACHE_MAX_SIZE,
+    ttl_seconds=settings.SCHEDULE_CACHE_TTL_SECONDS
+)
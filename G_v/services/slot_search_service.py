@@ -0,0 +1,92 @@
+"""
+Slot Search Service - next free (doctor, date, time) slots across a branch
+"""
+import heapq
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from services.availability_service import AvailabilityService, time_of_minute
+from services.doctor_recommendation_service import DoctorRecommendationService
+from utils.exceptions import ValidationError
+
+
+class SlotSearchService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.availability = AvailabilityService(db)
+        self.recommender = DoctorRecommendationService(db)
+
+    def search(
+        self,
+        branch_id: int,
+        start_date: Optional[date] = None,
+        days: int = 7,
+        limit: int = 10,
+        symptoms: Optional[str] = None,
+        specialization: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> List[dict]:
+        """
+        Earliest ``limit`` open slots from ``start_date`` over ``days`` days,
+        ordered by date, time and doctor. The roster and every booking in the
+        window come from one query; each day is then a k-way merge over the
+        doctors' interval indexes, which jump straight to the next gap.
+        Symptoms are mapped to specialties the same way doctor
+        recommendations are.
+        """
+        if not 1 <= days <= settings.SLOT_SEARCH_MAX_DAYS:
+            raise ValidationError(f"days must be between 1 and {settings.SLOT_SEARCH_MAX_DAYS}")
+        if not 1 <= limit <= settings.SLOT_SEARCH_MAX_RESULTS:
+            raise ValidationError(f"limit must be between 1 and {settings.SLOT_SEARCH_MAX_RESULTS}")
+
+        now = now or datetime.now()
+        start_date = max(start_date or now.date(), now.date())
+        window = [start_date + timedelta(days=offset) for offset in range(days)]
+        snapshots = self.availability.snapshot_days(window, branch_id=branch_id)
+
+        specialties = None
+        if specialization:
+            specialties = [specialization.strip().lower()]
+        elif symptoms:
+            specialties = self.recommender.extract_specialties(symptoms)
+        doctors = [
+            doctor for doctor in next(iter(snapshots.values())).doctors.values()
+            if specialties is None or self.recommender.matches_specialty(doctor.specialization, specialties)
+        ]
+
+        opening = settings.CLINIC_OPEN_HOUR * 60
+        closing = settings.CLINIC_CLOSE_HOUR * 60
+        step = settings.APPOINTMENT_SLOT_MINUTES
+        slots: List[dict] = []
+        for day in window:
+            snapshot = snapshots[day]
+            start = opening
+            if day == now.date():
+                start = max(opening, now.hour * 60 + now.minute + 1)
+
+            heap = []
+            for doctor in doctors:
+                minute = snapshot.next_free(doctor.id, start, closing, step, opening)
+                if minute is not None:
+                    heap.append((minute, doctor.id))
+            heapq.heapify(heap)
+
+            while heap and len(slots) < limit:
+                minute, doctor_id = heapq.heappop(heap)
+                doctor = snapshot.doctors[doctor_id]
+                slots.append({
+                    "doctor_id": doctor_id,
+                    "doctor_name": doctor.full_name,
+                    "specialization": doctor.specialization,
+                    "date": day,
+                    "time": time_of_minute(minute)
+                })
+                following = snapshot.next_free(doctor_id, minute + step, closing, step, opening)
+                if following is not None:
+                    heapq.heappush(heap, (following, doctor_id))
+            if len(slots) >= limit:
+                break
+        return slots
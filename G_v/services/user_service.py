@@ -3,13 +3,16 @@ User Service - Handles user management operations
 """
 from typing import Optional, List, Tuple
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy import func
 
 from models import User, UserRole, Doctor, Nurse, Patient, Organization, Branch
 from schemas.user import UserCreate, UserUpdate, DoctorCreate, NurseCreate
 from utils.helpers import hash_password, generate_user_id
+from utils.password_hasher import password_hasher
 from utils.exceptions import NotFoundError, ConflictError
 from utils.audit import audit_logger
+from auth.principal_cache import principal_cache
 
 
 class UserService:
@@ -24,9 +27,43 @@ class UserService:
     
     def authenticate_user(self, email: str, password: str) -> Optional[User]:
         user = self.get_user_by_email(email)
-        if user and user.password_hash == hash_password(password) and user.is_active:
-            return user
-        return None
+        if not user or not user.is_active:
+            return None
+        if not password_hasher.verify(password, user.password_hash):
+            return None
+        
+        # Transparently upgrade legacy SHA256 / low-cost hashes
+        if password_hasher.needs_rehash(user.password_hash):
+            self._store_rehash(user, password_hasher.hash(password))
+        
+        return user
+    
+    async def authenticate_user_async(self, email: str, password: str) -> Optional[User]:
+        """
+        ``authenticate_user`` for async routes: bcrypt runs on the hashing
+        pool while the request awaits it, and the (short) database calls go
+        to the threadpool, so no thread is held for the KDF work.
+        """
+        user = await run_in_threadpool(self.get_user_by_email, email)
+        if not user or not user.is_active:
+            return None
+        if not await password_hasher.verify_async(password, user.password_hash):
+            return None
+        
+        if password_hasher.needs_rehash(user.password_hash):
+            rehashed = await password_hasher.hash_async(password)
+            await run_in_threadpool(self._store_rehash, user, rehashed)
+        
+        return user
+    
+    def _store_rehash(self, user: User, password_hash: str) -> None:
+        user.password_hash = password_hash
+        self.db.commit()
+        # Reload now (on the caller's thread) so the async login does not lazy-load
+        # the expired row on the event loop when it builds the tokens
+        self.db.refresh(user)
+        principal_cache.invalidate(user.id)
+        password_hasher.record_rehash()
     
     def create_staff(
         self, 
@@ -201,6 +238,7 @@ class UserService:
             raise NotFoundError("User", str(user_id))
         
         user.is_active = False
+        user.token_version = (user.token_version or 0) + 1
         
         audit_logger.log_action(
             self.db, disabled_by, "USER_DISABLED", "User", user.id,
@@ -209,6 +247,7 @@ class UserService:
         )
         
         self.db.commit()
+        principal_cache.invalidate(user.id)
         return user
     
     def enable_user(self, user_id: int, enabled_by: int) -> User:
@@ -226,6 +265,7 @@ class UserService:
         )
         
         self.db.commit()
+        principal_cache.invalidate(user.id)
         return user
     
     def reset_password_to_default(self, user_id: int, reset_by: int) -> User:
@@ -246,12 +286,14 @@ class UserService:
         
         default_pwd = default_passwords.get(user.role, "password123")
         user.password_hash = hash_password(default_pwd)
+        user.token_version = (user.token_version or 0) + 1
         
         audit_logger.log_action(
             self.db, reset_by, "PASSWORD_RESET", "User", user.id
         )
         
         self.db.commit()
+        principal_cache.invalidate(user.id)
         return user
     
     def update_user(self, user_id: int, data: UserUpdate, updated_by: int) -> User:
@@ -272,6 +314,7 @@ class UserService:
         )
         
         self.db.commit()
+        principal_cache.invalidate(user.id)
         return user
     
     def get_staff_by_branch(
@@ -2,16 +2,29 @@
 Pytest configuration and fixtures for IHORMS
 """
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from main import app
-from database import get_db
+from database import get_db, read_your_writes
 from models import Base, User, UserRole
 from auth.jwt_handler import jwt_handler
+from auth.dependencies import get_read_db
+from auth.principal_cache import principal_cache
+from services.schedule_cache import schedule_cache
 from utils.helpers import hash_password
+from utils.password_hasher import password_hasher
+from utils.audit import audit_logger
+from utils.query_budget import track_queries
+
+# Keep bcrypt cheap in tests
+password_hasher.rounds = 4
+
+# Access logs are written straight to the test session, not coalesced in the background
+audit_logger.access_aggregator = None
 
 # Use an in-memory SQLite database for faster testing
 # Note: For production-grade integration, use a separate Postgres test DB
@@ -30,6 +43,16 @@ def setup_db():
     yield
     Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture(autouse=True)
+def reset_principal_cache():
+    # Tests reuse user and doctor ids inside rolled-back transactions
+    principal_cache.clear()
+    schedule_cache.clear()
+    read_your_writes.clear()
+    yield
+    principal_cache.clear()
+    schedule_cache.clear()
+
 @pytest.fixture
 def db(setup_db):
     connection = engine.connect()
@@ -51,6 +74,7 @@ def client(db):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -108,3 +132,17 @@ def create_test_user(db):
         db.refresh(user)
         return user
     return _create_user
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Usage: ``with assert_max_queries(3): ...`` fails if more statements run"""
+    @contextmanager
+    def _assert_max_queries(limit):
+        with track_queries() as stats:
+            yield stats
+        assert stats.count <= limit, (
+            f"Expected at most {limit} queries, got {stats.count}:\n"
+            + "\n".join(f"{count}x {shape}" for shape, count in stats.shapes.most_common())
+        )
+    return _assert_max_queries
@@ -0,0 +1,48 @@
+"""
+Functional tests for logout and refresh-token rotation
+"""
+import pytest
+from models import User, UserRole
+from utils.helpers import hash_password
+
+
+@pytest.fixture
+def login_tokens(client, db):
+    user = User(
+        email="tokens@test.com",
+        password_hash=hash_password("password123"),
+        first_name="Token",
+        last_name="Test",
+        role=UserRole.SUPER_ADMIN,
+        is_active=True
+    )
+    db.add(user)
+    db.commit()
+    response = client.post("/auth/login", json={"email": "tokens@test.com", "password": "password123"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, login_tokens):
+    headers = {"Authorization": f"Bearer {login_tokens['access_token']}"}
+    assert client.get("/super-admin/organizations", headers=headers).status_code == 200
+
+    response = client.post("/auth/logout", json={"refresh_token": login_tokens["refresh_token"]}, headers=headers)
+    assert response.status_code == 200
+
+    assert client.get("/super-admin/organizations", headers=headers).status_code == 401
+    refresh = client.post("/auth/refresh", json={"refresh_token": login_tokens["refresh_token"]})
+    assert refresh.status_code == 401
+
+
+def test_refresh_rotates_and_is_single_use(client, login_tokens):
+    first = client.post("/auth/refresh", json={"refresh_token": login_tokens["refresh_token"]})
+    assert first.status_code == 200
+    rotated = first.json()
+    assert rotated["refresh_token"] != login_tokens["refresh_token"]
+
+    replay = client.post("/auth/refresh", json={"refresh_token": login_tokens["refresh_token"]})
+    assert replay.status_code == 401
+
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    assert client.get("/super-admin/organizations", headers=headers).status_code == 200
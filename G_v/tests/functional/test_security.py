@@ -64,3 +64,100 @@ def test_super_admin_unauthorized_for_clinical(client, db):
     )
     
     assert response.status_code == 403
+
+def test_branch_admin_access_logs_include_rolled_over_months(client, db):
+    from datetime import datetime
+    from models import Doctor, PatientAccessLog
+    from services.log_partition_service import LogPartitionService, add_months, month_start
+
+    org = Organization(name="Log Org")
+    db.add(org)
+    db.flush()
+    branch = Branch(organization_id=org.id, name="B1")
+    db.add(branch)
+    db.flush()
+    admin = User(id=60, email="badmin@log.com", role=UserRole.BRANCH_ADMIN, organization_id=org.id,
+                 branch_id=branch.id, password_hash="x", is_active=True, first_name="B", last_name="A")
+    doc_user = User(id=61, email="doc@log.com", role=UserRole.DOCTOR, branch_id=branch.id,
+                    password_hash="x", first_name="Lo", last_name="Gan")
+    pat_user = User(id=62, email="pat@log.com", role=UserRole.PATIENT, branch_id=branch.id,
+                    password_hash="x", first_name="P", last_name="L")
+    db.add_all([admin, doc_user, pat_user])
+    db.flush()
+    patient = Patient(user_id=62, organization_id=org.id, branch_id=branch.id, patient_uid="LOG-1")
+    db.add_all([patient, Doctor(user_id=61, license_number="LOG-D1")])
+    db.flush()
+
+    current = month_start(datetime.utcnow())
+    db.add_all([
+        PatientAccessLog(patient_id=patient.id, accessed_by=61, access_type="View", accessed_at=current),
+        PatientAccessLog(patient_id=patient.id, accessed_by=61, access_type="View",
+                         accessed_at=add_months(current, -1)),
+    ])
+    db.commit()
+    LogPartitionService(db).rollover()
+
+    token = jwt_handler.create_access_token({"sub": "60", "role": "branch_admin"})
+    response = client.get("/branch-admin/access-logs", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200, response.text
+    logs = response.json()
+    assert [log["accessed_at"][:7] for log in logs] == [f"{current:%Y-%m}", f"{add_months(current, -1):%Y-%m}"]
+    assert logs[0]["doctor_name"] == "Dr. Lo Gan" and logs[0]["patient_uid"] == "LOG-1"
+
+def test_branch_admin_access_logs_include_archived_months(client, db, tmp_path, monkeypatch):
+    from datetime import datetime
+    from config import settings
+    from models import Doctor, PatientAccessLog
+    from services.log_partition_service import LogPartitionService, add_months, month_start
+
+    monkeypatch.setattr(settings, "LOG_ARCHIVE_DIR", str(tmp_path))
+    org = Organization(name="Archive Org")
+    db.add(org)
+    db.flush()
+    branch = Branch(organization_id=org.id, name="B1")
+    other_branch = Branch(organization_id=org.id, name="B2")
+    db.add_all([branch, other_branch])
+    db.flush()
+    admin = User(id=70, email="badmin@archive.com", role=UserRole.BRANCH_ADMIN, organization_id=org.id,
+                 branch_id=branch.id, password_hash="x", is_active=True, first_name="B", last_name="A")
+    doc_user = User(id=71, email="doc@archive.com", role=UserRole.DOCTOR, branch_id=branch.id,
+                    password_hash="x", first_name="Ar", last_name="Chive")
+    pat_user = User(id=72, email="pat@archive.com", role=UserRole.PATIENT, branch_id=branch.id,
+                    password_hash="x", first_name="P", last_name="A")
+    other_user = User(id=73, email="other@archive.com", role=UserRole.PATIENT, branch_id=other_branch.id,
+                      password_hash="x", first_name="O", last_name="B")
+    db.add_all([admin, doc_user, pat_user, other_user])
+    db.flush()
+    patient = Patient(user_id=72, organization_id=org.id, branch_id=branch.id, patient_uid="ARC-1")
+    other_patient = Patient(user_id=73, organization_id=org.id, branch_id=other_branch.id, patient_uid="ARC-2")
+    db.add_all([patient, other_patient, Doctor(user_id=71, license_number="ARC-D1")])
+    db.flush()
+
+    current = month_start(datetime.utcnow())
+    archived_month = add_months(current, -(settings.LOG_RETENTION_MONTHS + 2))
+    db.add_all([
+        PatientAccessLog(patient_id=patient.id, accessed_by=71, access_type="View", accessed_at=current),
+        PatientAccessLog(patient_id=patient.id, accessed_by=71, access_type="View", accessed_at=archived_month),
+        PatientAccessLog(patient_id=other_patient.id, accessed_by=71, access_type="View",
+                         accessed_at=archived_month),
+    ])
+    db.commit()
+    partitions = LogPartitionService(db)
+    partitions.rollover()
+    assert any(path.endswith(f"{archived_month:%Y-%m}.jsonl.gz") for path in partitions.archive_cold())
+
+    token = jwt_handler.create_access_token({"sub": "70", "role": "branch_admin"})
+    # The default window only covers recent months
+    recent = client.get("/branch-admin/access-logs", headers={"Authorization": f"Bearer {token}"})
+    assert [log["accessed_at"][:7] for log in recent.json()] == [f"{current:%Y-%m}"]
+
+    response = client.get(
+        "/branch-admin/access-logs", params={"start_date": f"{archived_month:%Y-%m-%d}"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200, response.text
+    logs = response.json()
+    assert [(log["accessed_at"][:7], log["patient_uid"]) for log in logs] == [
+        (f"{current:%Y-%m}", "ARC-1"), (f"{archived_month:%Y-%m}", "ARC-1")
+    ]
+    assert logs[1]["doctor_name"] == "Dr. Ar Chive"
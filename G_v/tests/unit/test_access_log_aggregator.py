@@ -0,0 +1,95 @@
+"""
+Unit tests for coalescing patient-access logging
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Base, PatientAccessLog
+from utils.access_log_aggregator import AccessLogAggregator
+
+
+@pytest.fixture
+def log_sessions():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _view(aggregator, db, *args, **kwargs):
+    # What the request does: commit when the first view of a window was added
+    if aggregator.record(db, *args, **kwargs):
+        db.commit()
+
+
+def test_repeated_views_share_one_row(log_sessions):
+    # Flush explicitly instead of from the background thread
+    aggregator = AccessLogAggregator(log_sessions, window_seconds=60, start_thread=False)
+    start = datetime(2026, 10, 16, 9, 0)
+    request_db = log_sessions()
+
+    assert aggregator.record(request_db, 1, 7, "Medical History View", "Clinical review", now=start)
+    request_db.commit()
+    for i in range(1, 10):
+        assert not aggregator.record(
+            request_db, 1, 7, "Medical History View", "Clinical review", now=start + timedelta(seconds=i * 5)
+        )
+    _view(aggregator, request_db, 1, 7, "Medical History View", "Insurance review", now=start + timedelta(seconds=50))
+    _view(aggregator, request_db, 1, 7, "Medical History View", "Clinical review", now=start + timedelta(seconds=90))
+    request_db.close()
+
+    # Every window's first view is already stored, before any flush
+    with log_sessions() as db:
+        assert db.query(PatientAccessLog).count() == 3
+
+    # Only the first window has expired by now, and only it absorbed repeat views
+    assert aggregator.flush(now=start + timedelta(seconds=61)) == 1
+    assert aggregator.flush(force=True) == 0
+
+    with log_sessions() as db:
+        rows = db.query(PatientAccessLog).order_by(PatientAccessLog.id).all()
+        assert [(row.access_reason, row.access_count) for row in rows] == [
+            ("Clinical review", 10), ("Insurance review", 1), ("Clinical review", 1)
+        ]
+        assert rows[0].accessed_at == start
+        assert rows[0].last_accessed_at == start + timedelta(seconds=45)
+
+    stats = aggregator.stats()
+    assert stats["events"] == 12 and stats["coalesced"] == 9
+    assert stats["rows_written"] == 3 and stats["rows_updated"] == 1
+
+
+def test_open_windows_are_bounded(log_sessions):
+    aggregator = AccessLogAggregator(log_sessions, window_seconds=60, max_open=2, start_thread=False)
+    request_db = log_sessions()
+    for patient_id in range(5):
+        _view(aggregator, request_db, patient_id, 7, "Medical History View")
+    _view(aggregator, request_db, 3, 7, "Medical History View")
+    _view(aggregator, request_db, 0, 7, "Medical History View")
+    request_db.close()
+
+    assert aggregator.stats()["open_windows"] == 2
+    # Evicted single-view windows need no update; patient 0's first view was
+    # evicted, so its repeat opened a new row and pushed out patient 3's window
+    assert aggregator.stats()["pending_updates"] == 1
+    with log_sessions() as db:
+        assert db.query(PatientAccessLog).count() == 6
+
+
+def test_first_view_joins_the_callers_transaction(log_sessions):
+    def no_extra_sessions():
+        raise AssertionError("record() must not open its own session")
+
+    aggregator = AccessLogAggregator(no_extra_sessions, window_seconds=60, start_thread=False)
+    request_db = log_sessions()
+    assert aggregator.record(request_db, 1, 7, "Medical History View")
+    request_db.rollback()
+    request_db.close()
+
+    # Rolled back with the request, like any other row it wrote
+    with log_sessions() as db:
+        assert db.query(PatientAccessLog).count() == 0
@@ -0,0 +1,76 @@
+"""
+Unit tests for platform analytics aggregation
+"""
+from datetime import date, time
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert, select
+
+from models import Appointment, Billing, Branch, Doctor, Organization, Patient, UserRole
+from services.analytics_service import AnalyticsService
+
+
+def _seed_orgs(db, create_test_user, count):
+    """``count`` orgs with two branches each; the first org also gets users, a visit and a bill"""
+    db.execute(insert(Organization), [{"name": f"Bench Org {i}", "is_active": i % 3 != 0} for i in range(count)])
+    org_ids = db.scalars(select(Organization.id).order_by(Organization.id)).all()
+    db.execute(insert(Branch), [
+        {"organization_id": org_id, "name": f"Branch {org_id}-{n}"} for org_id in org_ids for n in range(2)
+    ])
+    first = org_ids[0]
+    branch_id = db.scalar(select(Branch.id).where(Branch.organization_id == first))
+
+    doctor_user = create_test_user(f"bench-doc-{first}@test.com", UserRole.DOCTOR, first, branch_id)
+    patient_user = create_test_user(f"bench-pat-{first}@test.com", UserRole.PATIENT, first, branch_id)
+    doctor = Doctor(user_id=doctor_user.id, license_number=f"BENCH-{first}")
+    patient = Patient(user_id=patient_user.id, organization_id=first, branch_id=branch_id, patient_uid=f"BENCH-{first}")
+    db.add_all([doctor, patient])
+    db.flush()
+    appointments = [
+        Appointment(
+            patient_id=patient.id, doctor_id=doctor.id, branch_id=branch_id,
+            appointment_date=date(2030, 1, day), appointment_time=time(9, 0)
+        )
+        for day in (1, 2)
+    ]
+    db.add_all(appointments)
+    db.flush()
+    db.add(Billing(
+        appointment_id=appointments[0].id, patient_id=patient.id, bill_number=f"BENCH-{first}",
+        subtotal=Decimal("100"), total_amount=Decimal("118.50")
+    ))
+    db.commit()
+    return org_ids
+
+
+def test_platform_analytics_totals(db, create_test_user):
+    org_ids = _seed_orgs(db, create_test_user, 3)
+    create_test_user("bench-super@test.com", UserRole.SUPER_ADMIN)
+
+    analytics = AnalyticsService(db).get_platform_analytics()
+    by_id = {org["id"]: org for org in analytics["organizations"]}
+
+    assert by_id[org_ids[0]] == {
+        "id": org_ids[0], "name": "Bench Org 0", "users": 2, "branches": 2,
+        "appointments": 2, "billing_total": 118.5
+    }
+    assert by_id[org_ids[1]]["users"] == 0 and by_id[org_ids[1]]["billing_total"] == 0.0
+    assert analytics["total_organizations"] == 3
+    assert analytics["active_organizations"] == 2
+    assert analytics["total_branches"] == 6
+    # Users without an organization (the super admin) still count towards the platform
+    assert analytics["total_users"] == 3
+    assert analytics["total_patients"] == 1
+    assert analytics["total_appointments"] == 2
+
+
+@pytest.mark.parametrize("org_count", [10, 3000])
+def test_platform_analytics_query_count_is_constant(db, create_test_user, assert_max_queries, org_count):
+    _seed_orgs(db, create_test_user, org_count)
+
+    with assert_max_queries(6):
+        analytics = AnalyticsService(db).get_platform_analytics()
+
+    assert analytics["total_organizations"] == org_count
+    assert analytics["total_branches"] == 2 * org_count
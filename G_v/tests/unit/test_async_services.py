@@ -0,0 +1,58 @@
+"""
+Unit tests for the async engine and async service variants
+"""
+import asyncio
+from datetime import date, time
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import async_database_url
+from models import Base, User, UserRole, Organization, Branch, Patient, Doctor, Appointment
+from schemas.appointment import AppointmentResponse
+from services.appointment_service import AsyncAppointmentService
+from services.patient_service import AsyncPatientService
+
+
+def test_async_database_url_maps_drivers():
+    assert async_database_url("postgresql://u:p@h:5432/db") == "postgresql+asyncpg://u:p@h:5432/db"
+    assert async_database_url("sqlite:///./local.db") == "sqlite+aiosqlite:///./local.db"
+
+
+def test_async_services_run_on_async_session():
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            org = Organization(name="Async Org")
+            db.add(org)
+            await db.flush()
+            branch = Branch(organization_id=org.id, name="Async Branch", city="Pune")
+            db.add(branch)
+            await db.flush()
+            pat_user = User(email="ap@test.com", role=UserRole.PATIENT, password_hash="x", first_name="A", last_name="P")
+            doc_user = User(email="ad@test.com", role=UserRole.DOCTOR, branch_id=branch.id, password_hash="x", first_name="A", last_name="D")
+            db.add_all([pat_user, doc_user])
+            await db.flush()
+            patient = Patient(user_id=pat_user.id, organization_id=org.id, branch_id=branch.id, patient_uid="ASYNC-P1")
+            doctor = Doctor(user_id=doc_user.id, specialization="General", license_number="ASYNC-D1")
+            db.add_all([patient, doctor])
+            await db.flush()
+            db.add(Appointment(patient_id=patient.id, doctor_id=doctor.id, appointment_date=date(2030, 1, 2), appointment_time=time(9, 0)))
+            await db.commit()
+
+            found = await AsyncPatientService(db).get_patient_by_uid("ASYNC-P1")
+            schedule = await AsyncAppointmentService(db).get_doctor_schedule(
+                doc_user.id, date(2030, 1, 2), response_model=AppointmentResponse
+            )
+
+        await engine.dispose()
+        return found, schedule
+
+    found, schedule = asyncio.run(scenario())
+    assert found.patient_uid == "ASYNC-P1"
+    assert len(schedule) == 1
+    assert schedule[0].doctor_name == "A D"
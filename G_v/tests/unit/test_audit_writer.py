@@ -0,0 +1,70 @@
+"""
+Unit tests for the audit pipeline modes
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Base, AuditLog, PatientAccessLog, UserRole
+from utils.audit import AuditLogger, AuditWriter, TRANSACTIONAL, WRITE_BEHIND
+
+
+@pytest.fixture
+def audit_sessions():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+
+def test_transactional_mode_commits_with_caller(db, create_test_user):
+    user_id = create_test_user("audit-tx@test.com", UserRole.DOCTOR).id
+    logger = AuditLogger(TRANSACTIONAL)
+
+    logger.log_action(db, user_id, "ROLLED_BACK", "User", user_id)
+    db.rollback()
+    logger.log_action(db, user_id, "KEPT", "User", user_id)
+    db.commit()
+
+    actions = [row.action for row in db.query(AuditLog).filter(AuditLog.user_id == user_id)]
+    assert actions == ["KEPT"]
+
+
+def test_write_behind_batches_after_commit(audit_sessions):
+    writer = AuditWriter(audit_sessions, max_queue=100, batch_size=50, flush_interval=60)
+    logger = AuditLogger(WRITE_BEHIND, writer)
+    db = audit_sessions()
+
+    for i in range(3):
+        logger.log_action(db, None, f"ACTION_{i}", "Test", i)
+    db.rollback()
+    assert writer.stats()["queued"] == 0
+
+    for i in range(3):
+        logger.log_action(db, None, f"ACTION_{i}", "Test", i)
+    db.commit()
+    assert writer.stats()["queued"] == 3
+
+    writer.shutdown()
+    db.close()
+
+    with audit_sessions() as check:
+        assert check.query(AuditLog).count() == 3
+    stats = writer.stats()
+    assert stats["written"] == 3 and stats["batches"] == 1
+
+
+def test_write_behind_queue_is_bounded(audit_sessions):
+    # No background thread: only caller flushes drain the queue
+    writer = AuditWriter(audit_sessions, max_queue=4, batch_size=4, flush_interval=60, start_thread=False)
+    logger = AuditLogger(WRITE_BEHIND, writer)
+
+    for i in range(10):
+        logger.log_patient_access(None, i, 1, "Medical History View")
+        assert writer.stats()["queued"] <= 4
+
+    writer.flush()
+    with audit_sessions() as check:
+        assert check.query(PatientAccessLog).count() == 10
+    assert writer.stats()["caller_flushes"] >= 2
@@ -0,0 +1,98 @@
+"""
+Unit tests for authentication caches
+"""
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from auth.dependencies import get_current_user, get_current_principal
+from auth.jwt_handler import jwt_handler
+from auth.principal_cache import principal_cache
+from models import UserRole
+from services.user_service import UserService
+
+
+def _credentials(user_id: int) -> HTTPAuthorizationCredentials:
+    token = jwt_handler.create_access_token({"sub": str(user_id), "role": "doctor"})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_principal_cache_hit_skips_query(db, create_test_user):
+    user = create_test_user("cache@test.com", UserRole.DOCTOR)
+    credentials = _credentials(user.id)
+
+    first = get_current_user(credentials, db)
+    second = get_current_user(credentials, db)
+
+    assert first.id == second.id == user.id
+    stats = principal_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_disable_user_invalidates_principal(db, create_test_user):
+    admin = create_test_user("cache-admin@test.com", UserRole.ORG_ADMIN)
+    user = create_test_user("cache-disabled@test.com", UserRole.DOCTOR)
+    credentials = _credentials(user.id)
+    get_current_user(credentials, db)
+
+    UserService(db).disable_user(user.id, admin.id)
+
+    with pytest.raises(HTTPException) as exc:
+        get_current_user(credentials, db)
+    assert exc.value.status_code == 401
+    assert principal_cache.stats()["invalidations"] == 1
+
+
+def test_stale_fill_is_rejected_after_invalidation(db, create_test_user):
+    user = create_test_user("cache-race@test.com", UserRole.DOCTOR)
+    epoch = principal_cache.epoch(user.id)
+
+    principal_cache.invalidate(user.id)
+    principal_cache.put(user, epoch)
+
+    assert principal_cache.get(db, user.id) is None
+
+
+def test_claims_principal_authorizes_without_user_row(db, create_test_user):
+    user = create_test_user("claims@test.com", UserRole.DOCTOR, organization_id=5, branch_id=9)
+    token = jwt_handler.create_access_token({"sub": str(user.id)}, user=user)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    principal = get_current_principal(credentials, db)
+
+    assert principal.id == user.id
+    assert principal.role == UserRole.DOCTOR
+    assert (principal.organization_id, principal.branch_id) == (5, 9)
+    assert principal_cache.stats()["size"] == 0
+
+
+def test_claims_principal_rejected_after_disable(db, create_test_user):
+    admin = create_test_user("claims-admin@test.com", UserRole.ORG_ADMIN)
+    user = create_test_user("claims-disabled@test.com", UserRole.NURSE)
+    token = jwt_handler.create_access_token({"sub": str(user.id)}, user=user)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    get_current_principal(credentials, db)
+
+    UserService(db).disable_user(user.id, admin.id)
+    UserService(db).enable_user(user.id, admin.id)
+
+    with pytest.raises(HTTPException) as exc:
+        get_current_principal(credentials, db)
+    assert exc.value.detail == "Token has been revoked"
+
+
+def test_verified_token_cache_serves_repeat_verifications():
+    from auth.jwt_handler import token_cache
+
+    token = jwt_handler.create_access_token({"sub": "42", "role": "nurse"})
+    before = token_cache.stats()
+
+    first = jwt_handler.verify_token(token)
+    second = jwt_handler.verify_token(token)
+
+    assert first == second and first["sub"] == "42"
+    after = token_cache.stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+    assert jwt_handler.verify_token(token, token_type="refresh") is None
@@ -0,0 +1,104 @@
+"""
+Unit tests for log partition rollover, archival and the fallback reader
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Base, AuditLog, PatientAccessLog
+from services.log_partition_service import LogPartitionService
+
+
+@pytest.fixture
+def log_db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _audit(action, created_at, user_id=None):
+    return AuditLog(action=action, entity_type="Patient", entity_id=1, user_id=user_id,
+                    after_state={"action": action}, created_at=created_at)
+
+
+def test_rollover_archive_and_fallback_read(log_db, tmp_path):
+    log_db.add_all([
+        _audit("OLD", datetime(2025, 1, 15, 9, 0)),
+        _audit("LAST_MONTH", datetime(2026, 9, 20, 9, 0)),
+        _audit("CURRENT", datetime(2026, 10, 2, 9, 0)),
+    ])
+    log_db.commit()
+    service = LogPartitionService(log_db, archive_dir=str(tmp_path), retention_months=6)
+    now = datetime(2026, 10, 16)
+
+    moved = service.rollover(now=now)
+    assert moved == {"audit_logs_y2025m01": 1, "audit_logs_y2026m09": 1}
+    assert [row.action for row in log_db.query(AuditLog)] == ["CURRENT"]
+
+    archived = service.archive_cold(now=now)
+    assert len(archived) == 1 and archived[0].endswith("audit_logs/2025-01.jsonl.gz")
+    assert [name for _, name in service.list_partitions("audit_logs")] == ["audit_logs_y2026m09"]
+
+    rows = service.read("audit_logs", datetime(2024, 1, 1), datetime(2027, 1, 1))
+    assert [row["action"] for row in rows] == ["CURRENT", "LAST_MONTH", "OLD"]
+    assert rows[2]["after_state"] == {"action": "OLD"}
+    assert rows[2]["created_at"] == datetime(2025, 1, 15, 9, 0)
+
+    recent = service.read("audit_logs", datetime(2026, 9, 1), datetime(2026, 10, 1), action="LAST_MONTH")
+    assert [row["action"] for row in recent] == ["LAST_MONTH"]
+
+
+def test_month_tables_are_indexed_and_searchable(log_db, tmp_path):
+    log_db.add_all([
+        PatientAccessLog(patient_id=1, accessed_by=7, access_type="View", accessed_at=datetime(2026, 8, 3, 9, 0)),
+        PatientAccessLog(patient_id=2, accessed_by=7, access_type="View", accessed_at=datetime(2026, 9, 4, 9, 0)),
+        PatientAccessLog(patient_id=1, accessed_by=8, access_type="View", accessed_at=datetime(2026, 10, 5, 9, 0)),
+    ])
+    log_db.commit()
+    service = LogPartitionService(log_db, archive_dir=str(tmp_path), retention_months=6)
+    service.rollover(now=datetime(2026, 10, 16))
+
+    indexes = {index["name"] for index in inspect(log_db.get_bind()).get_indexes("patient_access_logs_y2026m09")}
+    assert indexes == {"idx_access_log_accessed_at_y2026m09", "idx_access_patient_accessed_y2026m09"}
+
+    rows = service.read(
+        "patient_access_logs", datetime(2026, 4, 1), datetime.max,
+        where=lambda source: [source.c.patient_id.in_([1])]
+    )
+    assert [(row["patient_id"], row["accessed_by"]) for row in rows] == [(1, 8), (1, 7)]
+
+
+def test_read_stops_before_months_that_cannot_fill_the_page(log_db, tmp_path, monkeypatch):
+    log_db.add_all([
+        PatientAccessLog(patient_id=1, accessed_by=7, access_type="View", accessed_at=datetime(2025, 1, 3, 9, 0)),
+        PatientAccessLog(patient_id=1, accessed_by=7, access_type="View", accessed_at=datetime(2026, 8, 3, 9, 0)),
+        PatientAccessLog(patient_id=1, accessed_by=7, access_type="View", accessed_at=datetime(2026, 9, 4, 9, 0)),
+        PatientAccessLog(patient_id=1, accessed_by=8, access_type="View", accessed_at=datetime(2026, 10, 5, 9, 0)),
+    ])
+    log_db.commit()
+    service = LogPartitionService(log_db, archive_dir=str(tmp_path), retention_months=6)
+    service.rollover(now=datetime(2026, 10, 16))
+    service.archive_cold(now=datetime(2026, 10, 16))
+
+    visited = []
+    month_table = service._month_table
+    monkeypatch.setattr(service, "_month_table", lambda table, name: visited.append(name) or month_table(table, name))
+    opened = []
+    archive_chunks = service._archive_chunks
+    monkeypatch.setattr(service, "_archive_chunks", lambda path, size: opened.append(path) or archive_chunks(path, size))
+
+    rows = service.read("patient_access_logs", datetime(2024, 1, 1), datetime.max, limit=2)
+    assert [row["accessed_at"].month for row in rows] == [10, 9]
+    assert visited == ["patient_access_logs", "patient_access_logs_y2026m09"]
+    assert opened == []
+
+    # Filling the page needs every month, down to the archive
+    rows = service.read("patient_access_logs", datetime(2024, 1, 1), datetime.max, limit=10)
+    assert [row["accessed_at"] for row in rows][-1] == datetime(2025, 1, 3, 9, 0)
+    assert len(opened) == 1
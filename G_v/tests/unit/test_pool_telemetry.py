@@ -0,0 +1,61 @@
+"""
+Unit tests for connection pool telemetry
+"""
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import create_engine, exc, text
+
+from auth.jwt_handler import jwt_handler
+from models import UserRole
+from utils.pool_telemetry import InstrumentedQueuePool, instrument_engine, pool_telemetry, current_request_scope
+
+
+@pytest.fixture
+def instrumented(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="test-pool",
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05
+    )
+    telemetry = instrument_engine(engine, "test-pool")
+    yield engine, telemetry
+    engine.dispose()
+    pool_telemetry.pop("test-pool", None)
+
+
+def test_pool_telemetry_tracks_hold_time_overflow_and_timeouts(instrumented):
+    engine, telemetry = instrumented
+    scope = {"method": "GET", "route": SimpleNamespace(path="/doctor/appointments")}
+    token = current_request_scope.set(scope)
+    try:
+        first = engine.connect()
+        second = engine.connect()
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        first.execute(text("SELECT 1"))
+        first.close()
+        second.close()
+    finally:
+        current_request_scope.reset(token)
+
+    stats = telemetry.stats()
+    assert stats["checkouts"] == 2
+    assert stats["overflow_checkouts"] == 1
+    assert stats["peak_overflow"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["timeouts_by_route"] == {"GET /doctor/appointments": 1}
+    assert stats["checkout_wait"]["count"] == 2
+    assert sum(stats["checkout_wait"]["histogram"].values()) == 2
+    assert stats["hold_time_by_route"]["GET /doctor/appointments"]["checkouts"] == 2
+
+
+def test_db_metrics_endpoint(client, create_test_user):
+    admin = create_test_user("pool-admin@test.com", UserRole.SUPER_ADMIN)
+    token = jwt_handler.create_access_token({"sub": str(admin.id), "role": UserRole.SUPER_ADMIN.value})
+
+    res = client.get("/metrics/db", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 200
+    assert "checkout_wait" in res.json()["primary"]
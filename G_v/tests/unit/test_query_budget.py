@@ -0,0 +1,57 @@
+"""
+Unit tests for the per-request query budget
+"""
+from auth.jwt_handler import jwt_handler
+from models import User, UserRole
+from utils.query_budget import statement_shape, track_queries
+
+
+def test_statement_shape_ignores_in_list_length():
+    assert statement_shape("SELECT * FROM t WHERE id IN (?, ?)") == statement_shape(
+        "SELECT *\n FROM t WHERE id IN (?, ?, ?, ?)"
+    )
+
+
+def test_repeated_statement_shapes_are_flagged(db, create_test_user):
+    user_ids = [create_test_user(f"n1-{i}@test.com", UserRole.NURSE).id for i in range(6)]
+
+    with track_queries() as stats:
+        for user_id in user_ids:
+            db.query(User).filter(User.id == user_id).first()
+
+    assert stats.count == 6
+    repeated = stats.repeated(threshold=5)
+    assert len(repeated) == 1 and repeated[0]["count"] == 6
+    assert any(problem.startswith("N+1") for problem in stats.violations(25, 500.0, 5))
+
+
+def test_failed_statements_do_not_leak_start_times(db):
+    import pytest
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    with track_queries() as stats:
+        with pytest.raises(OperationalError):
+            db.execute(text("SELECT * FROM no_such_table"))
+        db.rollback()
+        db.execute(text("SELECT 1"))
+
+    assert stats.count == 2
+    assert not db.connection().info.get("query_started")
+
+
+def test_assert_max_queries_helper(db, create_test_user, assert_max_queries):
+    user_id = create_test_user("budget@test.com", UserRole.DOCTOR).id
+    with assert_max_queries(1) as stats:
+        db.query(User).filter(User.id == user_id).first()
+    assert stats.count == 1
+
+
+def test_responses_carry_query_headers(client, create_test_user):
+    admin = create_test_user("budget-admin@test.com", UserRole.SUPER_ADMIN)
+    token = jwt_handler.create_access_token({"sub": str(admin.id), "role": UserRole.SUPER_ADMIN.value})
+
+    res = client.get("/super-admin/organizations", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 200
+    assert int(res.headers["X-DB-Queries"]) >= 1
+    assert "X-DB-Time-Ms" in res.headers
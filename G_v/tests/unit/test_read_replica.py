@@ -0,0 +1,141 @@
+"""
+Unit tests for read-replica session routing
+"""
+import hashlib
+import time
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import (
+    RoutingSession, ReadYourWrites, _track_writes, _pin_writer, READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_HEADER
+)
+from models import Base, Organization, UserRole
+
+
+@pytest.fixture
+def stand_ins():
+    """Two independent in-memory SQLite databases standing in for primary and replica"""
+    primary = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    replica = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for engine in (primary, replica):
+        Base.metadata.create_all(bind=engine)
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+@pytest.fixture
+def read_sessions(stand_ins):
+    primary, replica = stand_ins
+    pins = ReadYourWrites(seconds=5)
+    factory = sessionmaker(class_=RoutingSession, primary=primary, replica=replica, autoflush=False)
+    event.listen(factory, "after_flush", _track_writes)
+    event.listen(factory, "after_commit", _pin_writer)
+
+    def open_session(user_id=None):
+        db = factory()
+        db.info["user_id"] = user_id
+        if pins.is_pinned(user_id):
+            db.info["use_primary"] = True
+        return db
+
+    yield open_session, pins
+
+
+def test_reads_use_replica_and_writes_use_primary(stand_ins, read_sessions):
+    primary, replica = stand_ins
+    open_session, _ = read_sessions
+    with sessionmaker(bind=replica)() as seed:
+        seed.add(Organization(name="Replica Only"))
+        seed.commit()
+
+    db = open_session()
+    assert [o.name for o in db.query(Organization).all()] == ["Replica Only"]
+
+    db.add(Organization(name="Written"))
+    db.commit()
+    db.close()
+
+    with sessionmaker(bind=primary)() as check:
+        assert [o.name for o in check.query(Organization).all()] == ["Written"]
+
+
+def test_session_reads_its_own_writes(read_sessions):
+    open_session, _ = read_sessions
+    db = open_session()
+    db.add(Organization(name="Fresh"))
+    db.flush()
+
+    assert db.query(Organization).filter(Organization.name == "Fresh").count() == 1
+    db.rollback()
+    db.close()
+
+
+def test_writer_is_pinned_to_primary(read_sessions, monkeypatch):
+    open_session, pins = read_sessions
+    monkeypatch.setattr("database.read_your_writes", pins)
+
+    writer = open_session(user_id=7)
+    writer.add(Organization(name="Pinned"))
+    writer.commit()
+    writer.close()
+
+    assert pins.is_pinned(7)
+    assert not pins.is_pinned(8)
+
+    follow_up = open_session(user_id=7)
+    assert follow_up.query(Organization).filter(Organization.name == "Pinned").count() == 1
+    follow_up.close()
+
+    other = open_session(user_id=8)
+    assert other.query(Organization).filter(Organization.name == "Pinned").count() == 0
+    other.close()
+
+
+def test_textual_dml_goes_to_primary(stand_ins, read_sessions):
+    primary, _ = stand_ins
+    open_session, _ = read_sessions
+    db = open_session()
+    db.execute(text("INSERT INTO organizations (name) VALUES ('Raw')"))
+    db.commit()
+    assert db.execute(text("SELECT count(*) FROM organizations")).scalar() == 0  # replica
+    db.close()
+
+    with sessionmaker(bind=primary)() as check:
+        assert [o.name for o in check.query(Organization).all()] == ["Raw"]
+
+
+def test_pin_is_carried_to_other_workers(read_sessions, monkeypatch):
+    open_session, pins = read_sessions
+    monkeypatch.setattr("database.read_your_writes", pins)
+
+    with pins.track_request() as carried:
+        writer = open_session(user_id=7)
+        writer.add(Organization(name="Carried"))
+        writer.commit()
+        writer.close()
+    assert pins.is_pinned_until(str(carried["until"]))
+
+    # Another worker has no in-process pin but honours the carried expiry
+    other_worker = ReadYourWrites(seconds=5)
+    assert not other_worker.is_pinned(7)
+    assert other_worker.is_pinned_until(f"{carried['until']:.3f}")
+    assert not other_worker.is_pinned_until(str(time.time() - 1))
+    assert not other_worker.is_pinned_until("not-a-time")
+
+
+def test_writing_response_sets_pin_cookie(client, db, create_test_user):
+    user = create_test_user("pinned-login@test.com", UserRole.NURSE)
+    user.password_hash = hashlib.sha256(b"password123").hexdigest()
+    db.commit()
+    event.listen(db, "after_flush", _track_writes)
+    event.listen(db, "after_commit", _pin_writer)
+
+    # Login upgrades the legacy hash, which commits a write
+    response = client.post("/auth/login", json={"email": "pinned-login@test.com", "password": "password123"})
+    assert response.status_code == 200
+    assert READ_YOUR_WRITES_COOKIE in response.cookies
+    assert float(response.headers[READ_YOUR_WRITES_HEADER]) > time.time()
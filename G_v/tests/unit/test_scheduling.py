@@ -0,0 +1,585 @@
+"""
+Unit tests for appointment scheduling (availability, assignment, booking)
+"""
+import json
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from models import (
+    Appointment, AppointmentStatus, AuditLog, Branch, Doctor, Organization, Patient, Room, RoomType, UserRole
+)
+from auth.jwt_handler import jwt_handler
+from config import settings
+from schemas.appointment import (
+    AppointmentCreate, AppointmentReschedule, AppointmentResponse, BulkAppointmentItem
+)
+from services.appointment_service import AppointmentService
+from services.assignment_strategy import ASSIGNMENT_STRATEGIES
+from services.availability_service import AvailabilityService, IntervalIndex, consultation_minutes
+from services.clinical_service import ClinicalService
+from services.room_allocator import RoomAllocator
+from services.schedule_cache import schedule_cache
+from services.slot_search_service import SlotSearchService
+from utils.exceptions import ConflictError, NotFoundError, ValidationError
+
+DAY = date.today() + timedelta(days=1)
+
+
+@pytest.fixture
+def branch_setup(db, create_test_user):
+    """A branch with three doctors, one patient and a receptionist (ids only)"""
+    def _setup(doctors=3, specializations=None):
+        org = Organization(name="Sched Org")
+        db.add(org)
+        db.flush()
+        branch = Branch(organization_id=org.id, name="Sched Branch", city="Pune")
+        db.add(branch)
+        db.flush()
+        org_id, branch_id = org.id, branch.id
+
+        doctor_ids = []
+        for i in range(doctors):
+            user = create_test_user(f"sched-doc{i}-{branch_id}@test.com", UserRole.DOCTOR, org_id, branch_id)
+            doctor = Doctor(
+                user_id=user.id, license_number=f"SCH-{branch_id}-{i}",
+                specialization=(specializations or {}).get(i, "General Medicine")
+            )
+            db.add(doctor)
+            db.flush()
+            doctor_ids.append(doctor.id)
+
+        patient_user = create_test_user(f"sched-pat-{branch_id}@test.com", UserRole.PATIENT, org_id, branch_id)
+        patient = Patient(
+            user_id=patient_user.id, organization_id=org_id, branch_id=branch_id,
+            patient_uid=f"SCH-P-{branch_id}"
+        )
+        db.add(patient)
+        receptionist = create_test_user(f"sched-rec-{branch_id}@test.com", UserRole.RECEPTIONIST, org_id, branch_id)
+        db.commit()
+        return {
+            "branch_id": branch_id, "doctor_ids": doctor_ids,
+            "patient_id": patient.id, "receptionist_id": receptionist.id
+        }
+    return _setup
+
+
+def _book(db, patient_id, doctor_id, at, status=AppointmentStatus.SCHEDULED, day=DAY, branch_id=None, minutes=15):
+    appointment = Appointment(
+        patient_id=patient_id, doctor_id=doctor_id, branch_id=branch_id, appointment_date=day,
+        appointment_time=at, duration_minutes=minutes, status=status
+    )
+    db.add(appointment)
+    db.commit()
+    return appointment.id
+
+
+def test_snapshot_loads_branch_bookings_in_one_query(db, branch_setup, assert_max_queries):
+    setup = branch_setup()
+    first, second, third = setup["doctor_ids"]
+    _book(db, setup["patient_id"], first, time(10, 0))
+    _book(db, setup["patient_id"], second, time(10, 0))
+    _book(db, setup["patient_id"], second, time(11, 0), status=AppointmentStatus.CANCELLED)
+
+    with assert_max_queries(1):
+        snapshot = AvailabilityService(db).snapshot(DAY, branch_id=setup["branch_id"])
+        free = [doctor.id for doctor in snapshot.free_doctors(time(10, 0))]
+        names = [doctor.full_name for doctor in snapshot.doctors.values()]
+
+    assert free == [third]
+    assert len(names) == 3
+    assert snapshot.is_free(second, time(11, 0))  # cancelled bookings free the slot
+
+
+def test_auto_assign_skips_booked_doctors_with_constant_queries(db, branch_setup, assert_max_queries):
+    setup = branch_setup(doctors=5)
+    for doctor_id in setup["doctor_ids"][:4]:
+        _book(db, setup["patient_id"], doctor_id, time(9, 30))
+
+    service = AppointmentService(db)
+    with assert_max_queries(1):
+        doctor = service.auto_assign_doctor(setup["branch_id"], DAY, time(9, 30))
+    assert doctor.id == setup["doctor_ids"][4]
+
+
+def test_create_appointment_conflicts_and_unknown_doctor(db, branch_setup):
+    setup = branch_setup(doctors=1)
+    doctor_id = setup["doctor_ids"][0]
+    service = AppointmentService(db)
+    data = AppointmentCreate(
+        patient_id=setup["patient_id"], doctor_id=doctor_id,
+        appointment_date=DAY, appointment_time=time(14, 0)
+    )
+    service.create_appointment(data, setup["branch_id"], setup["receptionist_id"])
+
+    with pytest.raises(ConflictError):
+        service.create_appointment(data, setup["branch_id"], setup["receptionist_id"])
+    with pytest.raises(NotFoundError):
+        service.create_appointment(
+            data.model_copy(update={"doctor_id": 999999}), setup["branch_id"], setup["receptionist_id"]
+        )
+
+
+def test_reschedule_to_own_slot_does_not_conflict(db, branch_setup):
+    setup = branch_setup(doctors=1)
+    appointment_id = _book(db, setup["patient_id"], setup["doctor_ids"][0], time(15, 0))
+
+    service = AppointmentService(db)
+    moved = service.reschedule_appointment(
+        appointment_id, AppointmentReschedule(new_date=DAY, new_time=time(15, 0)), setup["receptionist_id"]
+    )
+    assert moved.appointment_time == time(15, 0)
+
+
+def test_free_slot_lookup(db, branch_setup):
+    setup = branch_setup(doctors=2)
+    first, second = setup["doctor_ids"]
+    _book(db, setup["patient_id"], first, time(9, 0))
+
+    slots = {row["doctor_id"]: row["available_slots"] for row in AppointmentService(db).get_free_slots(setup["branch_id"], DAY)}
+    assert slots[first][0] == "09:15"
+    assert slots[second][0] == "09:00"
+    assert len(slots[second]) == 32  # 09:00-17:00 in 15 minute steps
+
+
+def test_least_booked_strategy_spreads_load(db, branch_setup, assert_max_queries):
+    setup = branch_setup(doctors=3)
+    first, second, third = setup["doctor_ids"]
+    _book(db, setup["patient_id"], first, time(9, 0))
+    _book(db, setup["patient_id"], first, time(9, 15))
+    _book(db, setup["patient_id"], second, time(9, 30))
+
+    service = AppointmentService(db)
+    with assert_max_queries(1):
+        doctor = service.auto_assign_doctor(setup["branch_id"], DAY, time(11, 0), strategy="least_booked")
+    assert doctor.id == third
+
+
+def test_round_robin_rotates_per_branch(db, branch_setup):
+    ASSIGNMENT_STRATEGIES["round_robin"].reset()
+    setup = branch_setup(doctors=3)
+    snapshot = AvailabilityService(db).snapshot(DAY, branch_id=setup["branch_id"])
+    strategy = ASSIGNMENT_STRATEGIES["round_robin"]
+
+    picks = [strategy.assign(snapshot, time(10, 0), setup["branch_id"]).id for _ in range(4)]
+    assert picks == setup["doctor_ids"] + setup["doctor_ids"][:1]
+
+
+def test_specialty_aware_assignment(db, branch_setup):
+    setup = branch_setup(doctors=3, specializations={2: "Cardiology"})
+    cardiologist = setup["doctor_ids"][2]
+    service = AppointmentService(db)
+
+    assert service.auto_assign_doctor(setup["branch_id"], DAY, time(10, 0), specialization="cardio").id == cardiologist
+
+    _book(db, setup["patient_id"], cardiologist, time(10, 0))
+    fallback = service.auto_assign_doctor(setup["branch_id"], DAY, time(10, 0), specialization="cardiology")
+    assert fallback is not None and fallback.id != cardiologist
+
+
+def test_room_allocator_honours_ward_capacity(db, branch_setup):
+    setup = branch_setup(doctors=1)
+    ward = Room(branch_id=setup["branch_id"], room_number="W1", room_type=RoomType.GENERAL_WARD, capacity=2)
+    single = Room(branch_id=setup["branch_id"], room_number="W2", room_type=RoomType.GENERAL_WARD, capacity=1)
+    db.add_all([ward, single])
+    db.commit()
+    ward_id, single_id = ward.id, single.id
+
+    allocator = RoomAllocator(db)
+    claims = [allocator.claim(setup["branch_id"], RoomType.GENERAL_WARD) for _ in range(4)]
+    assert [room.id if room else None for room in claims] == [ward_id, ward_id, single_id, None]
+    assert claims[1].occupied_beds == 2 and claims[1].is_available is False
+
+    released = allocator.release(ward_id)
+    assert released.occupied_beds == 1 and released.is_available is True
+    assert allocator.claim(setup["branch_id"], RoomType.GENERAL_WARD).id == ward_id
+
+
+def test_room_release_keeps_staff_closed_room_closed(db, branch_setup):
+    setup = branch_setup(doctors=1)
+    ward = Room(branch_id=setup["branch_id"], room_number="C1", room_type=RoomType.GENERAL_WARD,
+                capacity=3, occupied_beds=2, is_available=False, closed_by_staff=True)
+    db.add(ward)
+    db.commit()
+
+    released = RoomAllocator(db).release(ward.id)
+    assert released.occupied_beds == 1 and released.is_available is False
+
+
+def test_room_release_keeps_full_staff_closed_room_closed(db, branch_setup):
+    setup = branch_setup(doctors=1)
+    ward = Room(branch_id=setup["branch_id"], room_number="C2", room_type=RoomType.GENERAL_WARD, capacity=2)
+    db.add(ward)
+    db.commit()
+    ward_id = ward.id
+
+    allocator = RoomAllocator(db)
+    allocator.claim(setup["branch_id"], RoomType.GENERAL_WARD)
+    allocator.claim(setup["branch_id"], RoomType.GENERAL_WARD)
+    ClinicalService(db).update_room_availability(ward_id, False, setup["receptionist_id"])
+
+    released = allocator.release(ward_id)
+    assert released.occupied_beds == 1 and released.is_available is False
+    assert allocator.claim(setup["branch_id"], RoomType.GENERAL_WARD) is None
+
+    # Reopening by staff makes the freed bed claimable again
+    ClinicalService(db).update_room_availability(ward_id, True, setup["receptionist_id"])
+    assert allocator.claim(setup["branch_id"], RoomType.GENERAL_WARD).id == ward_id
+
+
+def test_room_claim_skips_rows_changed_underneath(db, branch_setup):
+    setup = branch_setup(doctors=1)
+    first = Room(branch_id=setup["branch_id"], room_number="I1", room_type=RoomType.ICU, capacity=1)
+    second = Room(branch_id=setup["branch_id"], room_number="I2", room_type=RoomType.ICU, capacity=1)
+    db.add_all([first, second])
+    db.commit()
+    first_id, second_id = first.id, second.id
+
+    allocator = RoomAllocator(db)
+    # Simulate another transaction claiming the first room between read and write
+    assert allocator._claim(Room.id == first_id, Room.occupied_beds == 1) is None
+    assert allocator.claim(setup["branch_id"], RoomType.ICU).id == first_id
+    assert allocator.claim(setup["branch_id"], RoomType.ICU).id == second_id
+
+
+def test_admit_patient_claims_a_bed(db, branch_setup):
+    setup = branch_setup(doctors=1)
+    doctor = db.get(Doctor, setup["doctor_ids"][0])
+    doctor_user_id = doctor.user_id
+    ward = Room(branch_id=setup["branch_id"], room_number="A1", room_type=RoomType.GENERAL_WARD, capacity=3)
+    db.add(ward)
+    db.commit()
+    appointment_id = _book(db, setup["patient_id"], setup["doctor_ids"][0], time(10, 0))
+
+    admitted = AppointmentService(db).admit_patient(appointment_id, "general_ward", doctor_user_id)
+    assert admitted.status == AppointmentStatus.ADMITTED
+    assert admitted.room.occupied_beds == 1 and admitted.room.is_available is True
+
+
+def test_slot_index_rejects_double_booking_in_one_statement(db, branch_setup, assert_max_queries):
+    setup = branch_setup(doctors=1)
+    doctor_id = setup["doctor_ids"][0]
+    _book(db, setup["patient_id"], doctor_id, time(12, 0), status=AppointmentStatus.CANCELLED)
+    service = AppointmentService(db)
+    booking = dict(
+        patient_id=setup["patient_id"], doctor_id=doctor_id, appointment_date=DAY,
+        appointment_time=time(12, 0), status=AppointmentStatus.SCHEDULED
+    )
+
+    with assert_max_queries(1):
+        first = service.insert_booking(**booking)
+    with assert_max_queries(1):
+        second = service.insert_booking(**booking)
+    assert first is not None and first.id
+    assert second is None
+
+
+def test_reschedule_into_taken_slot_conflicts(db, branch_setup):
+    setup = branch_setup(doctors=1)
+    doctor_id = setup["doctor_ids"][0]
+    _book(db, setup["patient_id"], doctor_id, time(9, 0))
+    moving_id = _book(db, setup["patient_id"], doctor_id, time(10, 0))
+
+    service = AppointmentService(db)
+    with pytest.raises(ConflictError):
+        service.reschedule_appointment(
+            moving_id, AppointmentReschedule(new_date=DAY, new_time=time(9, 0)), setup["receptionist_id"]
+        )
+    # The session is still usable and the appointment kept its slot
+    assert service.get_appointment_by_id(moving_id).appointment_time == time(10, 0)
+
+
+def test_auto_assign_moves_on_when_slot_taken_concurrently(db, branch_setup):
+    setup = branch_setup(doctors=2)
+    first, second = setup["doctor_ids"]
+    service = AppointmentService(db)
+    stale = service.availability.snapshot(DAY, branch_id=setup["branch_id"])
+    # Booked after the snapshot was taken
+    _book(db, setup["patient_id"], first, time(16, 0))
+
+    service.availability.snapshot = lambda *args, **kwargs: stale
+    appointment = service.create_appointment(
+        AppointmentCreate(patient_id=setup["patient_id"], appointment_date=DAY, appointment_time=time(16, 0)),
+        setup["branch_id"], setup["receptionist_id"]
+    )
+    assert appointment.doctor_id == second
+
+
+def test_bulk_weekly_series_books_in_one_transaction(db, branch_setup, assert_max_queries):
+    setup = branch_setup(doctors=2)
+    first, second = setup["doctor_ids"]
+    # Third week of the series is already taken for the first doctor
+    _book(db, setup["patient_id"], first, time(11, 0), day=DAY + timedelta(weeks=2))
+
+    items = [
+        BulkAppointmentItem(
+            patient_id=setup["patient_id"], doctor_id=first, appointment_date=DAY,
+            appointment_time=time(11, 0), repeat_weeks=4
+        ),
+        BulkAppointmentItem(patient_id=setup["patient_id"], appointment_date=DAY, appointment_time=time(11, 0)),
+        BulkAppointmentItem(patient_id=999999, appointment_date=DAY, appointment_time=time(12, 0)),
+    ]
+    service = AppointmentService(db)
+    with assert_max_queries(8):
+        result = service.bulk_create_appointments(items, setup["branch_id"], setup["receptionist_id"])
+
+    assert result["created"] == 4
+    assert [(c["index"], c["reason"]) for c in result["conflicts"]] == [
+        (0, "Doctor is not available at this time"), (2, "Patient not found")
+    ]
+    assert result["conflicts"][0]["appointment_date"] == DAY + timedelta(weeks=2)
+    booked = db.query(Appointment).filter(Appointment.id.in_(result["appointment_ids"])).all()
+    # The auto-assigned item avoided the doctor the series took at 11:00
+    assert {a.doctor_id for a in booked if a.appointment_date == DAY} == {first, second}
+    assert db.query(AuditLog).filter(AuditLog.action == "APPOINTMENTS_BULK_CREATED").count() == 1
+
+
+def test_bulk_booking_endpoint(client, db, branch_setup):
+    setup = branch_setup(doctors=1)
+    token = jwt_handler.create_access_token({"sub": str(setup["receptionist_id"]), "role": UserRole.RECEPTIONIST.value})
+    payload = {"items": [{
+        "patient_id": setup["patient_id"], "doctor_id": setup["doctor_ids"][0],
+        "appointment_date": DAY.isoformat(), "appointment_time": "13:00", "repeat_weeks": 3
+    }] * 2}
+
+    res = client.post("/receptionist/appointments/bulk", json=payload, headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 200
+    body = res.json()
+    assert body["created"] == 3
+    assert len(body["conflicts"]) == 3 and {c["index"] for c in body["conflicts"]} == {1}
+
+
+def test_branch_listing_pages_by_keyset_within_date_range(db, branch_setup, assert_max_queries):
+    setup = branch_setup(doctors=1)
+    doctor_id, branch_id = setup["doctor_ids"][0], setup["branch_id"]
+    for offset in range(3):
+        for hour in (9, 10):
+            _book(db, setup["patient_id"], doctor_id, time(hour, 0), day=DAY + timedelta(days=offset), branch_id=branch_id)
+    _book(db, setup["patient_id"], doctor_id, time(11, 0), status=AppointmentStatus.CANCELLED, branch_id=branch_id)
+
+    service = AppointmentService(db)
+    seen, cursor = [], None
+    while True:
+        with assert_max_queries(1):
+            page, cursor = service.get_branch_appointments(
+                branch_id, start_date=DAY, end_date=DAY + timedelta(days=1),
+                statuses=["scheduled"], cursor=cursor, limit=3
+            )
+        seen.extend((a.appointment_date, a.appointment_time) for a in page)
+        if not cursor:
+            break
+
+    assert seen == [
+        (DAY + timedelta(days=1), time(10, 0)), (DAY + timedelta(days=1), time(9, 0)),
+        (DAY, time(10, 0)), (DAY, time(9, 0))
+    ]
+    with pytest.raises(ValidationError):
+        service.get_branch_appointments(branch_id, cursor="not-a-cursor")
+
+
+def test_receptionist_day_view(client, db, branch_setup):
+    setup = branch_setup(doctors=1)
+    doctor_id, branch_id = setup["doctor_ids"][0], setup["branch_id"]
+    _book(db, setup["patient_id"], doctor_id, time(9, 0), branch_id=branch_id)
+    _book(db, setup["patient_id"], doctor_id, time(9, 0), day=DAY + timedelta(days=1), branch_id=branch_id)
+    token = jwt_handler.create_access_token({"sub": str(setup["receptionist_id"]), "role": UserRole.RECEPTIONIST.value})
+
+    res = client.get(
+        "/receptionist/appointments", params={"date": DAY.isoformat()},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert res.status_code == 200
+    assert [a["appointment_date"] for a in res.json()] == [DAY.isoformat()]
+
+
+@pytest.mark.parametrize("count", [3, 30])
+def test_listing_serializes_in_constant_queries(db, branch_setup, create_test_user, assert_max_queries, count):
+    setup = branch_setup(doctors=3)
+    branch_id = setup["branch_id"]
+    rooms = [Room(branch_id=branch_id, room_number=f"C{i}", room_type=RoomType.CONSULTATION) for i in range(3)]
+    db.add_all(rooms)
+    db.flush()
+    for i in range(count):
+        user = create_test_user(f"load-pat{i}-{branch_id}@test.com", UserRole.PATIENT, branch_id=branch_id)
+        patient = Patient(user_id=user.id, organization_id=1, branch_id=branch_id, patient_uid=f"LD-{branch_id}-{i}")
+        db.add(patient)
+        db.flush()
+        db.add(Appointment(
+            patient_id=patient.id, doctor_id=setup["doctor_ids"][i % 3], room_id=rooms[i % 3].id,
+            branch_id=branch_id, appointment_date=DAY, appointment_time=time(9 + i // 4, (i % 4) * 15)
+        ))
+    db.commit()
+    db.expunge_all()
+
+    with assert_max_queries(1):
+        page, _ = AppointmentService(db).get_branch_appointments(branch_id)
+        payload = [AppointmentResponse.model_validate(a).model_dump() for a in page]
+    assert len(payload) == count
+    assert payload[0]["patient_name"] == "Test User" and payload[0]["room_number"].startswith("C")
+
+
+def test_interval_index_jumps_past_bookings():
+    index = IntervalIndex([(600, 630), (615, 700), (720, 735)])
+    assert index.blocked_until(590, 605) == 630
+    assert index.blocked_until(700, 715) is None
+    # 15 minute grid from 09:00: 10:00 is blocked until 11:40, so next slot is 11:45
+    assert index.next_free(600, 15, 1020, 15, 540) == 705
+    assert index.next_free(720, 15, 1020, 15, 540) == 735
+    index.add(735, 1020)
+    assert index.next_free(720, 15, 1020, 15, 540) is None
+
+
+def test_slot_search_returns_earliest_slots_in_one_query(db, branch_setup, assert_max_queries):
+    setup = branch_setup(doctors=3, specializations={1: "Cardiology"})
+    first, cardiologist, third = setup["doctor_ids"]
+    for minute in (0, 15, 30):
+        _book(db, setup["patient_id"], first, time(9, minute))
+    _book(db, setup["patient_id"], cardiologist, time(9, 0))
+    now = datetime.combine(DAY - timedelta(days=1), time(20, 0))
+
+    service = SlotSearchService(db)
+    with assert_max_queries(1):
+        slots = service.search(setup["branch_id"], DAY, days=7, limit=4, now=now)
+    assert [(s["doctor_id"], s["time"]) for s in slots] == [
+        (third, time(9, 0)), (cardiologist, time(9, 15)), (third, time(9, 15)), (cardiologist, time(9, 30))
+    ]
+
+    palpitations = service.search(setup["branch_id"], DAY, limit=2, symptoms="palpitations at night", now=now)
+    assert {s["doctor_id"] for s in palpitations} == {cardiologist}
+    assert service.search(setup["branch_id"], DAY, limit=1, specialization="cardiology", now=now)[0]["time"] == time(9, 15)
+
+
+def test_slot_search_skips_past_times_today(db, branch_setup):
+    setup = branch_setup(doctors=1)
+    now = datetime.combine(DAY, time(16, 50))
+
+    slots = SlotSearchService(db).search(setup["branch_id"], DAY, days=2, limit=2, now=now)
+    assert [(s["date"], s["time"]) for s in slots] == [
+        (DAY + timedelta(days=1), time(9, 0)), (DAY + timedelta(days=1), time(9, 15))
+    ]
+
+
+def test_consultation_length_defaults(db, branch_setup, monkeypatch):
+    setup = branch_setup(doctors=3, specializations={1: "Cardiology", 2: "Cardiology"})
+    general, cardiologist, custom = (db.get(Doctor, doctor_id) for doctor_id in setup["doctor_ids"])
+    custom.appointment_minutes = 20
+    monkeypatch.setattr(settings, "APPOINTMENT_SPECIALTY_MINUTES", {"cardio": 30})
+
+    assert consultation_minutes(general) == settings.APPOINTMENT_DEFAULT_MINUTES
+    assert consultation_minutes(cardiologist) == 30
+    assert consultation_minutes(custom) == 20
+    assert consultation_minutes(custom, 45) == 45
+
+
+def test_overlapping_bookings_conflict(db, branch_setup, assert_max_queries):
+    setup = branch_setup(doctors=2)
+    doctor_id, other = setup["doctor_ids"]
+    _book(db, setup["patient_id"], doctor_id, time(10, 0), minutes=30)
+    service = AppointmentService(db)
+
+    def booking(at, minutes=None, doctor=doctor_id):
+        return AppointmentCreate(
+            patient_id=setup["patient_id"], doctor_id=doctor, appointment_date=DAY,
+            appointment_time=at, duration_minutes=minutes
+        )
+
+    # 10:15 starts inside the 10:00-10:30 consultation; 09:45 for 30 minutes runs into it
+    with pytest.raises(ConflictError):
+        service.create_appointment(booking(time(10, 15)), setup["branch_id"], setup["receptionist_id"])
+    with pytest.raises(ConflictError):
+        service.create_appointment(booking(time(9, 45), 30), setup["branch_id"], setup["receptionist_id"])
+    back_to_back = service.create_appointment(booking(time(10, 30)), setup["branch_id"], setup["receptionist_id"])
+    assert back_to_back.end_time == time(10, 45)
+
+    with assert_max_queries(1):
+        assert not service.check_doctor_availability(doctor_id, DAY, time(10, 40), duration_minutes=10)
+    assert service.check_doctor_availability(doctor_id, DAY, time(9, 30), duration_minutes=30)
+
+    snapshot = AvailabilityService(db).snapshot(DAY, branch_id=setup["branch_id"])
+    assert not snapshot.is_free(doctor_id, time(10, 15))
+    assert [d.id for d in snapshot.free_doctors(time(10, 15))] == [other]
+    assert snapshot.load(doctor_id) == 2
+    assert snapshot.free_slots(doctor_id)[:4] == [time(9, 0), time(9, 15), time(9, 30), time(9, 45)]
+    assert time(9, 45) not in snapshot.free_slots(doctor_id, minutes=30)
+    assert time(10, 45) in snapshot.free_slots(doctor_id)
+
+
+def test_reschedule_into_overlap_conflicts(db, branch_setup):
+    setup = branch_setup(doctors=1)
+    doctor_id = setup["doctor_ids"][0]
+    _book(db, setup["patient_id"], doctor_id, time(14, 0), minutes=45)
+    moving_id = _book(db, setup["patient_id"], doctor_id, time(16, 0))
+
+    service = AppointmentService(db)
+    with pytest.raises(ConflictError):
+        service.reschedule_appointment(
+            moving_id, AppointmentReschedule(new_date=DAY, new_time=time(14, 30)), setup["receptionist_id"]
+        )
+    moved = service.reschedule_appointment(
+        moving_id, AppointmentReschedule(new_date=DAY, new_time=time(14, 45), new_duration_minutes=30),
+        setup["receptionist_id"]
+    )
+    assert (moved.appointment_time, moved.end_time, moved.duration_minutes) == (time(14, 45), time(15, 15), 30)
+
+
+def test_slot_search_fits_consultation_length(db, branch_setup):
+    setup = branch_setup(doctors=1)
+    doctor = db.get(Doctor, setup["doctor_ids"][0])
+    doctor.appointment_minutes = 30
+    db.commit()
+    _book(db, setup["patient_id"], doctor.id, time(9, 0), minutes=30)
+    _book(db, setup["patient_id"], doctor.id, time(9, 45), minutes=30)
+    now = datetime.combine(DAY - timedelta(days=1), time(20, 0))
+
+    slots = SlotSearchService(db).search(setup["branch_id"], DAY, days=1, limit=2, now=now)
+    # 09:30 leaves only 15 minutes before the 09:45 booking
+    assert [s["time"] for s in slots] == [time(10, 15), time(10, 30)]
+
+
+def test_doctor_schedule_is_cached_with_etags(client, db, branch_setup, assert_max_queries):
+    setup = branch_setup(doctors=1)
+    doctor = db.get(Doctor, setup["doctor_ids"][0])
+    doctor_id, doctor_user_id = doctor.id, doctor.user_id
+    appointment_id = _book(db, setup["patient_id"], doctor_id, time(9, 0), branch_id=setup["branch_id"])
+    token = jwt_handler.create_access_token({"sub": str(doctor_user_id), "role": UserRole.DOCTOR.value})
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {"schedule_date": DAY.isoformat()}
+
+    first = client.get("/doctor/schedule", params=params, headers=headers)
+    assert first.status_code == 200 and [a["status"] for a in first.json()] == ["scheduled"]
+    etag = first.headers["ETag"]
+
+    # Polls are served from the cache; a matching ETag gets an empty 304
+    with assert_max_queries(0):
+        again = client.get("/doctor/schedule", params=params, headers=headers)
+        unchanged = client.get("/doctor/schedule", params=params, headers={**headers, "If-None-Match": etag})
+    assert again.content == first.content
+    assert unchanged.status_code == 304 and not unchanged.content
+
+    listing = client.get("/doctor/appointments", headers=headers)
+    assert listing.status_code == 200 and len(listing.json()) == 1
+
+    AppointmentService(db).accept_appointment(appointment_id, doctor_user_id)
+    changed = client.get("/doctor/schedule", params=params, headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert [a["status"] for a in changed.json()] == ["accepted"]
+    assert client.get("/doctor/appointments", headers=headers).json()[0]["status"] == "accepted"
+    assert schedule_cache.stats()["hits"] == 2
+
+
+def test_reschedule_invalidates_both_days(db, branch_setup):
+    setup = branch_setup(doctors=1)
+    doctor = db.get(Doctor, setup["doctor_ids"][0])
+    doctor_user_id = doctor.user_id
+    appointment_id = _book(db, setup["patient_id"], doctor.id, time(9, 0))
+    service = AppointmentService(db)
+    later = DAY + timedelta(days=1)
+
+    assert service.get_cached_doctor_schedule(doctor_user_id, later).body == b"[]"
+    assert service.get_cached_doctor_schedule(doctor_user_id, DAY).body != b"[]"
+    service.reschedule_appointment(
+        appointment_id, AppointmentReschedule(new_date=later, new_time=time(9, 0)), setup["receptionist_id"]
+    )
+    assert service.get_cached_doctor_schedule(doctor_user_id, DAY).body == b"[]"
+    moved = json.loads(service.get_cached_doctor_schedule(doctor_user_id, later).body)
+    assert [a["id"] for a in moved] == [appointment_id]
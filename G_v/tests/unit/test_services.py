@@ -4,7 +4,7 @@ Unit tests for core services
 import pytest
 from services.user_service import UserService
 from services.patient_service import PatientService
-from models import UserRole, Organization, Branch
+from models import User, UserRole, Organization, Branch
 from schemas.user import UserCreate, DoctorCreate
 from schemas.patient import PatientCreate
 from decimal import Decimal
@@ -73,3 +73,85 @@ def test_patient_registration(db, create_test_user):
     
     assert patient.patient_uid.startswith("TES-DEL-P")
     assert patient.blood_group == "O+"
+
+def test_legacy_password_hash_is_upgraded_on_login(db, create_test_user):
+    import hashlib
+    from utils.password_hasher import password_hasher
+
+    user = create_test_user("legacy@example.com", UserRole.NURSE)
+    user.password_hash = hashlib.sha256(b"password123").hexdigest()
+    db.commit()
+
+    authenticated = UserService(db).authenticate_user("legacy@example.com", "password123")
+
+    assert authenticated is not None
+    assert authenticated.password_hash.startswith("$2")
+    assert not password_hasher.needs_rehash(authenticated.password_hash)
+    assert UserService(db).authenticate_user("legacy@example.com", "password123") is not None
+    assert UserService(db).authenticate_user("legacy@example.com", "wrong") is None
+
+
+def test_login_endpoint_upgrades_legacy_hash(client, db, create_test_user):
+    import hashlib
+
+    user = create_test_user("legacy-login@example.com", UserRole.NURSE)
+    user.password_hash = hashlib.sha256(b"password123").hexdigest()
+    db.commit()
+
+    response = client.post("/auth/login", json={"email": "legacy-login@example.com", "password": "password123"})
+    assert response.status_code == 200
+    db.refresh(user)
+    assert user.password_hash.startswith("$2")
+    wrong = client.post("/auth/login", json={"email": "legacy-login@example.com", "password": "wrong"})
+    assert wrong.status_code == 401
+
+
+def test_async_rehash_returns_loaded_user(db, create_test_user):
+    import asyncio
+    import hashlib
+    from sqlalchemy import inspect
+
+    user = create_test_user("legacy-async@example.com", UserRole.NURSE)
+    user.password_hash = hashlib.sha256(b"password123").hexdigest()
+    db.commit()
+
+    authenticated = asyncio.run(UserService(db).authenticate_user_async("legacy-async@example.com", "password123"))
+    assert authenticated is not None
+    # No column left expired, so the login handler reads it without touching the DB
+    columns = {attr.key for attr in inspect(User).column_attrs}
+    assert not inspect(authenticated).expired_attributes & columns
+    assert authenticated.password_hash.startswith("$2")
+
+
+def test_password_hasher_timeout_is_service_unavailable():
+    import asyncio
+    import threading
+    from utils.exceptions import ServiceUnavailableError
+    from utils.password_hasher import PasswordHasher
+
+    hasher = PasswordHasher(rounds=4, workers=1, max_queue=3, timeout_seconds=0.05)
+    release = threading.Event()
+    try:
+        with pytest.raises(ServiceUnavailableError):
+            hasher._wait(hasher._submit(release.wait, 5))
+        with pytest.raises(ServiceUnavailableError):
+            asyncio.run(hasher._await(hasher._submit(release.wait, 5)))
+
+        async def burst():
+            calls = [hasher._await(hasher._submit(release.wait, 5)) for _ in range(2)]
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        results = asyncio.run(burst())
+        assert all(isinstance(r, ServiceUnavailableError) for r in results)
+    finally:
+        release.set()
+        hasher.shutdown()
+
+    # Queued submissions cancelled by the async timeouts must not leak slots
+    stats = hasher.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["running"] == 0
+    acquired = 0
+    while hasher._slots.acquire(blocking=False):
+        acquired += 1
+    assert acquired == hasher.workers + hasher.max_queue
@@ -0,0 +1,167 @@
+"""
+Idempotent schema upgrades for databases created before new columns were added.
+New tables are created by create_all; this only patches existing tables.
+"""
+from sqlalchemy import bindparam, text, inspect
+from database import engine
+from models import Base, ACTIVE_APPOINTMENT_STATUSES
+from services.log_partition_service import LOG_TABLES, month_start, add_months, partition_name
+
+# (table, column, DDL type/default)
+COLUMN_UPGRADES = [
+    ("users", "token_version", "INTEGER NOT NULL DEFAULT 0"),
+    ("patient_access_logs", "last_accessed_at", "TIMESTAMP"),
+    ("patient_access_logs", "access_count", "INTEGER NOT NULL DEFAULT 1"),
+    ("rooms", "occupied_beds", "INTEGER NOT NULL DEFAULT 0"),
+    ("rooms", "closed_by_staff", "BOOLEAN NOT NULL DEFAULT FALSE"),
+    ("appointments", "branch_id", "INTEGER REFERENCES branches (id)"),
+    ("doctors", "appointment_minutes", "INTEGER"),
+    ("appointments", "duration_minutes", "INTEGER NOT NULL DEFAULT 15"),
+    ("appointments", "end_time", "TIME"),
+]
+
+# Fill newly added columns on existing rows (safe to re-run)
+DATA_BACKFILLS = [
+    "UPDATE appointments SET branch_id = "
+    "(SELECT patients.branch_id FROM patients WHERE patients.id = appointments.patient_id) "
+    "WHERE branch_id IS NULL",
+    # Beds held by patients admitted before occupied_beds was tracked
+    "UPDATE rooms SET occupied_beds = "
+    "(SELECT COUNT(*) FROM admissions WHERE admissions.room_id = rooms.id AND admissions.status = 'ADMITTED')",
+    # Only staff close a room that still has free beds
+    "UPDATE rooms SET closed_by_staff = TRUE "
+    "WHERE is_available = FALSE AND occupied_beds < COALESCE(capacity, 1)",
+]
+
+# Backfills whose date/time arithmetic differs per dialect. TIME arithmetic
+# wraps at midnight (an end before the start), so such bookings are capped at
+# the end of the day like models.appointment_end.
+DIALECT_BACKFILLS = {
+    "postgresql": [
+        "UPDATE appointments SET end_time = CASE "
+        "WHEN appointment_time + duration_minutes * interval '1 minute' < appointment_time "
+        "THEN time '23:59:59.999999' "
+        "ELSE appointment_time + duration_minutes * interval '1 minute' END "
+        "WHERE end_time IS NULL",
+    ],
+    "sqlite": [
+        # Same text format SQLAlchemy writes for TIME, so range comparisons stay lexical
+        "UPDATE appointments SET end_time = CASE "
+        "WHEN time(appointment_time, '+' || duration_minutes || ' minutes') < time(appointment_time) "
+        "THEN '23:59:59.999999' "
+        "ELSE time(appointment_time, '+' || duration_minutes || ' minutes') || '.000000' END "
+        "WHERE end_time IS NULL",
+    ],
+}
+
+# Foreign keys re-added after a log table is rebuilt as a partitioned table
+LOG_TABLE_FOREIGN_KEYS = {
+    "audit_logs": ["FOREIGN KEY (user_id) REFERENCES users (id)"],
+    "patient_access_logs": [
+        "FOREIGN KEY (patient_id) REFERENCES patients (id)",
+        "FOREIGN KEY (accessed_by) REFERENCES users (id)",
+    ],
+}
+
+
+def partition_log_table(connection, table: str, key: str, months_ahead: int = 2):
+    """
+    Rebuild a PostgreSQL log table as RANGE-partitioned by month (one-off).
+    The primary key becomes (id, key) because PostgreSQL requires the
+    partition key in every unique constraint.
+    """
+    is_partitioned = connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :table"
+    ), {"table": table}).first()
+    if is_partitioned:
+        print(f"{table} already partitioned")
+        return
+
+    print(f"Partitioning {table} by month on {key}...")
+    legacy = f"{table}_unpartitioned"
+    connection.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+    connection.execute(text(f"UPDATE {legacy} SET {key} = now() WHERE {key} IS NULL"))
+    connection.execute(text(
+        f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})"
+    ))
+    connection.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {key})"))
+    connection.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+
+    oldest = connection.execute(text(f"SELECT MIN({key}) FROM {legacy}")).scalar()
+    last = add_months(month_start(connection.execute(text("SELECT now()::timestamp")).scalar()), months_ahead)
+    month = month_start(oldest) if oldest else month_start(last)
+    while month <= last:
+        connection.execute(text(
+            f"CREATE TABLE {partition_name(table, month)} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+        ))
+        month = add_months(month, 1)
+
+    connection.execute(text(f"INSERT INTO {table} SELECT * FROM {legacy}"))
+    sequence = connection.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": legacy}).scalar()
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+    connection.execute(text(f"DROP TABLE {legacy}"))
+
+    for index in Base.metadata.tables[table].indexes:
+        index.create(connection)
+    for constraint in LOG_TABLE_FOREIGN_KEYS.get(table, []):
+        connection.execute(text(f"ALTER TABLE {table} ADD {constraint}"))
+
+
+def cancel_duplicate_bookings(connection):
+    """
+    Cancel all but the earliest active booking of each doctor slot, so that
+    uq_appointment_doctor_slot can be built over data written before it existed.
+    """
+    active = ", ".join(f"'{status.name}'" for status in ACTIVE_APPOINTMENT_STATUSES)
+    duplicates = connection.execute(text(
+        "SELECT a.id, a.doctor_id, a.appointment_date, a.appointment_time FROM appointments a "
+        f"WHERE a.status IN ({active}) AND EXISTS ("
+        "SELECT 1 FROM appointments b WHERE b.doctor_id = a.doctor_id "
+        "AND b.appointment_date = a.appointment_date AND b.appointment_time = a.appointment_time "
+        f"AND b.status IN ({active}) AND b.id < a.id) ORDER BY a.id"
+    )).all()
+    if not duplicates:
+        return
+    for appointment_id, doctor_id, day, at in duplicates:
+        print(f"Cancelling appointment {appointment_id}: doctor {doctor_id} already booked on {day} at {at}")
+    connection.execute(
+        text("UPDATE appointments SET status = 'CANCELLED' WHERE id IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        ),
+        {"ids": [row.id for row in duplicates]}
+    )
+
+
+def upgrade_schema():
+    Base.metadata.create_all(engine)
+    inspector = inspect(engine)
+
+    with engine.begin() as connection:
+        for table, column, ddl in COLUMN_UPGRADES:
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            if column in existing:
+                print(f"{table}.{column} already present")
+                continue
+            print(f"Adding {table}.{column}...")
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        for statement in DATA_BACKFILLS + DIALECT_BACKFILLS.get(engine.dialect.name, []):
+            connection.execute(text(statement))
+
+    if engine.dialect.name == "postgresql":
+        for table, (_, key) in LOG_TABLES.items():
+            with engine.begin() as connection:
+                partition_log_table(connection, table, key)
+
+    # Indexes added to existing tables (create_all skips tables that exist)
+    with engine.begin() as connection:
+        cancel_duplicate_bookings(connection)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+if __name__ == "__main__":
+    upgrade_schema()
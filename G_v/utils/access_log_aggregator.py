@@ -0,0 +1,184 @@
+"""
+Access Log Aggregator - coalesces repeated patient record views into one row
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from models import PatientAccessLog
+
+AccessKey = Tuple[int, int, str, Optional[str], Optional[str]]
+
+
+class AccessLogAggregator:
+    """
+    Repeated views of the same record by the same user are merged while they
+    fall within ``window_seconds`` of the first view: the row keeps
+    ``accessed_at`` (first view), ``last_accessed_at`` and ``access_count``.
+    Events are only merged when patient, accessor, access type, stated reason
+    and IP all match, so no detail the compliance report shows is lost.
+
+    The first view of a window is added to the caller's session (flushed for
+    its id, committed with the request), so no extra connection or commit is
+    spent and a crash can only lose the counters of open windows, never the
+    access itself. Windows that
+    absorbed repeat views have their counters updated in bulk by a background
+    thread once they close; at most ``max_open`` windows are held in memory
+    (the oldest is closed early when the limit is hit) and ``shutdown`` writes
+    out everything still open. With ``start_thread=False`` counters are only
+    written when ``flush`` or ``shutdown`` is called.
+    """
+
+    def __init__(self, session_factory, window_seconds: float,
+                 flush_interval: float = 1.0, max_open: int = 50000, start_thread: bool = True):
+        self.session_factory = session_factory
+        self.start_thread = start_thread
+        self.window = timedelta(seconds=window_seconds)
+        self.flush_interval = flush_interval
+        self.max_open = max_open
+        # Ordered by first access, so expired windows are always at the front
+        self._open: "OrderedDict[AccessKey, Dict[str, Any]]" = OrderedDict()
+        self._closed: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.events = 0
+        self.coalesced = 0
+        self.rows_written = 0
+        self.rows_updated = 0
+        self.failures = 0
+
+    def record(self, db: Session, patient_id: int, accessed_by: int, access_type: str,
+               access_reason: Optional[str] = None, ip_address: Optional[str] = None,
+               now: Optional[datetime] = None) -> bool:
+        """Returns True if a row was added to ``db`` and still needs the caller's commit"""
+        now = now or datetime.utcnow()
+        key = (patient_id, accessed_by, access_type, access_reason, ip_address)
+        with self._cond:
+            self.events += 1
+            window = self._open.get(key)
+            if window is not None and now - window["accessed_at"] < self.window:
+                window["access_count"] += 1
+                window["last_accessed_at"] = now
+                self.coalesced += 1
+                return False
+
+        # Flushed outside the lock; two first views racing on the same key
+        # just get a row each
+        row = PatientAccessLog(
+            patient_id=patient_id,
+            accessed_by=accessed_by,
+            access_type=access_type,
+            access_reason=access_reason,
+            ip_address=ip_address,
+            accessed_at=now,
+            last_accessed_at=now,
+            access_count=1
+        )
+        db.add(row)
+        db.flush()
+        row_id = row.id
+        with self._cond:
+            self.rows_written += 1
+            previous = self._open.pop(key, None)
+            if previous is not None:
+                self._close(previous)
+            self._open[key] = {
+                "id": row_id,
+                "accessed_at": now,
+                "last_accessed_at": now,
+                "access_count": 1
+            }
+            if len(self._open) > self.max_open:
+                self._close(self._open.popitem(last=False)[1])
+                self._cond.notify()
+            if self.start_thread and self._thread is None and not self._stopping:
+                self._thread = threading.Thread(target=self._run, name="access-log-aggregator", daemon=True)
+                self._thread.start()
+        return True
+
+    def _close(self, window: Dict[str, Any]) -> None:
+        # Caller holds the condition; a single view is already fully written
+        if window["access_count"] > 1:
+            self._closed.append(window)
+
+    def _close_expired(self, now: datetime, force: bool) -> None:
+        # Caller holds the condition
+        while self._open:
+            key, window = next(iter(self._open.items()))
+            if not force and now - window["accessed_at"] < self.window:
+                break
+            self._close(self._open.pop(key))
+
+    def flush(self, force: bool = False, now: Optional[datetime] = None) -> int:
+        """Update counters of closed windows (and all open ones when ``force``)"""
+        with self._flush_lock:
+            with self._cond:
+                self._close_expired(now or datetime.utcnow(), force)
+                windows, self._closed = self._closed, []
+            if not windows:
+                return 0
+
+            db = self.session_factory()
+            try:
+                db.execute(update(PatientAccessLog), [
+                    {
+                        "id": window["id"],
+                        "access_count": window["access_count"],
+                        "last_accessed_at": window["last_accessed_at"]
+                    }
+                    for window in windows
+                ])
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._cond:
+                    self._closed[:0] = windows
+                    self.failures += 1
+                raise
+            finally:
+                db.close()
+
+            with self._cond:
+                self.rows_updated += len(windows)
+            return len(windows)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopping:
+                    self._cond.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                time.sleep(self.flush_interval)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=self.flush_interval * 5)
+        self.flush(force=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "window_seconds": self.window.total_seconds(),
+                "open_windows": len(self._open),
+                "pending_updates": len(self._closed),
+                "events": self.events,
+                "coalesced": self.coalesced,
+                "rows_written": self.rows_written,
+                "rows_updated": self.rows_updated,
+                "failures": self.failures
+            }
@@ -1,16 +1,188 @@
 """
 Audit Logging Utility
 """
+import atexit
+import threading
+import time
+from collections import deque
 from datetime import datetime
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List, Tuple
+
+from sqlalchemy import event, insert
 from sqlalchemy.orm import Session
 
+from config import settings
 from models import AuditLog, PatientAccessLog
+from utils.access_log_aggregator import AccessLogAggregator
+
+TRANSACTIONAL = "transactional"
+WRITE_BEHIND = "write_behind"
+
+
+class AuditWriter:
+    """
+    Write-behind queue for audit rows. A background thread bulk-inserts
+    queued rows (one executemany per table) every ``flush_interval`` seconds
+    or as soon as ``batch_size`` rows are waiting.
+
+    Memory is bounded by ``max_queue``: when the queue is full the submitting
+    thread flushes a batch itself, so callers slow down instead of rows being
+    dropped. ``shutdown`` drains everything that is still queued.
+
+    With ``start_thread=False`` no background thread is started and rows are
+    only written by caller flushes, ``flush`` and ``shutdown``.
+    """
+
+    def __init__(self, session_factory, max_queue: int, batch_size: int, flush_interval: float,
+                 start_thread: bool = True):
+        self.session_factory = session_factory
+        self.start_thread = start_thread
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.caller_flushes = 0
+        self.failures = 0
+
+    def _ensure_started(self) -> None:
+        # Caller holds the condition
+        if self.start_thread and self._thread is None and not self._stopping:
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, rows: List[Tuple[Any, Dict[str, Any]]]) -> None:
+        """Queue (model, values) pairs for insertion"""
+        while True:
+            with self._cond:
+                if len(self._queue) + len(rows) <= self.max_queue or not self._queue:
+                    self._queue.extend(rows)
+                    self.enqueued += len(rows)
+                    self._ensure_started()
+                    if len(self._queue) >= self.batch_size:
+                        self._cond.notify()
+                    return
+                self.caller_flushes += 1
+            self._flush_batch()
+
+    def _take(self) -> List[Tuple[Any, Dict[str, Any]]]:
+        with self._cond:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+        return batch
+
+    def _flush_batch(self) -> int:
+        with self._flush_lock:
+            batch = self._take()
+            if not batch:
+                return 0
+            by_model: Dict[Any, List[Dict[str, Any]]] = {}
+            for model, values in batch:
+                by_model.setdefault(model, []).append(values)
+
+            db = self.session_factory()
+            try:
+                for model, values in by_model.items():
+                    db.execute(insert(model), values)
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._cond:
+                    # Keep the rows for the next attempt
+                    self._queue.extendleft(reversed(batch))
+                    self.failures += 1
+                raise
+            finally:
+                db.close()
+
+            with self._cond:
+                self.written += len(batch)
+                self.batches += 1
+            return len(batch)
+
+    def flush(self) -> int:
+        """Synchronously write everything queued so far"""
+        total = 0
+        while True:
+            written = self._flush_batch()
+            if not written:
+                return total
+            total += written
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._queue) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                # Rows were re-queued; retry on the next interval
+                time.sleep(self.flush_interval)
+
+    def shutdown(self) -> None:
+        """Stop the flusher and write out every queued row"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=self.flush_interval * 5)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "queued": len(self._queue),
+                "max_queue": self.max_queue,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "batches": self.batches,
+                "caller_flushes": self.caller_flushes,
+                "failures": self.failures
+            }
 
 
 class AuditLogger:
-    @staticmethod
+    """
+    ``transactional`` mode adds audit rows to the caller's session so they
+    commit (or roll back) together with the business change in a single
+    commit. ``write_behind`` mode stages rows on the session and hands them
+    to an ``AuditWriter`` once the session commits; rows staged by a
+    transaction that rolls back are discarded. Patient access is an event in
+    itself, so in write-behind mode it is queued immediately.
+
+    With an ``access_aggregator`` configured, patient access events bypass
+    both modes: the first view of a window joins the caller's transaction
+    and repeats only bump its counters.
+    """
+
+    def __init__(self, mode: str = TRANSACTIONAL, writer: Optional[AuditWriter] = None,
+                 access_aggregator: Optional[AccessLogAggregator] = None):
+        if mode not in (TRANSACTIONAL, WRITE_BEHIND):
+            raise ValueError(f"Unknown audit mode '{mode}'")
+        if mode == WRITE_BEHIND and writer is None:
+            raise ValueError("write_behind audit mode requires a writer")
+        self.mode = mode
+        self.writer = writer
+        self.access_aggregator = access_aggregator
+
+    def _stage(self, db: Session, model, values: Dict[str, Any]) -> None:
+        # Staged rows belong to the current transaction; make sure there is one
+        # so a rollback before any SQL was issued still discards them
+        if not db.in_transaction():
+            db.begin()
+        db.info.setdefault("audit_pending", []).append((self, model, values))
+
     def log_action(
+        self,
         db: Session,
         user_id: int,
         action: str,
@@ -21,8 +193,8 @@ class AuditLogger:
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None
     ):
-        """Log any action to audit log"""
-        audit = AuditLog(
+        """Log any action to audit log (written with the caller's commit)"""
+        values = dict(
             user_id=user_id,
             action=action,
             entity_type=entity_type,
@@ -33,20 +205,28 @@ class AuditLogger:
             user_agent=user_agent,
             created_at=datetime.utcnow()
         )
-        db.add(audit)
-        db.commit()
-    
-    @staticmethod
+        if self.mode == WRITE_BEHIND:
+            self._stage(db, AuditLog, values)
+        else:
+            db.add(AuditLog(**values))
+
     def log_patient_access(
+        self,
         db: Session,
         patient_id: int,
         accessed_by: int,
         access_type: str,
         access_reason: Optional[str] = None,
         ip_address: Optional[str] = None
-    ):
-        """Log patient record access (compliance requirement)"""
-        access_log = PatientAccessLog(
+    ) -> bool:
+        """
+        Log patient record access (compliance requirement).
+        Returns True if a row was added to ``db`` and still needs the caller's commit.
+        """
+        if self.access_aggregator is not None:
+            return self.access_aggregator.record(db, patient_id, accessed_by, access_type, access_reason, ip_address)
+        
+        values = dict(
             patient_id=patient_id,
             accessed_by=accessed_by,
             access_type=access_type,
@@ -54,8 +234,68 @@ class AuditLogger:
             ip_address=ip_address,
             accessed_at=datetime.utcnow()
         )
-        db.add(access_log)
-        db.commit()
+        if self.mode == WRITE_BEHIND:
+            self.writer.submit([(PatientAccessLog, values)])
+            return False
+        db.add(PatientAccessLog(**values))
+        return True
+
+    def shutdown(self) -> None:
+        if self.access_aggregator is not None:
+            self.access_aggregator.shutdown()
+        if self.writer is not None:
+            self.writer.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "writer": self.writer.stats() if self.writer else None,
+            "access_aggregator": self.access_aggregator.stats() if self.access_aggregator else None
+        }
+
+
+@event.listens_for(Session, "after_commit")
+def _submit_staged_audit(session):
+    pending = session.info.pop("audit_pending", None)
+    if not pending:
+        return
+    by_logger: Dict[AuditLogger, List[Tuple[Any, Dict[str, Any]]]] = {}
+    for logger, model, values in pending:
+        by_logger.setdefault(logger, []).append((model, values))
+    for logger, rows in by_logger.items():
+        logger.writer.submit(rows)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_staged_audit(session, previous_transaction):
+    # Only an outermost rollback discards; savepoint rollbacks keep staged rows
+    if not session.in_transaction():
+        session.info.pop("audit_pending", None)
+
+
+def _build_audit_logger() -> AuditLogger:
+    from database import SessionLocal
+
+    aggregator = None
+    if settings.ACCESS_LOG_COALESCE_SECONDS > 0:
+        aggregator = AccessLogAggregator(
+            SessionLocal,
+            window_seconds=settings.ACCESS_LOG_COALESCE_SECONDS,
+            flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS
+        )
+
+    writer = None
+    if settings.AUDIT_MODE == WRITE_BEHIND:
+        writer = AuditWriter(
+            SessionLocal,
+            max_queue=settings.AUDIT_QUEUE_MAX_SIZE,
+            batch_size=settings.AUDIT_BATCH_SIZE,
+            flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS
+        )
+
+    logger = AuditLogger(WRITE_BEHIND if writer else TRANSACTIONAL, writer, aggregator)
+    atexit.register(logger.shutdown)
+    return logger
 
 
-audit_logger = AuditLogger()
+audit_logger = _build_audit_logger()
@@ -0,0 +1,26 @@
+"""
+Eager Loading - turn a response schema's relationship paths into loader options
+"""
+from typing import Iterable, List
+
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def loader_options(model, paths: Iterable[str]) -> List:
+    """
+    ``"patient.user"`` becomes ``joinedload(Appointment.patient).joinedload(Patient.user)``.
+    Many-to-one hops are joined into the main query and collections are
+    fetched with one extra SELECT ... IN per hop, so the number of queries
+    depends on the paths, not on how many rows are loaded.
+    """
+    options = []
+    for path in paths:
+        option, current = None, model
+        for name in path.split("."):
+            attribute = getattr(current, name)
+            relationship = attribute.property
+            strategy = selectinload if relationship.uselist else joinedload
+            option = strategy(attribute) if option is None else getattr(option, strategy.__name__)(attribute)
+            current = relationship.mapper.class_
+        options.append(option)
+    return options
@@ -33,3 +33,8 @@ class ConflictError(IHORMSException):
 class ValidationError(IHORMSException):
     def __init__(self, detail: str):
         super().__init__(detail=detail, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+class ServiceUnavailableError(IHORMSException):
+    def __init__(self, detail: str = "Service temporarily unavailable"):
+        super().__init__(detail=detail, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -1,19 +1,20 @@
 """
 Helper Functions
 """
-import hashlib
 from typing import Optional, List, Any
 from datetime import datetime, date, time
 
+from utils.password_hasher import password_hasher
+
 
 def hash_password(password: str) -> str:
-    """Hash password using SHA256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password with bcrypt (runs on the password hashing pool)"""
+    return password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against hash"""
-    return hash_password(plain_password) == hashed_password
+    """Verify password against a bcrypt or legacy SHA256 hash"""
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def generate_user_id(org_code: str, branch_code: str, entity_type: str, sequence: int) -> str:
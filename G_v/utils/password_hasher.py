@@ -0,0 +1,170 @@
+"""
+Password Hashing - bcrypt KDF work on a dedicated, bounded worker pool
+"""
+import asyncio
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict
+
+import bcrypt
+
+from config import settings
+from utils.exceptions import ServiceUnavailableError
+
+# bcrypt only consumes the first 72 bytes of a password
+BCRYPT_MAX_BYTES = 72
+
+
+def _legacy_sha256(password: str) -> str:
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing/verification on its own thread pool so KDF work is
+    capped at a fixed CPU concurrency instead of competing with every
+    request thread. Submissions beyond ``workers + max_queue`` are rejected
+    with a 503 rather than piling up during login bursts.
+
+    Async callers (login) await the pool without holding a thread for the
+    KDF run; either way a run exceeding ``timeout_seconds`` is a 503.
+
+    Legacy unsalted SHA-256 hashes are still accepted (verified inline, it is
+    cheap) and reported by ``needs_rehash`` so callers can upgrade them.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_queue: int, timeout_seconds: float):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-kdf")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    # ---------- KDF primitives (run on the pool) ----------
+    @staticmethod
+    def _encode(password: str) -> bytes:
+        return password.encode()[:BCRYPT_MAX_BYTES]
+
+    def _bcrypt_hash(self, password: str) -> str:
+        return bcrypt.hashpw(self._encode(password), bcrypt.gensalt(rounds=self.rounds)).decode()
+
+    def _bcrypt_verify(self, password: str, hashed: str) -> bool:
+        try:
+            return bcrypt.checkpw(self._encode(password), hashed.encode())
+        except ValueError:
+            return False
+
+    def _submit(self, fn: Callable[..., Any], *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ServiceUnavailableError("Authentication service is busy, please retry")
+
+        with self._lock:
+            self.queued += 1
+
+        def run():
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                self._slots.release()
+
+        def release_if_cancelled(future: Future):
+            # A future cancelled while still queued (async timeout or a
+            # cancelled request) never reaches ``run``, so give its slot back here
+            if future.cancelled():
+                with self._lock:
+                    self.queued -= 1
+                self._slots.release()
+
+        future = self._executor.submit(run)
+        future.add_done_callback(release_if_cancelled)
+        return future
+
+    def _wait(self, future: Future) -> Any:
+        try:
+            return future.result(self.timeout_seconds)
+        except FutureTimeoutError:
+            raise ServiceUnavailableError("Authentication service timed out, please retry")
+
+    async def _await(self, future: Future) -> Any:
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            raise ServiceUnavailableError("Authentication service timed out, please retry")
+
+    # ---------- Public API ----------
+    @staticmethod
+    def is_legacy(hashed: str) -> bool:
+        return not hashed.startswith("$2")
+
+    def needs_rehash(self, hashed: str) -> bool:
+        if self.is_legacy(hashed):
+            return True
+        try:
+            return int(hashed.split("$")[2]) < self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def hash(self, password: str) -> str:
+        return self._wait(self._submit(self._bcrypt_hash, password))
+
+    def verify(self, password: str, hashed: str) -> bool:
+        if not hashed:
+            return False
+        if self.is_legacy(hashed):
+            return hmac.compare_digest(_legacy_sha256(password), hashed)
+        return self._wait(self._submit(self._bcrypt_verify, password, hashed))
+
+    async def hash_async(self, password: str) -> str:
+        return await self._await(self._submit(self._bcrypt_hash, password))
+
+    async def verify_async(self, password: str, hashed: str) -> bool:
+        if not hashed:
+            return False
+        if self.is_legacy(hashed):
+            return hmac.compare_digest(_legacy_sha256(password), hashed)
+        return await self._await(self._submit(self._bcrypt_verify, password, hashed))
+
+    def record_rehash(self) -> None:
+        with self._lock:
+            self.rehashed += 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed
+            }
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS or (os.cpu_count() or 2),
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    timeout_seconds=settings.PASSWORD_HASH_TIMEOUT_SECONDS
+)
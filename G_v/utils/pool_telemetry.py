@@ -0,0 +1,170 @@
+"""
+Connection Pool Telemetry - checkout wait, hold time per route, overflow and timeouts
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+# Set per request by the middleware in main.py. Holds the ASGI scope so the
+# matched route template (filled in by the router after the middleware runs)
+# is visible when a connection is checked out.
+current_request_scope: ContextVar[Optional[dict]] = ContextVar("current_request_scope", default=None)
+
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+MAX_TRACKED_ROUTES = 500
+
+
+def current_route() -> str:
+    scope = current_request_scope.get()
+    if scope is None:
+        return "<background>"
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return f"{scope.get('method', '')} {route.path}".strip()
+    return "<unmatched>"
+
+
+class PoolTelemetry:
+    """Aggregates pool events for one engine; all counters are process-local"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+            self.wait_count = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.checkouts = 0
+            self.overflow_checkouts = 0
+            self.peak_overflow = 0
+            self.timeouts = 0
+            self.timeouts_by_route: Dict[str, int] = {}
+            self.holds: Dict[str, list] = {}
+
+    def _route_key(self, table: Dict[str, Any], route: str) -> str:
+        # Caller holds the lock; caps cardinality if unmatched paths leak in
+        if route in table or len(table) < MAX_TRACKED_ROUTES:
+            return route
+        return "<other>"
+
+    # ---------- recorders ----------
+    def record_wait(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.wait_buckets[bisect_left(WAIT_BUCKETS_MS, elapsed_ms)] += 1
+            self.wait_count += 1
+            self.wait_total_ms += elapsed_ms
+            self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+
+    def record_timeout(self, route: str) -> None:
+        with self._lock:
+            self.timeouts += 1
+            key = self._route_key(self.timeouts_by_route, route)
+            self.timeouts_by_route[key] = self.timeouts_by_route.get(key, 0) + 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        pool = self.engine.pool
+        overflow = pool.overflow() if isinstance(pool, QueuePool) else 0
+        connection_record.info["checkout_at"] = time.perf_counter()
+        connection_record.info["checkout_route"] = current_route()
+        with self._lock:
+            self.checkouts += 1
+            if overflow > 0:
+                self.overflow_checkouts += 1
+                self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def on_checkin(self, dbapi_connection, connection_record) -> None:
+        started = connection_record.info.pop("checkout_at", None)
+        route = connection_record.info.pop("checkout_route", "<background>")
+        if started is None:
+            return
+        held_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            key = self._route_key(self.holds, route)
+            entry = self.holds.setdefault(key, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += held_ms
+            entry[2] = max(entry[2], held_ms)
+
+    # ---------- reporting ----------
+    def stats(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        with self._lock:
+            histogram = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)}
+            histogram["gt_5000ms"] = self.wait_buckets[-1]
+            holds = sorted(self.holds.items(), key=lambda item: item[1][1], reverse=True)
+            return {
+                "pool_size": pool.size() if isinstance(pool, QueuePool) else None,
+                "checked_out": pool.checkedout() if isinstance(pool, QueuePool) else None,
+                "overflow": pool.overflow() if isinstance(pool, QueuePool) else None,
+                "max_overflow": getattr(pool, "_max_overflow", None),
+                "checkouts": self.checkouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "peak_overflow": self.peak_overflow,
+                "timeouts": self.timeouts,
+                "timeouts_by_route": dict(self.timeouts_by_route),
+                "checkout_wait": {
+                    "count": self.wait_count,
+                    "avg_ms": round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else 0.0,
+                    "max_ms": round(self.wait_max_ms, 3),
+                    "histogram": histogram
+                },
+                "hold_time_by_route": {
+                    route: {
+                        "checkouts": count,
+                        "total_ms": round(total, 3),
+                        "avg_ms": round(total / count, 3),
+                        "max_ms": round(peak, 3)
+                    }
+                    for route, (count, total, peak) in holds
+                }
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times ``connect()``. Pool events only fire once a
+    connection has been handed out, so checkout wait and timeouts are
+    measured here; ``telemetry`` is looked up by logging name so it survives
+    ``pool.recreate()``.
+    """
+
+    def connect(self):
+        telemetry = pool_telemetry.get(self.logging_name)
+        if telemetry is None:
+            return super().connect()
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            telemetry.record_timeout(current_route())
+            raise
+        telemetry.record_wait((time.perf_counter() - started) * 1000)
+        return connection
+
+
+pool_telemetry: Dict[str, PoolTelemetry] = {}
+
+
+def instrument_engine(engine, name: str) -> PoolTelemetry:
+    """
+    Attach telemetry listeners to ``engine`` (idempotent per name). Create the
+    engine with ``poolclass=InstrumentedQueuePool, pool_logging_name=name``
+    to also capture checkout wait and timeouts.
+    """
+    telemetry = pool_telemetry.get(name)
+    if telemetry is None:
+        telemetry = pool_telemetry[name] = PoolTelemetry(name)
+        event.listen(engine, "checkout", telemetry.on_checkout)
+        event.listen(engine, "checkin", telemetry.on_checkin)
+    telemetry.engine = engine
+    return telemetry
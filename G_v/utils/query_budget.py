@@ -0,0 +1,116 @@
+"""
+Query Budget - per-request statement counts, DB time and N+1 detection
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import settings
+
+logger = logging.getLogger("ihorms.query_budget")
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists and literal numbers vary per call but not per shape
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_NUMBER = re.compile(r"\b\d+\b")
+
+
+def statement_shape(statement: str) -> str:
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _NUMBER.sub("?", shape)
+
+
+class QueryStats:
+    """Statements executed within one request (or one ``track_queries`` block)"""
+
+    def __init__(self):
+        self.count = 0
+        self.db_time_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.db_time_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Dict[str, Any]]:
+        """Statement shapes executed at least ``threshold`` times (likely N+1)"""
+        return [
+            {"statement": shape, "count": count}
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+    def violations(self, max_statements: int, max_db_ms: float, n1_threshold: int) -> List[str]:
+        problems = []
+        if self.count > max_statements:
+            problems.append(f"{self.count} statements (budget {max_statements})")
+        if self.db_time_ms > max_db_ms:
+            problems.append(f"{self.db_time_ms:.0f}ms DB time (budget {max_db_ms:.0f}ms)")
+        for item in self.repeated(n1_threshold):
+            problems.append(f"N+1: {item['count']}x {item['statement'][:120]}")
+        return problems
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    stats.record(statement, (time.perf_counter() - started.pop()) * 1000)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; pop its start time
+    # so later statements on this connection are not timed against it
+    stats = _current_stats.get()
+    if stats is None or context.execution_context is None or context.connection is None:
+        return
+    started = context.connection.info.get("query_started")
+    if not started:
+        return
+    stats.record(context.statement or "", (time.perf_counter() - started.pop()) * 1000)
+
+
+@contextmanager
+def track_queries():
+    """Collect statements executed inside the block (nested blocks are independent)"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def check_budget(route: str, stats: QueryStats) -> List[str]:
+    """Log and return budget violations for a finished request"""
+    problems = stats.violations(
+        settings.QUERY_BUDGET_MAX_STATEMENTS,
+        settings.QUERY_BUDGET_MAX_DB_MS,
+        settings.QUERY_BUDGET_N1_THRESHOLD
+    )
+    if problems:
+        logger.warning("Query budget exceeded on %s: %s", route, "; ".join(problems))
+    return problems
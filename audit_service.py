@@ -0,0 +1,155 @@
+# audit_service.py
+"""
+Audit query service with keyset (cursor) pagination.
+
+Pages are ordered newest first by (timestamp, id) and continue from the last
+row of the previous page instead of using OFFSET, so page N costs the same
+as page 1. Every filter combination below is backed by a composite index
+ending in (timestamp, id) in models.py.
+"""
+import base64
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from models import AuditLog, PatientAccessLog, SystemEvent, User
+
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(stamp: datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{stamp.isoformat()}|{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        stamp, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(stamp), int(row_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+
+class AuditQueryService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _page(self, query, stamp_col, id_col, cursor: Optional[str], limit: int, serialize):
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        if cursor:
+            query = query.where(tuple_(stamp_col, id_col) < tuple_(*decode_cursor(cursor)))
+        rows = self.db.execute(
+            query.order_by(stamp_col.desc(), id_col.desc()).limit(limit + 1)
+        ).scalars().all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor(getattr(last, stamp_col.key), getattr(last, id_col.key))
+        return [serialize(row) for row in rows], next_cursor
+
+    def audit_logs(
+        self,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        action: Optional[str] = None,
+        user_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        organization_id: Optional[int] = None,
+        branch_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ):
+        query = select(AuditLog)
+        if entity_type:
+            query = query.where(AuditLog.entity_type == entity_type)
+        if entity_id is not None:
+            query = query.where(AuditLog.entity_id == entity_id)
+        if action:
+            query = query.where(AuditLog.action == action)
+        if user_id is not None:
+            query = query.where(AuditLog.user_id == user_id)
+        if start:
+            query = query.where(AuditLog.created_at >= start)
+        if end:
+            query = query.where(AuditLog.created_at < end)
+        if organization_id is not None or branch_id is not None:
+            # Audit rows carry no tenant; scope through the acting user
+            tenant_users = select(User.id)
+            if organization_id is not None:
+                tenant_users = tenant_users.where(User.organization_id == organization_id)
+            if branch_id is not None:
+                tenant_users = tenant_users.where(User.branch_id == branch_id)
+            query = query.where(AuditLog.user_id.in_(tenant_users))
+
+        return self._page(query, AuditLog.created_at, AuditLog.id, cursor, limit, lambda a: {
+            "id": a.id,
+            "user_id": a.user_id,
+            "action": a.action,
+            "entity_type": a.entity_type,
+            "entity_id": a.entity_id,
+            "before_state": a.before_state,
+            "after_state": a.after_state,
+            "ip_address": a.ip_address,
+            "created_at": a.created_at.isoformat() if a.created_at else None,
+        })
+
+    def patient_access_logs(
+        self,
+        patient_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ):
+        query = select(PatientAccessLog).where(PatientAccessLog.patient_id == patient_id)
+        if start:
+            query = query.where(PatientAccessLog.accessed_at >= start)
+        if end:
+            query = query.where(PatientAccessLog.accessed_at < end)
+
+        return self._page(query, PatientAccessLog.accessed_at, PatientAccessLog.id, cursor, limit, lambda l: {
+            "id": l.id,
+            "patient_id": l.patient_id,
+            "accessed_by": l.accessed_by,
+            "access_type": l.access_type,
+            "access_reason": l.access_reason,
+            "ip_address": l.ip_address,
+            "accessed_at": l.accessed_at.isoformat() if l.accessed_at else None,
+        })
+
+    def system_events(
+        self,
+        event_type: Optional[str] = None,
+        severity: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ):
+        query = select(SystemEvent)
+        if event_type:
+            query = query.where(SystemEvent.event_type == event_type)
+        if severity:
+            query = query.where(SystemEvent.severity == severity)
+        if start:
+            query = query.where(SystemEvent.created_at >= start)
+        if end:
+            query = query.where(SystemEvent.created_at < end)
+
+        return self._page(query, SystemEvent.created_at, SystemEvent.id, cursor, limit, lambda e: {
+            "id": e.id,
+            "event_type": e.event_type,
+            "severity": e.severity,
+            "message": e.message,
+            "metadata": e.event_metadata,
+            "created_at": e.created_at.isoformat() if e.created_at else None,
+        })
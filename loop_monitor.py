@@ -0,0 +1,117 @@
+# loop_monitor.py
+"""
+Event loop lag monitor.
+
+A heartbeat task on the loop stamps the time every ``interval`` seconds. A
+watchdog thread checks that stamp; when the loop has not ticked for more than
+``threshold`` seconds it samples the loop thread's stack, which is exactly
+the synchronous call holding the loop. The worst stall seen is kept so a
+regression (a handler calling blocking I/O inline) shows up in /api/health.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+from typing import Optional
+
+logger = logging.getLogger("ihorms.loop")
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, stack_depth: int = 8):
+        self.interval = interval
+        self.threshold = threshold
+        self.stack_depth = stack_depth
+        self._lock = threading.Lock()
+        self._beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stall_stack = None
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.worst = None
+
+    # ---------- lifecycle ----------
+    def start(self):
+        """Start monitoring the running loop (call from a startup hook)"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._watchdog = None
+
+    # ---------- loop side ----------
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self._record(time.monotonic() - expected)
+
+    def _record(self, lag: float):
+        with self._lock:
+            self._beat = time.monotonic()
+            stack, self._stall_stack = self._stall_stack, None
+            self.max_lag = max(self.max_lag, lag)
+            if lag < self.threshold:
+                return
+            self.stalls += 1
+            is_worst = self.worst is None or lag > self.worst["lag_ms"] / 1000
+            if is_worst:
+                self.worst = {
+                    "lag_ms": round(lag * 1000, 1),
+                    "at": datetime.now(timezone.utc).isoformat(),
+                    "call": stack[-1] if stack else None,
+                    "stack": stack or [],
+                }
+        logger.warning("Event loop blocked for %.0f ms at %s", lag * 1000, stack[-1] if stack else "unknown")
+
+    # ---------- watchdog side ----------
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                stalled = time.monotonic() - self._beat > self.threshold
+                sampled = self._stall_stack is not None
+            if stalled and not sampled:
+                stack = self._sample()
+                with self._lock:
+                    self._stall_stack = stack
+
+    def _sample(self):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        return [
+            f"{entry.filename}:{entry.lineno} in {entry.name}"
+            for entry in traceback.extract_stack(frame)[-self.stack_depth:]
+        ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_lag_ms": round(self.max_lag * 1000, 1),
+                "threshold_ms": round(self.threshold * 1000, 1),
+                "stalls": self.stalls,
+                "worst_blocking_call": self.worst,
+            }
+
+
+loop_monitor = LoopLagMonitor()
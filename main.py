@@ -27,13 +27,31 @@ from sqlalchemy import and_
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 
-from db import SessionLocal
+from db import SessionLocal, run_db, db_executor
+from loop_monitor import loop_monitor
+from audit_service import AuditQueryService, InvalidCursor
+from revocation_store import RevocationStore, exp_to_datetime
 from models import User, Patient, Doctor, Appointment, MedicalHistory, AuditLog, PatientAccessLog
 
 import hashlib
+import hmac
+import uuid
+
+import bcrypt
+
+# bcrypt only consumes the first 72 bytes of a password (G_v truncates the same way)
+BCRYPT_MAX_BYTES = 72
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
-    return hashlib.sha256(plain_password.encode()).hexdigest() == password_hash
+    # G_v upgrades legacy SHA-256 hashes to bcrypt on login; both share this database
+    if not password_hash:
+        return False
+    if password_hash.startswith("$2"):
+        try:
+            return bcrypt.checkpw(plain_password.encode()[:BCRYPT_MAX_BYTES], password_hash.encode())
+        except ValueError:
+            return False
+    return hmac.compare_digest(hashlib.sha256(plain_password.encode()).hexdigest(), password_hash)
 
 def get_db():
     db = SessionLocal()
@@ -58,6 +76,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def start_loop_monitor():
+    loop_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    await loop_monitor.stop()
+    db_executor.shutdown(wait=False)
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
@@ -92,21 +119,31 @@ class TokenResponse(BaseModel):
 
 # ==================== AUTHENTICATION ====================
 
+# Logged-out token ids, shared by all workers through the revoked_tokens table
+revocation_store = RevocationStore(SessionLocal)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def decode_credentials(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return TokenData(**payload)
+        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    if payload.get("jti") and revocation_store.is_revoked(payload["jti"]):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return payload
+
+def verify_token(payload: dict = Depends(decode_credentials)):
+    try:
+        return TokenData(**payload)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid token")
 
 def require_roles(allowed_roles: List[UserRole]):
     def role_checker(token_data: TokenData = Depends(verify_token)):
@@ -118,6 +155,9 @@ def require_roles(allowed_roles: List[UserRole]):
 # ==================== AUTHENTICATION ENDPOINTS ====================
 @app.post("/api/auth/login", response_model=TokenResponse, tags=["Authentication"])
 async def login(request: LoginRequest, db: Session = Depends(get_db)):
+    return await run_db(_login, db, request)
+
+def _login(db: Session, request: LoginRequest) -> TokenResponse:
     user = db.query(User).filter(User.email == request.email).first()
 
     if not user:
@@ -157,9 +197,10 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
     )
 
 @app.post("/api/auth/logout", tags=["Authentication"])
-async def logout(token_data: TokenData = Depends(verify_token)):
-    """Logout endpoint"""
-    # TODO: Implement token blacklisting if needed
+async def logout(payload: dict = Depends(decode_credentials)):
+    """Logout endpoint: revoke the presented token until it expires"""
+    if payload.get("jti"):
+        await run_db(revocation_store.revoke, payload["jti"], exp_to_datetime(payload["exp"]), payload.get("user_id"))
     return {"message": "Logged out successfully"}
 
 @app.get("/api/auth/me", tags=["Authentication"])
@@ -355,6 +396,9 @@ async def get_doctor_appointments(
     token_data: TokenData = Depends(require_roles([UserRole.DOCTOR])),
     db: Session = Depends(get_db),
 ):
+    return await run_db(_doctor_appointments, db, token_data, status)
+
+def _doctor_appointments(db: Session, token_data: TokenData, status: Optional[str]) -> dict:
     doctor = db.query(Doctor).filter(Doctor.user_id == token_data.user_id).first()
     if not doctor:
         raise HTTPException(status_code=404, detail="Doctor profile not found")
@@ -419,6 +463,9 @@ async def search_patient(
     token_data: TokenData = Depends(require_roles([UserRole.DOCTOR])),
     db: Session = Depends(get_db),
 ):
+    return await run_db(_search_patient, db, token_data, patient_uid)
+
+def _search_patient(db: Session, token_data: TokenData, patient_uid: str) -> dict:
     patient = db.query(Patient).filter(Patient.patient_uid == patient_uid).first()
 
     if not patient:
@@ -444,6 +491,9 @@ async def get_patient_medical_history(
     token_data: TokenData = Depends(require_roles([UserRole.DOCTOR])),
     db: Session = Depends(get_db),
 ):
+    return await run_db(_patient_medical_history, db, token_data, patient_id)
+
+def _patient_medical_history(db: Session, token_data: TokenData, patient_id: int) -> dict:
     patient = db.query(Patient).filter(Patient.id == patient_id).first()
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
@@ -799,34 +849,94 @@ async def update_claim_status(
 
 # ==================== AUDIT & LOGS ====================
 
+def _audit_page(fn, *args, **kwargs) -> tuple:
+    try:
+        return fn(*args, **kwargs)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _audit_scope(token_data: TokenData) -> dict:
+    if token_data.role == UserRole.BRANCH_ADMIN:
+        return {"organization_id": token_data.organization_id, "branch_id": token_data.branch_id}
+    if token_data.role == UserRole.ORG_ADMIN:
+        return {"organization_id": token_data.organization_id}
+    return {}
+
+def _patient_access_logs(db: Session, token_data: TokenData, patient_id: int, **page) -> dict:
+    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    scope = _audit_scope(token_data)
+    if any(getattr(patient, key) != value for key, value in scope.items()):
+        raise HTTPException(status_code=403, detail="Cross-tenant access denied")
+
+    items, next_cursor = _audit_page(AuditQueryService(db).patient_access_logs, patient_id, **page)
+    return {"access_logs": items, "next_cursor": next_cursor}
+
 @app.get("/api/audit/patient-access/{patient_id}", tags=["Audit"])
 async def get_patient_access_logs(
     patient_id: int,
-    token_data: TokenData = Depends(require_roles([UserRole.BRANCH_ADMIN, UserRole.ORG_ADMIN]))
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    token_data: TokenData = Depends(require_roles([UserRole.BRANCH_ADMIN, UserRole.ORG_ADMIN])),
+    db: Session = Depends(get_db),
 ):
-    """Get patient access logs"""
-    return {"access_logs": []}
+    """Get patient access logs (newest first, pass next_cursor for the next page)"""
+    return await run_db(
+        _patient_access_logs, db, token_data, patient_id,
+        start=start, end=end, cursor=cursor, limit=limit
+    )
 
 @app.get("/api/audit/logs", tags=["Audit"])
 async def get_audit_logs(
     entity_type: Optional[str] = None,
-    token_data: TokenData = Depends(require_roles([UserRole.BRANCH_ADMIN, UserRole.ORG_ADMIN, UserRole.SUPER_ADMIN]))
+    entity_id: Optional[int] = None,
+    action: Optional[str] = None,
+    user_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    token_data: TokenData = Depends(require_roles([UserRole.BRANCH_ADMIN, UserRole.ORG_ADMIN, UserRole.SUPER_ADMIN])),
+    db: Session = Depends(get_db),
 ):
-    """Get audit logs"""
-    return {"audit_logs": []}
+    """Get audit logs (newest first, pass next_cursor for the next page)"""
+    items, next_cursor = await run_db(
+        _audit_page, AuditQueryService(db).audit_logs,
+        entity_type=entity_type, entity_id=entity_id, action=action, user_id=user_id,
+        start=start, end=end, cursor=cursor, limit=limit, **_audit_scope(token_data)
+    )
+    return {"audit_logs": items, "next_cursor": next_cursor}
 
 @app.get("/api/audit/system-events", tags=["Audit"])
 async def get_system_events(
-    token_data: TokenData = Depends(require_roles([UserRole.SUPER_ADMIN]))
+    event_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    token_data: TokenData = Depends(require_roles([UserRole.SUPER_ADMIN])),
+    db: Session = Depends(get_db),
 ):
-    """Get system events"""
-    return {"system_events": []}
+    """Get system events (newest first, pass next_cursor for the next page)"""
+    items, next_cursor = await run_db(
+        _audit_page, AuditQueryService(db).system_events,
+        event_type=event_type, severity=severity, start=start, end=end, cursor=cursor, limit=limit
+    )
+    return {"system_events": items, "next_cursor": next_cursor}
 
 # ==================== HEALTH CHECK ====================
 
 @app.get("/api/health", tags=["System"])
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now(timezone.utc)}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc),
+        "event_loop": loop_monitor.stats()
+    }
 
 
 
@@ -424,6 +424,10 @@ class PatientAccessLog(Base):
     accessed_at = Column(DateTime, default=datetime.utcnow)
     
     patient = relationship("Patient", back_populates="access_logs")
+    
+    __table_args__ = (
+        Index('idx_access_patient_accessed', 'patient_id', 'accessed_at', 'id'),
+    )
 
 class AuditLog(Base):
     __tablename__ = 'audit_logs'
@@ -445,6 +449,25 @@ class AuditLog(Base):
     
     __table_args__ = (
         Index('idx_audit_user_created', 'user_id', 'created_at'),
+        Index('idx_audit_created_id', 'created_at', 'id'),
+        Index('idx_audit_entity_created', 'entity_type', 'entity_id', 'created_at', 'id'),
+        Index('idx_audit_action_created', 'action', 'created_at', 'id'),
+    )
+
+class RevokedToken(Base):
+    # Shared with G_v (same table), so a logout on either app holds on every worker
+    __tablename__ = 'revoked_tokens'
+    
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(64), unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'))
+    token_type = Column(String(20))
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_revoked_token_revoked_at', 'revoked_at'),
+        Index('idx_revoked_token_expires_at', 'expires_at'),
     )
 
 class SystemEvent(Base):
@@ -460,4 +483,5 @@ class SystemEvent(Base):
     
     __table_args__ = (
         Index('idx_event_type_created', 'event_type', 'created_at'),
+        Index('idx_event_created_id', 'created_at', 'id'),
     )
\ No newline at end of file
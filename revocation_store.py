@@ -0,0 +1,114 @@
+# revocation_store.py
+"""
+Revoked access tokens, keyed by JWT ``jti``.
+
+Revocations are persisted in ``revoked_tokens`` (the table G_v uses too) so
+every worker and every restart sees them. Each worker mirrors the live rows
+in a dict for O(1) checks and pulls rows revoked elsewhere at most every
+``sync_seconds``. Expiry is tracked in a min-heap, so dropping expired
+entries costs only the entries that expired; expired rows are deleted from
+the table every ``purge_seconds``.
+"""
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from models import RevokedToken
+
+
+def exp_to_datetime(exp: int) -> datetime:
+    """JWT ``exp`` (unix seconds) as the naive UTC datetime the table stores"""
+    return datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
+
+
+class RevocationStore:
+    def __init__(self, session_factory, sync_seconds: float = 5.0, purge_seconds: float = 300.0):
+        self.session_factory = session_factory
+        self.sync_seconds = sync_seconds
+        self.purge_seconds = purge_seconds
+        self._lock = threading.Lock()
+        self._revoked: Dict[str, datetime] = {}
+        self._expiry: List[Tuple[datetime, str]] = []
+        self._watermark: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._next_purge = time.monotonic() + purge_seconds
+
+    def _remember(self, jti: str, expires_at: datetime) -> None:
+        # Caller holds the lock
+        if jti not in self._revoked:
+            heapq.heappush(self._expiry, (expires_at, jti))
+        self._revoked[jti] = expires_at
+
+    def _expire_local(self, now: datetime) -> None:
+        # Caller holds the lock
+        while self._expiry and self._expiry[0][0] <= now:
+            _, jti = heapq.heappop(self._expiry)
+            self._revoked.pop(jti, None)
+
+    def sync(self, force: bool = False) -> None:
+        """Pull revocations recorded by other workers; purge expired rows on a timer"""
+        monotonic_now = time.monotonic()
+        with self._lock:
+            if not force and monotonic_now < self._next_sync:
+                return
+            self._next_sync = monotonic_now + self.sync_seconds
+            watermark = self._watermark
+            purge = monotonic_now >= self._next_purge
+            if purge:
+                self._next_purge = monotonic_now + self.purge_seconds
+
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            query = db.query(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).filter(
+                RevokedToken.expires_at > now
+            )
+            if watermark is not None:
+                # Overlap one sync window to tolerate late commits from other workers
+                query = query.filter(RevokedToken.revoked_at > watermark - timedelta(seconds=self.sync_seconds))
+            rows = query.all()
+            if purge:
+                db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+                db.commit()
+        finally:
+            db.close()
+
+        with self._lock:
+            for row in rows:
+                self._remember(row.jti, row.expires_at)
+                if self._watermark is None or row.revoked_at > self._watermark:
+                    self._watermark = row.revoked_at
+            if self._watermark is None:
+                self._watermark = now
+            self._expire_local(now)
+
+    def is_revoked(self, jti: str) -> bool:
+        self.sync()
+        with self._lock:
+            expires_at = self._revoked.get(jti)
+            return expires_at is not None and expires_at > datetime.utcnow()
+
+    def revoke(self, jti: str, expires_at: datetime, user_id: Optional[int] = None) -> None:
+        """Revoke ``jti`` until ``expires_at`` (revoking twice is a no-op)"""
+        if expires_at <= datetime.utcnow():
+            return
+        db = self.session_factory()
+        try:
+            db.add(RevokedToken(
+                jti=jti,
+                user_id=user_id,
+                token_type="access",
+                expires_at=expires_at,
+                revoked_at=datetime.utcnow()
+            ))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+        finally:
+            db.close()
+        with self._lock:
+            self._remember(jti, expires_at)
@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime, timedelta
+
+from models import AuditLog, UserRole
+
+
+def test_audit_logs_keyset_pages_do_not_overlap(client, db, token_factory):
+    token = token_factory(UserRole.SUPER_ADMIN)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # More rows than one page, some sharing a timestamp so the id tiebreak matters
+    action = f"PAGING_TEST_{uuid.uuid4().hex[:8]}"
+    now = datetime.utcnow()
+    rows = [AuditLog(action=action, entity_type="Test", created_at=now - timedelta(seconds=i // 2)) for i in range(7)]
+    db.add_all(rows)
+    db.commit()
+    try:
+        params = {"action": action, "limit": 5}
+        first = client.get("/api/audit/logs", params=params, headers=headers)
+        assert first.status_code == 200, first.text
+        page1 = first.json()
+        assert len(page1["audit_logs"]) == 5
+        assert page1["next_cursor"]
+
+        second = client.get("/api/audit/logs", params={**params, "cursor": page1["next_cursor"]}, headers=headers)
+        assert second.status_code == 200, second.text
+        page2 = second.json()
+        assert page2["next_cursor"] is None
+
+        ids1 = {row["id"] for row in page1["audit_logs"]}
+        ids2 = {row["id"] for row in page2["audit_logs"]}
+        assert not ids1 & ids2
+        assert ids1 | ids2 == {row.id for row in rows}
+        assert page1["audit_logs"][-1]["created_at"] >= page2["audit_logs"][0]["created_at"]
+    finally:
+        db.query(AuditLog).filter(AuditLog.action == action).delete(synchronize_session=False)
+        db.commit()
+
+
+def test_audit_logs_reject_bad_cursor(client, token_factory):
+    token = token_factory(UserRole.SUPER_ADMIN)
+    res = client.get("/api/audit/logs", params={"cursor": "not-a-cursor"}, headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 400
@@ -46,3 +46,17 @@ def test_me_requires_token(client):
 def test_logout_requires_token(client):
     res = client.post("/api/auth/logout")
     assert res.status_code in (401, 403)
+
+
+def test_verify_password_accepts_bcrypt_upgraded_hashes():
+    import hashlib
+    import bcrypt
+    from main import verify_password
+
+    legacy = hashlib.sha256(b"doctor123").hexdigest()
+    upgraded = bcrypt.hashpw(b"doctor123", bcrypt.gensalt(rounds=4)).decode()
+
+    assert verify_password("doctor123", legacy)
+    assert verify_password("doctor123", upgraded)
+    assert not verify_password("wrongpassword", upgraded)
+    assert not verify_password("doctor123", "")
@@ -0,0 +1,29 @@
+import asyncio
+import time
+
+from loop_monitor import LoopLagMonitor
+
+
+def test_loop_monitor_reports_worst_blocking_call():
+    def blocking_query():
+        time.sleep(0.3)
+
+    async def scenario():
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_query()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["stalls"] >= 1
+    assert stats["worst_blocking_call"]["lag_ms"] >= 200
+    assert "blocking_query" in stats["worst_blocking_call"]["call"]
+
+
+def test_health_reports_event_loop(client):
+    res = client.get("/api/health")
+    assert res.status_code == 200
+    assert "max_lag_ms" in res.json()["event_loop"]
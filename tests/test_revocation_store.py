@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Base, RevokedToken
+from revocation_store import RevocationStore
+
+
+@pytest.fixture
+def sessions():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[RevokedToken.__table__])
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_revocation_is_shared_between_workers(sessions):
+    worker_a = RevocationStore(sessions, sync_seconds=60)
+    worker_b = RevocationStore(sessions, sync_seconds=60)
+    assert not worker_b.is_revoked("jti-1")
+
+    worker_a.revoke("jti-1", datetime.utcnow() + timedelta(minutes=5))
+    worker_a.revoke("jti-1", datetime.utcnow() + timedelta(minutes=5))
+    assert worker_a.is_revoked("jti-1")
+
+    # Worker B picks it up on its next sync; a restarted worker on its first
+    worker_b.sync(force=True)
+    assert worker_b.is_revoked("jti-1")
+    assert RevocationStore(sessions).is_revoked("jti-1")
+
+
+def test_expired_revocations_are_purged(sessions):
+    store = RevocationStore(sessions, sync_seconds=60, purge_seconds=0)
+    store.revoke("short", datetime.utcnow() + timedelta(milliseconds=50))
+    store.revoke("long", datetime.utcnow() + timedelta(minutes=5))
+
+    later = datetime.utcnow() + timedelta(seconds=1)
+    with store._lock:
+        store._expire_local(later)
+    assert set(store._revoked) == {"long"}
+
+    with sessions() as db:
+        db.query(RevokedToken).filter(RevokedToken.jti == "short").update(
+            {"expires_at": datetime.utcnow() - timedelta(seconds=1)}
+        )
+        db.commit()
+    store.sync(force=True)
+    with sessions() as db:
+        assert [row.jti for row in db.query(RevokedToken)] == ["long"]